@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import json
 import os
 import re
 import shlex
@@ -297,6 +299,49 @@ def _cmd_diagnostics(args: argparse.Namespace) -> int:
     return 0
 
 
+def _cmd_routing_eval(args: argparse.Namespace) -> int:
+    # Imported here so other subcommands do not pay for loading litellm and the
+    # orchestrator.
+    from mobius.routing_eval import (
+        format_summary,
+        load_corpus,
+        run_routing_eval,
+        summarize_results,
+    )
+
+    cfg_path = _resolve_config_path(getattr(args, "config_path", None))
+    env_path = _resolve_env_path(getattr(args, "env_file", None))
+    config, error = _try_load_config(cfg_path, env_path=env_path)
+    if config is None:
+        print(f"Config load failed: {error}")
+        return 2
+    try:
+        cases = load_corpus(Path(args.corpus))
+    except (OSError, ValueError) as exc:
+        print(f"Routing corpus load failed: {exc}")
+        return 2
+
+    results = asyncio.run(
+        run_routing_eval(
+            config,
+            cases,
+            backend=args.backend,
+            concurrency=args.concurrency,
+            mock_latency_ms=args.mock_latency_ms,
+        )
+    )
+    summary = summarize_results(results)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_summary(summary))
+    min_accuracy = getattr(args, "min_accuracy", None)
+    if min_accuracy is not None and summary["accuracy"] < min_accuracy:
+        print(f"Accuracy {summary['accuracy']:.2%} is below {min_accuracy:.2%}.")
+        return 1
+    return 0
+
+
 def _cmd_service(action: str) -> int:
     if action == "status":
         command = ["systemctl", "status", SERVICE_NAME, "--no-pager", "-l"]
@@ -382,6 +427,36 @@ def _build_parser() -> argparse.ArgumentParser:
     diagnostics_parser.add_argument("--config", dest="config_path", default=None)
     diagnostics_parser.add_argument("--env-file", dest="env_file", default=None)
 
+    routing_eval_parser = subparsers.add_parser(
+        "routing-eval", help="Replay a routing corpus and report accuracy/latency"
+    )
+    routing_eval_parser.add_argument("corpus", help="Routing corpus JSONL file")
+    routing_eval_parser.add_argument("--config", dest="config_path", default=None)
+    routing_eval_parser.add_argument("--env-file", dest="env_file", default=None)
+    routing_eval_parser.add_argument(
+        "--backend",
+        choices=("recorded", "mock", "live"),
+        default="recorded",
+        help="recorded: replay recorded classifier responses; mock: local keyword "
+        "model; live: call the configured orchestrator model",
+    )
+    routing_eval_parser.add_argument(
+        "--concurrency", type=int, default=8, help="Cases routed in parallel"
+    )
+    routing_eval_parser.add_argument(
+        "--mock-latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated classifier latency for the mock backend",
+    )
+    routing_eval_parser.add_argument(
+        "--min-accuracy",
+        type=float,
+        default=None,
+        help="Exit with status 1 when accuracy is below this value (0..1)",
+    )
+    routing_eval_parser.add_argument("--json", action="store_true", help="Print JSON")
+
     subparsers.add_parser("start", help="Start systemd service")
     subparsers.add_parser("stop", help="Stop systemd service")
     subparsers.add_parser("restart", help="Restart systemd service")
@@ -448,6 +523,8 @@ def main() -> None:
         raise SystemExit(_cmd_paths(args))
     if command == "diagnostics":
         raise SystemExit(_cmd_diagnostics(args))
+    if command == "routing-eval":
+        raise SystemExit(_cmd_routing_eval(args))
     if command == "start":
         raise SystemExit(_cmd_service("start"))
     if command == "stop":
@@ -12,6 +12,7 @@ from mobius.logging_setup import get_logger
 logger = get_logger(__name__)
 FORWARDED_USER_NAME_HEADER = "X-OpenWebUI-User-Name"
 FORWARDED_USER_ID_HEADER = "X-OpenWebUI-User-Id"
+RESPONSE_CACHE_HEADER = "X-Mobius-Cache"
 
 
 def _require_api_key(request: Request) -> None:
@@ -56,6 +57,12 @@ def _payload_user_with_header_fallback(
     return payload.model_copy(update={"user": forwarded_user})
 
 
+def _bypasses_response_cache(request: Request) -> bool:
+    mobius_cache = request.headers.get(RESPONSE_CACHE_HEADER, "").strip().lower()
+    cache_control = request.headers.get("Cache-Control", "").lower()
+    return mobius_cache in {"bypass", "no-cache", "off"} or "no-cache" in cache_control
+
+
 def create_openai_router() -> APIRouter:
     router = APIRouter(prefix="/v1", tags=["openai-compatible-api"])
 
@@ -90,7 +97,10 @@ def create_openai_router() -> APIRouter:
         if resolved_payload.stream:
             stream = orchestrator.stream_sse(resolved_payload)
             return StreamingResponse(stream, media_type="text/event-stream")
-        response = await orchestrator.complete_non_stream(resolved_payload)
+        response = await orchestrator.complete_non_stream(
+            resolved_payload,
+            bypass_cache=_bypasses_response_cache(request),
+        )
         logger.info("chat.completions completed (non-stream).")
         return JSONResponse(response)
 
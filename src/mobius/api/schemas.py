@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -60,3 +61,19 @@ def latest_user_text(messages: list[OpenAIMessage]) -> str:
         if message.role == "user":
             return message.text_content()
     return ""
+
+
+def is_tool_continuation(messages: list[OpenAIMessage]) -> bool:
+    if not messages:
+        return False
+    last = messages[-1]
+    return last.role == "tool" or (last.role == "assistant" and bool(last.tool_calls))
+
+
+def user_turn_key(messages: list[OpenAIMessage]) -> str | None:
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if message.role == "user":
+            digest = hashlib.sha256(message.text_content().encode("utf-8")).hexdigest()
+            return f"{index}:{digest[:16]}"
+    return None
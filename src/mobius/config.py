@@ -30,9 +30,20 @@ class ServerConfig(StrictConfigModel):
     api_keys: list[str | None] = Field(...)
 
 
+class ConnectionPoolConfig(StrictConfigModel):
+    enabled: bool = True
+    max_connections: int = Field(default=100, ge=1)
+    max_keepalive_connections: int = Field(default=20, ge=0)
+    keepalive_expiry_seconds: float = Field(default=60.0, ge=0)
+    http2: bool = True
+    dns_cache_ttl_seconds: float = Field(default=300.0, ge=0)
+    warmup: bool = False
+
+
 class ProviderConfig(StrictConfigModel):
     api_key: str | None = Field(...)
     base_url: str | None = None
+    pool: ConnectionPoolConfig = Field(default_factory=ConnectionPoolConfig)
 
 
 class ProvidersConfig(StrictConfigModel):
@@ -40,15 +51,72 @@ class ProvidersConfig(StrictConfigModel):
     gemini: ProviderConfig = Field(...)
 
 
+class ModelHealthConfig(StrictConfigModel):
+    enabled: bool = True
+    ewma_alpha: float = Field(default=0.2, gt=0.0, le=1.0)
+    failure_threshold: int = Field(default=3, ge=1)
+    open_seconds: float = Field(default=30.0, ge=0)
+    latency_ordered_fallbacks: bool = False
+
+
+class CompletionHedgingConfig(StrictConfigModel):
+    enabled: bool = False
+    delay_ms: int | None = Field(default=None, ge=0)
+    delay_percentile: float = Field(default=0.9, ge=0, le=1)
+    initial_delay_ms: int = Field(default=4000, ge=0)
+    min_delay_ms: int = Field(default=500, ge=0)
+    max_delay_ms: int = Field(default=20000, ge=0)
+    latency_window: int = Field(default=200, ge=1)
+
+
+class StreamWatchdogConfig(StrictConfigModel):
+    enabled: bool = False
+    ttft_timeout_ms: int = Field(default=15000, ge=1)
+    by_model: dict[str, int] = Field(default_factory=dict)
+
+    @field_validator("by_model")
+    @classmethod
+    def _positive_timeouts(cls, value: dict[str, int]) -> dict[str, int]:
+        for model, timeout_ms in value.items():
+            if timeout_ms < 1:
+                raise ValueError(f"ttft timeout for '{model}' must be at least 1 ms.")
+        return value
+
+
+class StreamRecoveryConfig(StrictConfigModel):
+    enabled: bool = False
+    max_attempts: int = Field(default=1, ge=1, le=5)
+    continuation_prompt: str = (
+        "Your previous reply was cut off. Continue it exactly where it stopped, "
+        "without repeating any text and without commenting on the interruption."
+    )
+
+
+class ContextCacheConfig(StrictConfigModel):
+    enabled: bool = False
+    ttl_seconds: int = Field(default=3600, ge=60)
+    refresh_margin_seconds: int = Field(default=300, ge=0)
+    min_chars: int = Field(default=4096, ge=0)
+    failure_backoff_seconds: float = Field(default=60.0, ge=0)
+
+
 class ModelsConfig(StrictConfigModel):
     orchestrator: str = Field(...)
     fallbacks: list[str] = Field(default_factory=list)
+    health: ModelHealthConfig = Field(default_factory=ModelHealthConfig)
+    hedging: CompletionHedgingConfig = Field(default_factory=CompletionHedgingConfig)
+    stream_watchdog: StreamWatchdogConfig = Field(default_factory=StreamWatchdogConfig)
+    stream_recovery: StreamRecoveryConfig = Field(default_factory=StreamRecoveryConfig)
+    context_cache: ContextCacheConfig = Field(default_factory=ContextCacheConfig)
 
 
 class SpecialistDomainConfig(StrictConfigModel):
     model: str = Field(...)
     prompt_file: str = Field(...)
     display_name: str | None = None
+    hedge: bool = False
+    semantic_cache: bool = False
+    max_context_tokens: int | None = Field(default=None, ge=256)
 
     @field_validator("model", "prompt_file")
     @classmethod
@@ -160,6 +228,10 @@ class RuntimeConfig(StrictConfigModel):
     inject_current_timestamp: bool = True
     timezone: str = "Europe/Ljubljana"
     include_timestamp_in_routing: bool = False
+    timestamp_position: Literal["start", "end"] = "end"
+    timestamp_granularity: Literal["second", "minute", "hour", "day"] = "minute"
+    prompt_cache_key: Literal["off", "session", "domain"] = "session"
+    routing_timeout_ms: int | None = Field(default=None, ge=1)
 
     @field_validator("timezone")
     @classmethod
@@ -176,6 +248,109 @@ class RuntimeConfig(StrictConfigModel):
         return timezone_name
 
 
+class RoutingCacheConfig(StrictConfigModel):
+    enabled: bool = True
+    max_entries: int = Field(default=1024, ge=1)
+    ttl_seconds: float = Field(default=300.0, ge=0)
+
+
+class LocalClassifierConfig(StrictConfigModel):
+    enabled: bool = False
+    confidence_threshold: float = Field(default=0.85, ge=0, le=1)
+    feature_dim: int = Field(default=2048, ge=64)
+    training_log: Path | None = None
+    min_logged_confidence: float = Field(default=0.7, ge=0, le=1)
+    follow_up_max_chars: int = Field(default=60, ge=0)
+    retrain_every: int = Field(default=50, ge=1)
+    max_training_examples: int = Field(default=2000, ge=1)
+
+
+class ClassifierHedgingConfig(StrictConfigModel):
+    enabled: bool = False
+    backup_model: str | None = None
+    delay_percentile: float = Field(default=0.9, ge=0, le=1)
+    initial_delay_ms: int = Field(default=1500, ge=0)
+    min_delay_ms: int = Field(default=250, ge=0)
+    max_delay_ms: int = Field(default=5000, ge=0)
+    latency_window: int = Field(default=200, ge=1)
+
+
+class ClassifierBatchingConfig(StrictConfigModel):
+    enabled: bool = False
+    window_ms: int = Field(default=30, ge=0)
+    max_batch_size: int = Field(default=8, ge=1)
+
+
+class LabelProtocolConfig(StrictConfigModel):
+    max_tokens: int = Field(default=8, ge=1)
+    logprobs: bool = True
+    constrained_output: bool = True
+    unscored_confidence: float = Field(default=0.5, ge=0.0, le=1.0)
+
+
+class ClassifierSkipConfig(StrictConfigModel):
+    enabled: bool = False
+    mode: Literal["skip", "deferred"] = "deferred"
+    max_message_chars: int = Field(default=60, ge=1)
+    min_stable_turns: int = Field(default=2, ge=1)
+    min_confidence: float = Field(default=0.8, ge=0.0, le=1.0)
+
+
+class ClassifierInputConfig(StrictConfigModel):
+    enabled: bool = True
+    max_chars: int = Field(default=2000, ge=400)
+    head_chars: int = Field(default=800, ge=0)
+    tail_chars: int = Field(default=400, ge=0)
+    max_code_block_lines: int = Field(default=12, ge=4)
+
+
+class ShadowRoutingConfig(StrictConfigModel):
+    enabled: bool = False
+    model: str | None = None
+    sample_rate: float = Field(default=0.1, ge=0.0, le=1.0)
+    log_file: Path | None = None
+    latency_window: int = Field(default=500, ge=10)
+
+
+class RoutingConfig(StrictConfigModel):
+    protocol: Literal["json", "label"] = "json"
+    label: LabelProtocolConfig = Field(default_factory=LabelProtocolConfig)
+    speculative_generation: bool = False
+    explicit_switch: bool = True
+    streaming_classifier: bool = False
+    cache: RoutingCacheConfig = Field(default_factory=RoutingCacheConfig)
+    local_classifier: LocalClassifierConfig = Field(default_factory=LocalClassifierConfig)
+    hedging: ClassifierHedgingConfig = Field(default_factory=ClassifierHedgingConfig)
+    batching: ClassifierBatchingConfig = Field(default_factory=ClassifierBatchingConfig)
+    skip_policy: ClassifierSkipConfig = Field(default_factory=ClassifierSkipConfig)
+    input: ClassifierInputConfig = Field(default_factory=ClassifierInputConfig)
+    shadow: ShadowRoutingConfig = Field(default_factory=ShadowRoutingConfig)
+
+
+class ResponseCacheConfig(StrictConfigModel):
+    enabled: bool = False
+    max_entries: int = Field(default=512, ge=1)
+    ttl_seconds: float = Field(default=3600.0, ge=0)
+    disk_directory: Path | None = None
+    max_disk_entries: int = Field(default=10000, ge=1)
+
+
+class SemanticCacheConfig(StrictConfigModel):
+    enabled: bool = False
+    embedding_model: str = "text-embedding-3-small"
+    similarity_threshold: float = Field(default=0.93, ge=0.0, le=1.0)
+    ttl_seconds: float = Field(default=604800.0, ge=0)
+    max_entries_per_domain: int = Field(default=2000, ge=1)
+    index_directory: Path | None = None
+    flush_interval_seconds: float = Field(default=5.0, ge=0)
+
+
+class ContextBudgetConfig(StrictConfigModel):
+    enabled: bool = False
+    max_context_tokens: int = Field(default=100000, ge=256)
+    token_cache_size: int = Field(default=8192, ge=0)
+
+
 class AppConfig(StrictConfigModel):
     server: ServerConfig = Field(...)
     providers: ProvidersConfig = Field(...)
@@ -183,6 +358,10 @@ class AppConfig(StrictConfigModel):
     api: ApiConfig = Field(...)
     specialists: SpecialistsConfig = Field(...)
     runtime: RuntimeConfig = Field(default_factory=RuntimeConfig)
+    routing: RoutingConfig = Field(default_factory=RoutingConfig)
+    response_cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
+    semantic_cache: SemanticCacheConfig = Field(default_factory=SemanticCacheConfig)
+    context_budget: ContextBudgetConfig = Field(default_factory=ContextBudgetConfig)
     diagnostics: DiagnosticsConfig = Field(default_factory=DiagnosticsConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
 
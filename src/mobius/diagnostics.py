@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from mobius import __version__
 from mobius.config import AppConfig
 from mobius.prompts.manager import PromptManager
 from mobius.providers.litellm_router import LiteLLMRouter
 
+if TYPE_CHECKING:
+    # Only for annotations; importing it loads the whole orchestration stack.
+    from mobius.orchestration.orchestrator import Orchestrator
+
 
 def health_payload() -> dict[str, Any]:
     return {
@@ -16,19 +20,31 @@ def health_payload() -> dict[str, Any]:
     }
 
 
-def readiness_payload(config: AppConfig) -> dict[str, Any]:
+def readiness_payload(
+    config: AppConfig,
+    llm_router: LiteLLMRouter | None = None,
+) -> dict[str, Any]:
     openai_ready = bool(config.providers.openai.api_key)
     gemini_ready = bool(config.providers.gemini.api_key)
-    return {
-        "status": "ready" if (openai_ready or gemini_ready) else "degraded",
+    ready = openai_ready or gemini_ready
+    payload: dict[str, Any] = {
         "providers": {"openai": openai_ready, "gemini": gemini_ready},
     }
+    if llm_router is not None:
+        circuits = llm_router.health.circuits()
+        payload["model_circuits"] = circuits
+        chain = [config.models.orchestrator, *config.models.fallbacks]
+        if all(circuits.get(model) == "open" for model in chain):
+            ready = False
+    payload["status"] = "ready" if ready else "degraded"
+    return payload
 
 
 def diagnostics_payload(
     config: AppConfig,
     llm_router: LiteLLMRouter,
     prompt_manager: PromptManager | None = None,
+    orchestrator: "Orchestrator | None" = None,
 ) -> dict[str, Any]:
     prompt_config: dict[str, Any] = {
         "directory": str(config.specialists.prompts_directory),
@@ -37,7 +53,7 @@ def diagnostics_payload(
     if prompt_manager is not None:
         prompt_config["files"] = prompt_manager.resolved_prompt_files()
 
-    return {
+    payload: dict[str, Any] = {
         "service": "mobius",
         "version": __version__,
         "public_model": config.api.public_model_id,
@@ -54,10 +70,124 @@ def diagnostics_payload(
                 },
             },
             "orchestrator_model": config.models.orchestrator,
+            "model_health": {
+                "enabled": config.models.health.enabled,
+                "failure_threshold": config.models.health.failure_threshold,
+                "open_seconds": config.models.health.open_seconds,
+                "latency_ordered_fallbacks": config.models.health.latency_ordered_fallbacks,
+            },
+            "completion_hedging": {
+                "enabled": config.models.hedging.enabled,
+                "delay_ms": config.models.hedging.delay_ms,
+                "delay_percentile": config.models.hedging.delay_percentile,
+            },
+            "stream_watchdog": {
+                "enabled": config.models.stream_watchdog.enabled,
+                "ttft_timeout_ms": config.models.stream_watchdog.ttft_timeout_ms,
+                "by_model": dict(config.models.stream_watchdog.by_model),
+            },
+            "stream_recovery": {
+                "enabled": config.models.stream_recovery.enabled,
+                "max_attempts": config.models.stream_recovery.max_attempts,
+            },
+            "context_cache": {
+                "enabled": config.models.context_cache.enabled,
+                "ttl_seconds": config.models.context_cache.ttl_seconds,
+                "refresh_margin_seconds": config.models.context_cache.refresh_margin_seconds,
+                "min_chars": config.models.context_cache.min_chars,
+                "failure_backoff_seconds": config.models.context_cache.failure_backoff_seconds,
+            },
             "runtime": {
                 "inject_current_timestamp": config.runtime.inject_current_timestamp,
                 "timezone": config.runtime.timezone,
                 "include_timestamp_in_routing": config.runtime.include_timestamp_in_routing,
+                "timestamp_position": config.runtime.timestamp_position,
+                "timestamp_granularity": config.runtime.timestamp_granularity,
+                "prompt_cache_key": config.runtime.prompt_cache_key,
+                "routing_timeout_ms": config.runtime.routing_timeout_ms,
+            },
+            "routing": {
+                "protocol": config.routing.protocol,
+                "label": {
+                    "max_tokens": config.routing.label.max_tokens,
+                    "logprobs": config.routing.label.logprobs,
+                    "constrained_output": config.routing.label.constrained_output,
+                },
+                "speculative_generation": config.routing.speculative_generation,
+                "explicit_switch": config.routing.explicit_switch,
+                "streaming_classifier": config.routing.streaming_classifier,
+                "cache": {
+                    "enabled": config.routing.cache.enabled,
+                    "max_entries": config.routing.cache.max_entries,
+                    "ttl_seconds": config.routing.cache.ttl_seconds,
+                },
+                "hedging": {
+                    "enabled": config.routing.hedging.enabled,
+                    "backup_model": config.routing.hedging.backup_model,
+                    "delay_percentile": config.routing.hedging.delay_percentile,
+                },
+                "batching": {
+                    "enabled": config.routing.batching.enabled,
+                    "window_ms": config.routing.batching.window_ms,
+                    "max_batch_size": config.routing.batching.max_batch_size,
+                },
+                "skip_policy": {
+                    "enabled": config.routing.skip_policy.enabled,
+                    "mode": config.routing.skip_policy.mode,
+                    "max_message_chars": config.routing.skip_policy.max_message_chars,
+                    "min_stable_turns": config.routing.skip_policy.min_stable_turns,
+                    "min_confidence": config.routing.skip_policy.min_confidence,
+                },
+                "input": {
+                    "enabled": config.routing.input.enabled,
+                    "max_chars": config.routing.input.max_chars,
+                    "max_code_block_lines": config.routing.input.max_code_block_lines,
+                },
+                "shadow": {
+                    "enabled": config.routing.shadow.enabled,
+                    "model": config.routing.shadow.model,
+                    "sample_rate": config.routing.shadow.sample_rate,
+                    "log_file": (
+                        str(config.routing.shadow.log_file)
+                        if config.routing.shadow.log_file
+                        else None
+                    ),
+                },
+                "local_classifier": {
+                    "enabled": config.routing.local_classifier.enabled,
+                    "confidence_threshold": config.routing.local_classifier.confidence_threshold,
+                },
+            },
+            "response_cache": {
+                "enabled": config.response_cache.enabled,
+                "max_entries": config.response_cache.max_entries,
+                "ttl_seconds": config.response_cache.ttl_seconds,
+                "disk_directory": (
+                    str(config.response_cache.disk_directory)
+                    if config.response_cache.disk_directory
+                    else None
+                ),
+            },
+            "semantic_cache": {
+                "enabled": config.semantic_cache.enabled,
+                "embedding_model": config.semantic_cache.embedding_model,
+                "similarity_threshold": config.semantic_cache.similarity_threshold,
+                "ttl_seconds": config.semantic_cache.ttl_seconds,
+                "max_entries_per_domain": config.semantic_cache.max_entries_per_domain,
+                "domains": sorted(
+                    domain
+                    for domain, item in config.specialists.by_domain.items()
+                    if item.semantic_cache
+                ),
+            },
+            "context_budget": {
+                "enabled": config.context_budget.enabled,
+                "max_context_tokens": config.context_budget.max_context_tokens,
+                "by_domain": {
+                    domain: item.max_context_tokens
+                    for domain, item in sorted(config.specialists.by_domain.items())
+                    if item.max_context_tokens is not None
+                },
             },
             "prompts": prompt_config,
             "logging": {
@@ -69,3 +199,26 @@ def diagnostics_payload(
         },
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
+    if orchestrator is not None:
+        payload["routing"] = orchestrator.routing_stats()
+        payload["streaming"] = orchestrator.stream_stats()
+        payload["response_cache"] = orchestrator.response_cache_stats()
+        payload["prompt_cache"] = orchestrator.prompt_cache_stats()
+        payload["semantic_cache"] = orchestrator.semantic_cache_stats()
+        payload["context_budget"] = orchestrator.context_budget_stats()
+    health_stats = getattr(llm_router, "health_stats", None)
+    if callable(health_stats):
+        payload["model_health"] = health_stats()
+    hedge_stats = getattr(llm_router, "hedge_stats", None)
+    if callable(hedge_stats):
+        payload["completion_hedging"] = hedge_stats()
+    ttft_stats = getattr(llm_router, "ttft_stats", None)
+    if callable(ttft_stats):
+        payload["stream_watchdog"] = ttft_stats()
+    context_cache_stats = getattr(llm_router, "context_cache_stats", None)
+    if callable(context_cache_stats):
+        payload["context_cache"] = context_cache_stats()
+    pool_stats = getattr(llm_router, "pool_stats", None)
+    if callable(pool_stats):
+        payload["connection_pools"] = pool_stats()
+    return payload
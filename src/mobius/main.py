@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator
 
 from fastapi import FastAPI
 
@@ -25,6 +26,7 @@ def _ensure_runtime_dirs(config: AppConfig) -> None:
 def _build_services(config: AppConfig) -> dict[str, Any]:
     _ensure_runtime_dirs(config)
     llm_router = LiteLLMRouter(config)
+    llm_router.open_pools()
     specialist_router = SpecialistRouter(config=config, llm_router=llm_router)
     prompt_manager = PromptManager(config)
     orchestrator = Orchestrator(
@@ -55,7 +57,15 @@ def create_app(config_path: str | Path | None = None) -> FastAPI:
         config.specialists.prompts_directory,
     )
 
-    app = FastAPI(title="Mobius", version=__version__)
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        await services["llm_router"].warm_up()
+        yield
+        await services["orchestrator"].aclose()
+        await services["llm_router"].aclose()
+        logger.info("Provider connection pools closed.")
+
+    app = FastAPI(title="Mobius", version=__version__, lifespan=lifespan)
     app.state.services = services
     app.include_router(create_openai_router())
 
@@ -67,7 +77,7 @@ def create_app(config_path: str | Path | None = None) -> FastAPI:
 
     @app.get(endpoints.readiness, tags=["diagnostics"])
     async def readyz() -> dict[str, Any]:
-        return readiness_payload(config)
+        return readiness_payload(config, llm_router=services["llm_router"])
 
     @app.get(endpoints.diagnostics, tags=["diagnostics"])
     async def diagnostics() -> dict[str, Any]:
@@ -75,6 +85,7 @@ def create_app(config_path: str | Path | None = None) -> FastAPI:
             config=config,
             llm_router=services["llm_router"],
             prompt_manager=services["prompt_manager"],
+            orchestrator=services["orchestrator"],
         )
 
     logger.info(
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from mobius.logging_setup import get_logger
+
+if TYPE_CHECKING:
+    from mobius.orchestration.specialist_router import SpecialistRoute
+
+
+@dataclass
+class PendingClassification:
+    user_text: str
+    current_domain: str | None
+    recent_domains: list[str]
+    future: asyncio.Future[SpecialistRoute] = field(repr=False)
+
+
+class ClassificationBatcher:
+    def __init__(
+        self,
+        *,
+        handler: Callable[[list[PendingClassification]], Awaitable[list[SpecialistRoute]]],
+        window_ms: int,
+        max_batch_size: int,
+    ) -> None:
+        self.logger = get_logger(__name__)
+        self._handler = handler
+        self._window_seconds = max(0, window_ms) / 1000
+        self._max_batch_size = max(1, max_batch_size)
+        self._pending: list[PendingClassification] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._batches = 0
+        self._items = 0
+
+    async def submit(
+        self,
+        user_text: str,
+        *,
+        current_domain: str | None,
+        recent_domains: list[str],
+    ) -> SpecialistRoute:
+        loop = asyncio.get_running_loop()
+        item = PendingClassification(
+            user_text=user_text,
+            current_domain=current_domain,
+            recent_domains=list(recent_domains),
+            future=loop.create_future(),
+        )
+        self._pending.append(item)
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window_seconds, self._flush)
+        return await item.future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that already gave up (for example on a routing deadline) are dropped.
+        batch = [item for item in self._pending if not item.future.done()]
+        self._pending = []
+        if not batch:
+            return
+        self._batches += 1
+        self._items += len(batch)
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[PendingClassification]) -> None:
+        try:
+            routes = await self._handler(batch)
+        except Exception as exc:
+            self.logger.warning(
+                "Batched routing failed size=%d error=%s",
+                len(batch),
+                exc.__class__.__name__,
+            )
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+        for item, route in zip(batch, routes):
+            if not item.future.done():
+                item.future.set_result(route)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "average_batch_size": (
+                round(self._items / self._batches, 2) if self._batches else 0.0
+            ),
+        }
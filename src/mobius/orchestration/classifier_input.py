@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import re
+
+from mobius.config import ClassifierInputConfig
+
+CODE_BLOCK_RE = re.compile(r"```([^\n`]*)\n(.*?)(?:```|\Z)", re.DOTALL)
+KEPT_CODE_LINES = 3
+
+
+def _collapse_code_blocks(text: str, max_lines: int) -> str:
+    def collapse(match: re.Match[str]) -> str:
+        language = match.group(1).strip()
+        lines = match.group(2).splitlines()
+        if len(lines) <= max_lines:
+            return match.group(0)
+        # A few leading lines keep hints like a YAML key or a stack trace header.
+        kept = "\n".join(lines[:KEPT_CODE_LINES])
+        omitted = len(lines) - KEPT_CODE_LINES
+        return f"```{language}\n{kept}\n[... {omitted} code lines omitted ...]\n```"
+
+    return CODE_BLOCK_RE.sub(collapse, text)
+
+
+def _sample_lines(middle: str, budget: int) -> list[str]:
+    lines = [line.strip() for line in middle.splitlines() if line.strip()]
+    if not lines or budget <= 0:
+        return []
+    average = max(1, sum(len(line) for line in lines) // len(lines) + 1)
+    count = min(len(lines), max(1, budget // average))
+    step = len(lines) / count
+    sampled: list[str] = []
+    used = 0
+    for idx in range(count):
+        line = lines[int(idx * step)]
+        if used + len(line) + 1 > budget:
+            break
+        sampled.append(line)
+        used += len(line) + 1
+    return sampled
+
+
+def bounded_classifier_input(text: str, config: ClassifierInputConfig) -> str:
+    if not config.enabled or len(text) <= config.max_chars:
+        return text
+    reduced = _collapse_code_blocks(text, config.max_code_block_lines)
+    if len(reduced) <= config.max_chars:
+        return reduced
+
+    # Head and tail never take the whole budget; sampled lines need room too.
+    head_chars = min(config.head_chars, config.max_chars // 2)
+    tail_chars = min(config.tail_chars, config.max_chars // 4)
+    head = reduced[:head_chars]
+    tail = reduced[len(reduced) - tail_chars :] if tail_chars else ""
+    middle = reduced[head_chars : len(reduced) - tail_chars]
+    marker_budget = 64
+    sample_budget = config.max_chars - len(head) - len(tail) - 2 * marker_budget
+    sampled = _sample_lines(middle, sample_budget)
+    omitted = len(middle) - sum(len(line) for line in sampled)
+    parts = [head, f"\n[... {omitted} characters omitted, sampled lines follow ...]"]
+    parts.extend(sampled)
+    parts.append("[... end of sampled lines ...]\n")
+    parts.append(tail)
+    return "\n".join(parts)
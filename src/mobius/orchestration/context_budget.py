@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from typing import Any
+
+import tiktoken
+from litellm import encoding as bundled_encoding
+
+from mobius.config import ContextBudgetConfig
+from mobius.logging_setup import get_logger
+
+# Chat framing overhead per message and for the reply primer (OpenAI cookbook).
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+NON_TEXT_PART_TOKENS = 85
+MIN_TRIM_TOKENS = 32
+TRIM_SLACK_TOKENS = 8
+TRIM_MARKER = "[…] "
+
+
+@dataclass(frozen=True)
+class BudgetResult:
+    messages: list[dict[str, Any]]
+    original_tokens: int
+    kept_tokens: int
+    dropped_messages: int = 0
+    truncated_messages: int = 0
+
+    @property
+    def trimmed_tokens(self) -> int:
+        return self.original_tokens - self.kept_tokens
+
+
+@lru_cache(maxsize=64)
+def _encoding(model: str) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model.split("/", 1)[-1])
+    except Exception:
+        # Unknown (non-OpenAI) models, or the BPE file cannot be fetched: LiteLLM
+        # ships cl100k_base locally, which is close enough for budgeting.
+        return bundled_encoding
+
+
+def _message_text(message: dict[str, Any]) -> tuple[str, int]:
+    content = message.get("content")
+    extra_tokens = 0
+    if isinstance(content, list):
+        parts: list[str] = []
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "text":
+                parts.append(str(part.get("text") or ""))
+            else:
+                extra_tokens += NON_TEXT_PART_TOKENS
+        text = "\n".join(parts)
+    else:
+        text = str(content or "")
+    for field in ("role", "name", "tool_call_id"):
+        if message.get(field):
+            text += f"\n{message[field]}"
+    if message.get("tool_calls"):
+        text += "\n" + json.dumps(message["tool_calls"], ensure_ascii=False, default=str)
+    return text, extra_tokens
+
+
+def _is_plain_text(message: dict[str, Any]) -> bool:
+    return (
+        message.get("role") in {"user", "assistant"}
+        and isinstance(message.get("content"), str)
+        and not message.get("tool_calls")
+    )
+
+
+def _turns(indexes: range, messages: list[dict[str, Any]]) -> list[list[int]]:
+    # A turn starts at a user message, so tool calls stay with their results.
+    turns: list[list[int]] = []
+    for index in indexes:
+        if messages[index].get("role") == "user" or not turns:
+            turns.append([])
+        turns[-1].append(index)
+    return turns
+
+
+class ContextBudgeter:
+    def __init__(self, config: ContextBudgetConfig) -> None:
+        self.logger = get_logger(__name__)
+        self._config = config
+        self._token_cache: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._lock = Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._checked = 0
+        self._trimmed_requests = 0
+        self._trimmed_tokens = 0
+        self._dropped_messages = 0
+        self._truncated_messages = 0
+        self._over_budget = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def warm(self, models: set[str]) -> None:
+        # tiktoken downloads BPE files on first use; do it before serving requests.
+        for model in sorted(models):
+            _encoding(model)
+
+    def count(self, model: str, message: dict[str, Any]) -> int:
+        encoding = _encoding(model)
+        digest = hashlib.sha256(
+            json.dumps(message, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()
+        key = (encoding.name, digest)
+        with self._lock:
+            cached = self._token_cache.get(key)
+            if cached is not None:
+                self._token_cache.move_to_end(key)
+                self._cache_hits += 1
+                return cached
+            self._cache_misses += 1
+        text, extra_tokens = _message_text(message)
+        tokens = len(encoding.encode(text, disallowed_special=()))
+        tokens += extra_tokens + MESSAGE_OVERHEAD_TOKENS
+        if self._config.token_cache_size:
+            with self._lock:
+                self._token_cache[key] = tokens
+                while len(self._token_cache) > self._config.token_cache_size:
+                    self._token_cache.popitem(last=False)
+        return tokens
+
+    def _truncated(
+        self, model: str, message: dict[str, Any], max_tokens: int
+    ) -> dict[str, Any] | None:
+        content = str(message.get("content") or "")
+        allowed = max_tokens - MESSAGE_OVERHEAD_TOKENS - TRIM_SLACK_TOKENS
+        if allowed < MIN_TRIM_TOKENS:
+            return None
+        encoding = _encoding(model)
+        tokens = encoding.encode(content, disallowed_special=())
+        tail = encoding.decode(tokens[-allowed:])
+        shortened = {**message, "content": TRIM_MARKER + tail.lstrip()}
+        if self.count(model, shortened) > max_tokens:
+            return None
+        return shortened
+
+    def fit(self, messages: list[dict[str, Any]], model: str, max_tokens: int) -> BudgetResult:
+        self._checked += 1
+        counts = [self.count(model, message) for message in messages]
+        total = sum(counts) + REPLY_OVERHEAD_TOKENS
+        if total <= max_tokens:
+            return BudgetResult(messages=messages, original_tokens=total, kept_tokens=total)
+
+        head = 1 if messages and messages[0].get("role") == "system" else 0
+        user_indexes = [
+            index for index in range(head, len(messages)) if messages[index].get("role") == "user"
+        ]
+        if not user_indexes:
+            return BudgetResult(messages=messages, original_tokens=total, kept_tokens=total)
+        # The system prompt and everything from the latest user turn on are kept.
+        tail_start = user_indexes[-1]
+        required = sum(counts[:head]) + sum(counts[tail_start:]) + REPLY_OVERHEAD_TOKENS
+        allowance = max_tokens - required
+
+        kept: list[dict[str, Any]] = []
+        truncated = 0
+        for turn in reversed(_turns(range(head, tail_start), messages)):
+            turn_tokens = sum(counts[index] for index in turn)
+            if turn_tokens <= allowance:
+                kept[:0] = [messages[index] for index in turn]
+                allowance -= turn_tokens
+                continue
+            if all(_is_plain_text(messages[index]) for index in turn):
+                # Keep the newest part of the boundary turn, cutting one message short.
+                for index in reversed(turn):
+                    if counts[index] <= allowance:
+                        kept.insert(0, messages[index])
+                        allowance -= counts[index]
+                        continue
+                    shortened = self._truncated(model, messages[index], allowance)
+                    if shortened is not None:
+                        kept.insert(0, shortened)
+                        allowance -= self.count(model, shortened)
+                        truncated = 1
+                    break
+            break
+
+        result_messages = [*messages[:head], *kept, *messages[tail_start:]]
+        result = BudgetResult(
+            messages=result_messages,
+            original_tokens=total,
+            kept_tokens=max_tokens - allowance if allowance >= 0 else required,
+            dropped_messages=len(messages) - len(result_messages),
+            truncated_messages=truncated,
+        )
+        with self._lock:
+            self._trimmed_requests += 1
+            self._trimmed_tokens += result.trimmed_tokens
+            self._dropped_messages += result.dropped_messages
+            self._truncated_messages += truncated
+            if required > max_tokens:
+                self._over_budget += 1
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "enabled": self._config.enabled,
+                "checked": self._checked,
+                "trimmed_requests": self._trimmed_requests,
+                "trimmed_tokens": self._trimmed_tokens,
+                "dropped_messages": self._dropped_messages,
+                "truncated_messages": self._truncated_messages,
+                "over_budget": self._over_budget,
+                "token_cache_size": len(self._token_cache),
+                "token_cache_hit_rate": (
+                    round(self._cache_hits / lookups, 4) if lookups else 0.0
+                ),
+            }
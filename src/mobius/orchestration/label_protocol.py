@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import math
+from functools import lru_cache
+from typing import Any
+
+import litellm
+
+from mobius.config import LabelProtocolConfig
+from mobius.specialist_catalog import SPECIALIST_DOMAINS, normalize_domain
+
+LABEL_RESPONSE_FORMAT: dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "specialist_route",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "specialist": {"type": "string", "enum": list(SPECIALIST_DOMAINS)},
+            },
+            "required": ["specialist"],
+            "additionalProperties": False,
+        },
+    },
+}
+# Headroom for tokenizers that split the JSON framing differently than cl100k and for
+# providers that emit whitespace inside the object.
+CONSTRAINED_SLACK_TOKENS = 8
+
+
+@lru_cache(maxsize=1)
+def _constrained_label_tokens() -> int:
+    # The longest allowed answer, e.g. {"specialist": "personal_development"}.
+    longest = max(
+        len(litellm.encoding.encode(json.dumps({"specialist": domain})))
+        for domain in SPECIALIST_DOMAINS
+    )
+    return longest + CONSTRAINED_SLACK_TOKENS
+
+
+@lru_cache(maxsize=64)
+def _model_capabilities(model: str) -> tuple[frozenset[str], bool, bool]:
+    try:
+        supported = frozenset(litellm.get_supported_openai_params(model=model) or [])
+    except Exception:
+        supported = frozenset()
+    try:
+        response_schema = bool(litellm.supports_response_schema(model=model))
+    except Exception:
+        response_schema = False
+    try:
+        reasoning = bool(litellm.supports_reasoning(model=model))
+    except Exception:
+        reasoning = False
+    return supported, response_schema, reasoning
+
+
+def label_request_params(model: str, config: LabelProtocolConfig) -> dict[str, Any]:
+    supported, response_schema, reasoning = _model_capabilities(model)
+    params: dict[str, Any] = {}
+    constrained = (
+        config.constrained_output and response_schema and "response_format" in supported
+    )
+    if reasoning:
+        # Reasoning models spend completion tokens before the label, so a tight
+        # max_tokens cap would truncate the answer; ask for minimal effort instead.
+        if "reasoning_effort" in supported:
+            params["reasoning_effort"] = "minimal"
+    elif "max_tokens" in supported:
+        # A JSON object answer needs room for its framing as well as the label.
+        params["max_tokens"] = (
+            max(config.max_tokens, _constrained_label_tokens())
+            if constrained
+            else config.max_tokens
+        )
+    if config.logprobs and "logprobs" in supported:
+        params["logprobs"] = True
+    if constrained:
+        params["response_format"] = LABEL_RESPONSE_FORMAT
+    return params
+
+
+def parse_label(text: str) -> str:
+    candidate = text.strip()
+    if candidate.startswith("{"):
+        try:
+            loaded = json.loads(candidate)
+        except ValueError:
+            loaded = None
+        if isinstance(loaded, dict):
+            return normalize_domain(str(loaded.get("specialist", "") or ""))
+    words = candidate.strip("`'\". \n").split()
+    return normalize_domain(words[0]) if words else ""
+
+
+def label_confidence(response: dict[str, Any]) -> float | None:
+    try:
+        tokens = response["choices"][0]["logprobs"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return None
+    if not isinstance(tokens, list) or not tokens:
+        return None
+    total = 0.0
+    for token in tokens:
+        if not isinstance(token, dict):
+            return None
+        try:
+            total += float(token["logprob"])
+        except (KeyError, TypeError, ValueError):
+            return None
+    # Joint probability of the emitted answer; fixed JSON scaffolding tokens of a
+    # constrained response are near-certain and barely move it.
+    return max(0.0, min(1.0, math.exp(total)))
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import re
+import zlib
+from collections import deque
+from threading import Lock
+from typing import Any
+
+from mobius.config import LocalClassifierConfig
+from mobius.logging_setup import get_logger
+from mobius.specialist_catalog import SPECIALIST_CATALOG, SPECIALIST_DOMAINS
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional at runtime
+    np = None  # type: ignore[assignment]
+
+LOCAL_CLASSIFIER_MODEL = "local-ngram"
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+HINT_SPLIT_RE = re.compile(r"[,/]|\band\b")
+CHAR_NGRAM_SIZES: tuple[int, ...] = (3, 4, 5)
+MAX_FEATURE_CHARS = 2000
+TRAINING_EPOCHS = 150
+LEARNING_RATE = 2.0
+L2_PENALTY = 1e-4
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def _feature_indices(text: str, dim: int) -> list[int]:
+    normalized = " ".join(TOKEN_RE.findall(text[:MAX_FEATURE_CHARS].lower()))
+    if not normalized:
+        return []
+    indices: list[int] = []
+    for token in normalized.split(" "):
+        indices.append(zlib.crc32(f"w:{token}".encode("utf-8")) % dim)
+    padded = f" {normalized} "
+    for size in CHAR_NGRAM_SIZES:
+        for start in range(len(padded) - size + 1):
+            gram = padded[start : start + size]
+            indices.append(zlib.crc32(f"c:{gram}".encode("utf-8")) % dim)
+    return indices
+
+
+def _sparse_features(text: str, dim: int) -> tuple[Any, Any]:
+    indices = _feature_indices(text, dim)
+    if not indices:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    unique, counts = np.unique(np.asarray(indices, dtype=np.int64), return_counts=True)
+    values = counts.astype(np.float32)
+    values /= np.linalg.norm(values)
+    return unique, values
+
+
+def _dense_features(texts: list[str], dim: int) -> Any:
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        unique, values = _sparse_features(text, dim)
+        matrix[row, unique] = values
+    return matrix
+
+
+def seed_examples() -> list[tuple[str, str]]:
+    examples: list[tuple[str, str]] = []
+    for profile in SPECIALIST_CATALOG:
+        examples.append((profile.routing_hint, profile.domain))
+        examples.append((profile.label, profile.domain))
+        examples.append((profile.domain.replace("_", " "), profile.domain))
+        for phrase in HINT_SPLIT_RE.split(profile.routing_hint):
+            cleaned = phrase.strip(" .")
+            if cleaned:
+                examples.append((cleaned, profile.domain))
+    return examples
+
+
+class LocalRoutingClassifier:
+    def __init__(self, config: LocalClassifierConfig) -> None:
+        if np is None:
+            raise RuntimeError("numpy is required for the local routing classifier.")
+        self.logger = get_logger(__name__)
+        self._config = config
+        self._dim = config.feature_dim
+        self._domains: tuple[str, ...] = SPECIALIST_DOMAINS
+        self._domain_index = {domain: idx for idx, domain in enumerate(self._domains)}
+        self._logged: deque[tuple[str, str]] = deque(
+            maxlen=config.max_training_examples
+        )
+        self._pending_since_train = 0
+        self._lock = Lock()
+        self._log_lock = Lock()
+        self._weights = np.zeros((self._dim, len(self._domains)), dtype=np.float32)
+        self._bias = np.zeros(len(self._domains), dtype=np.float32)
+        self._predictions = 0
+        self._confident = 0
+        self._trainings = 0
+        self._load_training_log()
+        self.retrain()
+
+    @property
+    def threshold(self) -> float:
+        return self._config.confidence_threshold
+
+    @property
+    def retrain_due(self) -> bool:
+        return self._pending_since_train >= self._config.retrain_every
+
+    def _load_training_log(self) -> None:
+        path = self._config.training_log
+        if path is None or not path.exists():
+            return
+        loaded = 0
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not isinstance(item, dict):
+                        continue
+                    text = str(item.get("text") or "")
+                    domain = str(item.get("domain") or "")
+                    if text.strip() and domain in self._domain_index:
+                        self._logged.append((text, domain))
+                        loaded += 1
+        except OSError as exc:
+            self.logger.warning(
+                "Local classifier training log unreadable: %s (%s).",
+                path,
+                exc.__class__.__name__,
+            )
+            return
+        self.logger.info(
+            "Local classifier loaded %d logged routing decisions from %s.", loaded, path
+        )
+
+    def retrain(self) -> None:
+        with self._lock:
+            examples = [*seed_examples(), *self._logged]
+            self._pending_since_train = 0
+        texts = [text for text, _ in examples]
+        labels = np.asarray(
+            [self._domain_index[domain] for _, domain in examples], dtype=np.int64
+        )
+        features = _dense_features(texts, self._dim)
+        targets = np.zeros((len(examples), len(self._domains)), dtype=np.float32)
+        targets[np.arange(len(examples)), labels] = 1.0
+
+        weights = np.zeros((self._dim, len(self._domains)), dtype=np.float32)
+        bias = np.zeros(len(self._domains), dtype=np.float32)
+        count = float(len(examples))
+        for _ in range(TRAINING_EPOCHS):
+            probabilities = self._softmax(features @ weights + bias)
+            error = (probabilities - targets) / count
+            weights -= LEARNING_RATE * (features.T @ error + L2_PENALTY * weights)
+            bias -= LEARNING_RATE * error.sum(axis=0)
+
+        with self._lock:
+            self._weights = weights
+            self._bias = bias
+            self._trainings += 1
+        self.logger.debug(
+            "Local classifier trained examples=%d logged=%d", len(examples), len(self._logged)
+        )
+
+    @staticmethod
+    def _softmax(logits: Any) -> Any:
+        shifted = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(shifted)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, text: str) -> tuple[str, float]:
+        unique, values = _sparse_features(text, self._dim)
+        weights, bias = self._weights, self._bias
+        logits = values @ weights[unique] + bias if len(unique) else bias
+        probabilities = self._softmax(logits)
+        best = int(probabilities.argmax())
+        confidence = float(probabilities[best])
+        self._predictions += 1
+        if confidence >= self.threshold:
+            self._confident += 1
+        return self._domains[best], confidence
+
+    @property
+    def follow_up_max_chars(self) -> int:
+        return self._config.follow_up_max_chars
+
+    def record(self, text: str, domain: str, confidence: float) -> bool:
+        if domain not in self._domain_index or not text.strip():
+            return False
+        if confidence < self._config.min_logged_confidence:
+            return False
+        with self._lock:
+            self._logged.append((text, domain))
+            self._pending_since_train += 1
+        return True
+
+    def append_training_log(self, text: str, domain: str, confidence: float) -> None:
+        path = self._config.training_log
+        if path is None:
+            return
+        line = json.dumps(
+            {"text": text, "domain": domain, "confidence": confidence}, ensure_ascii=False
+        )
+        try:
+            with self._log_lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with path.open("a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError as exc:
+            self.logger.warning(
+                "Local classifier training log write failed: %s (%s).",
+                path,
+                exc.__class__.__name__,
+            )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "predictions": self._predictions,
+            "confident": self._confident,
+            "confident_rate": (
+                round(self._confident / self._predictions, 4) if self._predictions else 0.0
+            ),
+            "logged_examples": len(self._logged),
+            "trainings": self._trainings,
+        }
+
+
+def create_local_classifier(config: LocalClassifierConfig) -> LocalRoutingClassifier | None:
+    if not config.enabled:
+        return None
+    if np is None:
+        get_logger(__name__).warning(
+            "routing.local_classifier is enabled but numpy is not installed; "
+            "install 'mobius[local-routing]'. Using the LLM classifier only."
+        )
+        return None
+    return LocalRoutingClassifier(config)
@@ -1,21 +1,41 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from time import perf_counter
 from typing import Any, AsyncIterator
 from uuid import uuid4
+from zoneinfo import ZoneInfo
 
-from mobius.api.schemas import ChatCompletionRequest, OpenAIMessage, latest_user_text
+from mobius.api.schemas import (
+    ChatCompletionRequest,
+    OpenAIMessage,
+    is_tool_continuation,
+    latest_user_text,
+    user_turn_key,
+)
 from mobius.config import AppConfig
 from mobius.logging_setup import get_logger
+from mobius.orchestration.context_budget import ContextBudgeter
+from mobius.orchestration.prompt_cache import PromptCacheUsage, prompt_cache_key
+from mobius.orchestration.response_cache import ResponseCache, response_cache_key
+from mobius.orchestration.routing_cache import RoutingDecisionCache, routing_cache_key
+from mobius.orchestration.routing_policy import ClassifierSkipPolicy
+from mobius.orchestration.semantic_cache import SemanticHit, create_semantic_cache
 from mobius.orchestration.session_store import StickySessionStore
-from mobius.orchestration.specialist_router import SpecialistRouter
+from mobius.orchestration.specialist_router import (
+    SpecialistRoute,
+    SpecialistRouter,
+    settled_route,
+)
 from mobius.orchestration.specialists import SpecialistProfile, get_specialist
+from mobius.prompts.assembly import SystemPromptAssembler
 from mobius.prompts.manager import PromptManager
+from mobius.providers.context_cache import CacheablePrefix
 from mobius.providers.litellm_router import LiteLLMRouter
 from mobius.runtime_context import timestamp_context_line
 
@@ -28,6 +48,8 @@ class RoutingDecision:
     route_model: str
     response_model: str
     orchestrator_model: str | None
+    reason: str = ""
+    settled: asyncio.Future[SpecialistRoute] | None = field(default=None, repr=False)
 
 
 SESSION_ID_FIELDS: tuple[str, ...] = (
@@ -40,6 +62,32 @@ SESSION_ID_FIELDS: tuple[str, ...] = (
 )
 
 
+# Request parameters that change what a correct answer looks like; a cached
+# plain-text answer cannot honour them.
+SEMANTIC_CACHE_BLOCKING_PARAMS: frozenset[str] = frozenset(
+    {
+        "tools",
+        "tool_choice",
+        "functions",
+        "function_call",
+        "parallel_tool_calls",
+        "response_format",
+        "max_tokens",
+        "max_completion_tokens",
+        "n",
+        "stop",
+        "seed",
+        "logprobs",
+        "top_logprobs",
+        "logit_bias",
+        "reasoning_effort",
+        "modalities",
+        "audio",
+        "prediction",
+    }
+)
+
+
 def _normalize_md_line(line: str) -> str:
     return line.strip().strip("*_ ").strip().lower()
 
@@ -132,12 +180,37 @@ class Orchestrator:
         specialist_router: SpecialistRouter,
         prompt_manager: PromptManager,
         session_store: StickySessionStore | None = None,
+        routing_cache: RoutingDecisionCache | None = None,
     ) -> None:
         self.config = config
         self.llm_router = llm_router
         self.specialist_router = specialist_router
         self.prompt_manager = prompt_manager
-        self.session_store = session_store or StickySessionStore(history_size=3)
+        self.prompt_assembler = SystemPromptAssembler(prompt_manager)
+        self._answered_by_prefixes: dict[tuple[str, str | None], str] = {}
+        skip_config = self.config.routing.skip_policy
+        self.session_store = session_store or StickySessionStore(
+            history_size=max(3, skip_config.min_stable_turns)
+        )
+        self.skip_policy = ClassifierSkipPolicy(skip_config)
+        self._background_tasks: set[asyncio.Task[None]] = set()
+        cache_config = self.config.routing.cache
+        self.routing_cache = routing_cache or RoutingDecisionCache(
+            max_entries=cache_config.max_entries,
+            ttl_seconds=cache_config.ttl_seconds,
+        )
+        self.response_cache = ResponseCache(self.config.response_cache)
+        self.semantic_cache = create_semantic_cache(self.config.semantic_cache)
+        self.prompt_cache_usage = PromptCacheUsage()
+        self.context_budget = ContextBudgeter(self.config.context_budget)
+        if self.context_budget.enabled:
+            self.context_budget.warm(
+                {item.model for item in self.config.specialists.by_domain.values()}
+            )
+        self._routing_timeouts = 0
+        self._routing_errors = 0
+        self._tool_continuations = 0
+        self._stream_recoveries = 0
         self.logger = get_logger(__name__)
         self.public_model_id = self.config.api.public_model_id
         self.allow_provider_model_passthrough = (
@@ -146,7 +219,9 @@ class Orchestrator:
         self.provider_model_ids = set(self.llm_router.list_models())
 
     def _timestamp_context_line(self) -> str:
-        return timestamp_context_line(self.config.runtime.timezone)
+        return timestamp_context_line(
+            self.config.runtime.timezone, self.config.runtime.timestamp_granularity
+        )
 
     @staticmethod
     def _first_user_text(messages: list[OpenAIMessage]) -> str:
@@ -189,6 +264,9 @@ class Orchestrator:
             return f"user:{user_id}:first:{digest}"
         return f"first:{digest}"
 
+    def _recent_domains(self, session_key: str | None) -> list[str]:
+        return self.session_store.recent_domains(session_key) if session_key else []
+
     async def _decide_routing(
         self,
         messages: list[OpenAIMessage],
@@ -196,18 +274,23 @@ class Orchestrator:
         session_key: str | None,
     ) -> RoutingDecision:
         user_text = latest_user_text(messages)
-        recent_domains = (
-            self.session_store.recent_domains(session_key) if session_key else []
-        )
+        recent_domains = self._recent_domains(session_key)
         current_domain = recent_domains[-1] if recent_domains else None
-        route = await self.specialist_router.classify(
+        continuation_route = self._tool_continuation_route(
+            messages, session_key, current_domain
+        )
+        if continuation_route is not None:
+            return self._decision_for_route(continuation_route, requested_model)
+        policy_route = self._skip_policy_route(user_text, session_key)
+        if policy_route is not None:
+            return self._decision_for_route(policy_route, requested_model)
+        route = await self._classify_within_deadline(
+            messages,
             user_text,
             current_domain=current_domain,
             recent_domains=recent_domains,
         )
         domain = route.domain
-        confidence = route.confidence
-        orchestrator_model = route.orchestrator_model
         if current_domain:
             if domain == current_domain:
                 self.logger.info(
@@ -222,7 +305,254 @@ class Orchestrator:
                     domain,
                     session_key,
                 )
+        return self._decision_for_route(route, requested_model)
+
+    def _tool_continuation_route(
+        self,
+        messages: list[OpenAIMessage],
+        session_key: str | None,
+        current_domain: str | None,
+    ) -> SpecialistRoute | None:
+        if not session_key or not is_tool_continuation(messages):
+            return None
+        turn_key = user_turn_key(messages)
+        domain = self.session_store.turn_domain(session_key, turn_key) if turn_key else None
+        # Without a record of this turn (for example after a restart) the sticky domain
+        # is the best available answer for a tool hop.
+        domain = domain or current_domain
+        if domain is None:
+            return None
+        self._tool_continuations += 1
+        self.logger.debug(
+            "Tool-call continuation reused domain=%s session=%s", domain, session_key
+        )
+        return SpecialistRoute(
+            domain=domain,
+            confidence=1.0,
+            reason="tool-continuation",
+            orchestrator_model=None,
+        )
+
+    def _skip_policy_route(
+        self,
+        user_text: str,
+        session_key: str | None,
+    ) -> SpecialistRoute | None:
+        if not session_key or not self.skip_policy.enabled:
+            return None
+        # Short explicit switch commands ("switch to health") must still switch.
+        switch_matcher = getattr(self.specialist_router, "switch_matcher", None)
+        if switch_matcher is not None and switch_matcher.match(user_text) is not None:
+            return None
+        stable = self.skip_policy.stable_domain(
+            user_text, self.session_store.recent_routes(session_key)
+        )
+        if stable is None:
+            return None
+        domain, confidence = stable
+        reason = "policy-deferred" if self.skip_policy.mode == "deferred" else "policy-skip"
+        self.logger.debug(
+            "Classifier skipped by policy domain=%s mode=%s session=%s",
+            domain,
+            self.skip_policy.mode,
+            session_key,
+        )
+        return SpecialistRoute(
+            domain=domain,
+            confidence=confidence,
+            reason=reason,
+            orchestrator_model=None,
+        )
+
+    def _remember_turn(
+        self,
+        request: ChatCompletionRequest,
+        session_key: str,
+        decision: RoutingDecision,
+    ) -> None:
+        turn_key = user_turn_key(request.messages)
+        settled = decision.settled
+        confidence = decision.confidence
+        if settled is not None and settled.done() and not settled.cancelled():
+            confidence = settled.result().confidence
+        self.session_store.remember_domain(
+            session_key,
+            decision.domain,
+            turn_key=turn_key,
+            confidence=confidence,
+        )
+        if settled is not None and not settled.done() and turn_key is not None:
+            settled.add_done_callback(
+                lambda final: final.cancelled()
+                or self.session_store.correct_turn(
+                    session_key, turn_key, decision.domain, final.result().confidence
+                )
+            )
+        if decision.reason != "policy-deferred" or turn_key is None:
+            return
+        # The response is already underway; the classifier only corrects the sticky
+        # state that the next turn will see.
+        task = asyncio.create_task(
+            self._deferred_classification(
+                list(request.messages), session_key, turn_key, decision.domain
+            )
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
+    async def _deferred_classification(
+        self,
+        messages: list[OpenAIMessage],
+        session_key: str,
+        turn_key: str,
+        assumed_domain: str,
+    ) -> None:
+        recent_domains = self._recent_domains(session_key)[:-1] or [assumed_domain]
+        try:
+            route = await self._classify_with_cache(
+                messages,
+                latest_user_text(messages),
+                current_domain=assumed_domain,
+                recent_domains=recent_domains,
+            )
+        except Exception as exc:
+            self.logger.debug(
+                "Deferred routing failed session=%s error=%s",
+                session_key,
+                exc.__class__.__name__,
+            )
+            return
+        if route.reason.startswith("orchestrator-error:"):
+            return
+        route = await settled_route(route)
+        corrected = self.session_store.correct_turn(
+            session_key, turn_key, route.domain, route.confidence
+        )
+        if corrected and route.domain != assumed_domain:
+            self.skip_policy.record_correction()
+            self.logger.info(
+                "Deferred routing corrected sticky domain=%s -> %s session=%s.",
+                assumed_domain,
+                route.domain,
+                session_key,
+            )
+
+    async def _classify_within_deadline(
+        self,
+        messages: list[OpenAIMessage],
+        user_text: str,
+        *,
+        current_domain: str | None,
+        recent_domains: list[str],
+    ) -> SpecialistRoute:
+        fallback_domain = current_domain or "general"
+        timeout_ms = self.config.runtime.routing_timeout_ms
+        try:
+            route = await asyncio.wait_for(
+                self._classify_with_cache(
+                    messages,
+                    user_text,
+                    current_domain=current_domain,
+                    recent_domains=recent_domains,
+                ),
+                timeout=timeout_ms / 1000 if timeout_ms else None,
+            )
+        except asyncio.TimeoutError:
+            self._routing_timeouts += 1
+            self.logger.warning(
+                "Routing deadline exceeded timeout_ms=%s; using domain=%s.",
+                timeout_ms,
+                fallback_domain,
+            )
+            return SpecialistRoute(
+                domain=fallback_domain,
+                confidence=0.0,
+                reason="routing-timeout",
+                orchestrator_model=None,
+            )
+
+        if route.reason.startswith("orchestrator-error:"):
+            self._routing_errors += 1
+            if current_domain:
+                # Keep session continuity instead of dropping to general.
+                self.logger.warning(
+                    "Routing failed (%s); keeping session domain=%s.",
+                    route.reason,
+                    current_domain,
+                )
+                return SpecialistRoute(
+                    domain=current_domain,
+                    confidence=0.0,
+                    reason=route.reason,
+                    orchestrator_model=None,
+                )
+        return route
+
+    async def _classify_with_cache(
+        self,
+        messages: list[OpenAIMessage],
+        user_text: str,
+        *,
+        current_domain: str | None,
+        recent_domains: list[str],
+    ) -> SpecialistRoute:
+        if not self.config.routing.cache.enabled:
+            return await self.specialist_router.classify(
+                user_text,
+                current_domain=current_domain,
+                recent_domains=recent_domains,
+            )
+
+        cache_key = routing_cache_key(messages, current_domain)
+        cached = self.routing_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug(
+                "Routing cache hit domain=%s confidence=%.2f",
+                cached.domain,
+                cached.confidence,
+            )
+            return cached
+
+        route = await self.specialist_router.classify(
+            user_text,
+            current_domain=current_domain,
+            recent_domains=recent_domains,
+        )
+        # Do not memoize failures; the next retry should reach the classifier again.
+        if route.orchestrator_model is None:
+            return route
+        if route.settled is None:
+            self.routing_cache.put(cache_key, route)
+        else:
+            # Early-committed streamed route: memoize it once its confidence is final.
+            route.settled.add_done_callback(
+                lambda settled: settled.cancelled()
+                or self.routing_cache.put(cache_key, settled.result())
+            )
+        return route
+
+    def routing_stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {
+            "cache": {
+                "enabled": self.config.routing.cache.enabled,
+                **self.routing_cache.stats(),
+            },
+            "timeouts": self._routing_timeouts,
+            "errors": self._routing_errors,
+            "tool_continuations": self._tool_continuations,
+            "skip_policy": self.skip_policy.stats(),
+        }
+        classifier_stats = getattr(self.specialist_router, "stats", None)
+        if callable(classifier_stats):
+            stats["classifier"] = classifier_stats()
+        return stats
+
+    def _decision_for_route(
+        self,
+        route: SpecialistRoute,
+        requested_model: str | None,
+    ) -> RoutingDecision:
+        domain = route.domain
         selected: list[SpecialistProfile] = []
         if domain != "general":
             selected = [get_specialist(domain)]
@@ -255,10 +585,12 @@ class Orchestrator:
         decision = RoutingDecision(
             selected=selected,
             domain=domain,
-            confidence=confidence,
+            confidence=route.confidence,
             route_model=route_model,
             response_model=response_model,
-            orchestrator_model=orchestrator_model,
+            orchestrator_model=route.orchestrator_model,
+            reason=route.reason,
+            settled=route.settled,
         )
         self.logger.debug(
             "Routing decision domain=%s confidence=%.2f specialists=%s route_model=%s response_model=%s orchestrator_model=%s requested_model=%s passthrough=%s",
@@ -273,20 +605,354 @@ class Orchestrator:
         )
         return decision
 
+    async def _route_and_call(
+        self,
+        request: ChatCompletionRequest,
+        session_key: str | None,
+        *,
+        stream: bool,
+        use_response_cache: bool = False,
+        failed_models: set[str] | None = None,
+    ) -> tuple[RoutingDecision, str, Any, bool]:
+        # The last item is True when the response was served from the response or
+        # semantic cache rather than a provider call.
+        passthrough = self._request_passthrough(request)
+        recent_domains = self._recent_domains(session_key)
+        sticky_domain = recent_domains[-1] if recent_domains else None
+        if (
+            not (self.config.routing.speculative_generation and sticky_domain)
+            or is_tool_continuation(request.messages)
+            or use_response_cache
+        ):
+            decision = await self._decide_routing(
+                request.messages, request.model, session_key
+            )
+            messages = self._build_orchestrated_messages(request, decision)
+            cache_key = (
+                self._response_cache_key(decision, messages, passthrough)
+                if use_response_cache
+                else None
+            )
+            if cache_key is not None:
+                cached = await self.response_cache.get(cache_key)
+                if cached is not None:
+                    self.logger.debug(
+                        "Response cache hit domain=%s model=%s",
+                        decision.domain,
+                        cached[0],
+                    )
+                    return decision, cached[0], cached[1], True
+            semantic_vector = await self._semantic_vector(request, decision)
+            if semantic_vector is not None:
+                hit = self.semantic_cache.lookup(  # type: ignore[union-attr]
+                    decision.domain, semantic_vector
+                )
+                if hit is not None:
+                    self.logger.info(
+                        "Semantic cache hit domain=%s similarity=%.3f",
+                        decision.domain,
+                        hit.similarity,
+                    )
+                    response = self._semantic_response(hit, stream)
+                    return decision, hit.model, response, True
+            used_model, response = await self.llm_router.chat_completion(
+                primary_model=decision.route_model,
+                messages=messages,
+                stream=stream,
+                passthrough=passthrough,
+                hedge=self._hedges(decision.domain, stream),
+                prompt_cache_key=self._prompt_cache_key(decision.domain, session_key),
+                cacheable_prefix=self._cacheable_prefix(decision),
+                failed_models=failed_models,
+            )
+            if cache_key is not None:
+                response = _chunk_to_dict(response)
+                if response.get("choices"):
+                    await self.response_cache.put(cache_key, used_model, response)
+            if semantic_vector is not None:
+                response = self._record_semantic_answer(
+                    request, decision, semantic_vector, used_model, response, stream
+                )
+            return decision, used_model, response, False
+
+        # Start the sticky-domain specialist call while the classifier runs; most
+        # follow-up turns keep their domain, so routing latency overlaps generation.
+        speculative = self._decision_for_route(
+            SpecialistRoute(
+                domain=sticky_domain,
+                confidence=0.0,
+                reason="speculative",
+                orchestrator_model=None,
+            ),
+            request.model,
+        )
+        speculative_task = asyncio.create_task(
+            self.llm_router.chat_completion(
+                primary_model=speculative.route_model,
+                messages=self._build_orchestrated_messages(request, speculative),
+                stream=stream,
+                passthrough=passthrough,
+                hedge=self._hedges(speculative.domain, stream),
+                prompt_cache_key=self._prompt_cache_key(speculative.domain, session_key),
+                cacheable_prefix=self._cacheable_prefix(speculative),
+                failed_models=failed_models,
+            )
+        )
+        try:
+            decision = await self._decide_routing(
+                request.messages, request.model, session_key
+            )
+        except BaseException:
+            await self._discard_speculative_call(speculative_task)
+            raise
+
+        if (
+            decision.domain == speculative.domain
+            and decision.route_model == speculative.route_model
+        ):
+            self.logger.debug(
+                "Speculative specialist call kept domain=%s model=%s",
+                decision.domain,
+                decision.route_model,
+            )
+            used_model, response = await speculative_task
+            return decision, used_model, response, False
+
+        self.logger.info(
+            "Speculative specialist call discarded domain=%s -> %s",
+            speculative.domain,
+            decision.domain,
+        )
+        await self._discard_speculative_call(speculative_task)
+        used_model, response = await self.llm_router.chat_completion(
+            primary_model=decision.route_model,
+            messages=self._build_orchestrated_messages(request, decision),
+            stream=stream,
+            passthrough=passthrough,
+            hedge=self._hedges(decision.domain, stream),
+            prompt_cache_key=self._prompt_cache_key(decision.domain, session_key),
+            cacheable_prefix=self._cacheable_prefix(decision),
+            failed_models=failed_models,
+        )
+        return decision, used_model, response, False
+
+    def _uses_response_cache(self, request: ChatCompletionRequest, bypass: bool) -> bool:
+        if not self.response_cache.enabled or request.stream or request.temperature != 0:
+            return False
+        if bypass:
+            self.response_cache.record_bypass()
+            return False
+        return True
+
+    def _response_cache_key(
+        self,
+        decision: RoutingDecision,
+        messages: list[dict[str, Any]],
+        passthrough: dict[str, Any],
+    ) -> str:
+        # The injected timestamp changes on every request; key on the prompt body
+        # and the current date instead.
+        keyed = list(messages)
+        keyed[0] = {
+            "role": "system",
+            "content": self.prompt_assembler.body(
+                tuple(specialist.domain for specialist in decision.selected)
+            ),
+        }
+        if self.config.runtime.inject_current_timestamp:
+            today = datetime.now(ZoneInfo(self.config.runtime.timezone)).date()
+            keyed.insert(0, {"role": "date", "content": today.isoformat()})
+        return response_cache_key(decision.route_model, keyed, passthrough)
+
+    async def _semantic_vector(
+        self,
+        request: ChatCompletionRequest,
+        decision: RoutingDecision,
+    ) -> list[float] | None:
+        if self.semantic_cache is None:
+            return None
+        # Provider-model passthrough routes answer as the requested provider model.
+        if decision.response_model != self.public_model_id:
+            return None
+        if not SEMANTIC_CACHE_BLOCKING_PARAMS.isdisjoint(self._request_passthrough(request)):
+            return None
+        specialist_cfg = self.config.specialists.by_domain.get(decision.domain)
+        if not (specialist_cfg and specialist_cfg.semantic_cache):
+            return None
+        if not self._is_first_user_prompt(request.messages):
+            return None
+        user_text = latest_user_text(request.messages).strip()
+        if not user_text:
+            return None
+        try:
+            _, vector = await self.llm_router.embedding(
+                primary_model=self.semantic_cache.embedding_model,
+                input_text=user_text,
+            )
+        except Exception as exc:
+            self.semantic_cache.record_embedding_error()
+            self.logger.warning(
+                "Semantic cache embedding failed model=%s error=%s",
+                self.semantic_cache.embedding_model,
+                exc.__class__.__name__,
+            )
+            return None
+        return vector
+
+    def _semantic_response(self, hit: SemanticHit, stream: bool) -> Any:
+        completion_id = f"chatcmpl-{uuid4().hex}"
+        created = int(datetime.now(timezone.utc).timestamp())
+        if not stream:
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": hit.model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": hit.answer},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+
+        async def replay() -> AsyncIterator[dict[str, Any]]:
+            for delta, finish_reason in (
+                ({"role": "assistant", "content": hit.answer}, None),
+                ({}, "stop"),
+            ):
+                yield {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": hit.model,
+                    "choices": [
+                        {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                    ],
+                }
+
+        return replay()
+
+    def _record_semantic_answer(
+        self,
+        request: ChatCompletionRequest,
+        decision: RoutingDecision,
+        vector: list[float],
+        used_model: str,
+        response: Any,
+        stream: bool,
+    ) -> Any:
+        cache = self.semantic_cache
+        if cache is None:
+            return response
+        question = latest_user_text(request.messages).strip()
+        if not stream:
+            response = _chunk_to_dict(response)
+            cache.store(
+                decision.domain,
+                question,
+                vector,
+                used_model,
+                self._extract_assistant_text(response),
+            )
+            return response
+
+        async def recording() -> AsyncIterator[Any]:
+            pieces: list[str] = []
+            async for chunk in response:
+                as_dict = _chunk_to_dict(chunk)
+                for choice in as_dict.get("choices") or []:
+                    content = (choice.get("delta") or {}).get("content")
+                    if isinstance(content, str):
+                        pieces.append(content)
+                yield as_dict
+            # Only streams that finished cleanly are cached.
+            cache.store(decision.domain, question, vector, used_model, "".join(pieces))
+
+        return recording()
+
+    @staticmethod
+    def _request_passthrough(request: ChatCompletionRequest) -> dict[str, Any]:
+        return request.model_dump(
+            exclude={"messages", "model", "stream"},
+            exclude_none=True,
+        )
+
+    def _cacheable_prefix(self, decision: RoutingDecision) -> CacheablePrefix | None:
+        if not self.config.models.context_cache.enabled:
+            return None
+        if (
+            self.config.runtime.inject_current_timestamp
+            and self.config.runtime.timestamp_position == "start"
+        ):
+            return None
+        return CacheablePrefix(
+            label=decision.domain,
+            text=self.prompt_assembler.body(
+                tuple(specialist.domain for specialist in decision.selected)
+            ),
+            version=self.prompt_manager.version,
+        )
+
+    def _prompt_cache_key(self, domain: str, session_key: str | None) -> str | None:
+        return prompt_cache_key(self.config.runtime.prompt_cache_key, domain, session_key)
+
+    def _context_budget_tokens(self, domain: str) -> int | None:
+        if not self.context_budget.enabled:
+            return None
+        specialist_cfg = self.config.specialists.by_domain.get(domain)
+        if specialist_cfg and specialist_cfg.max_context_tokens is not None:
+            return specialist_cfg.max_context_tokens
+        return self.config.context_budget.max_context_tokens
+
+    def _hedges(self, domain: str, stream: bool) -> bool:
+        if stream:
+            return False
+        specialist_cfg = self.config.specialists.by_domain.get(domain)
+        return bool(specialist_cfg and specialist_cfg.hedge)
+
+    async def _discard_speculative_call(self, task: asyncio.Task[Any]) -> None:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                # Only the child's cancellation is expected here; a cancellation of
+                # this request (client disconnect) must keep propagating.
+                current = asyncio.current_task()
+                if current is not None and current.cancelling():
+                    raise
+            except Exception:
+                pass
+            return
+        if task.cancelled() or task.exception() is not None:
+            return
+        # A finished streaming call holds an open upstream connection; close it.
+        _, response = task.result()
+        closer = getattr(response, "aclose", None)
+        if closer is None:
+            return
+        try:
+            await closer()
+        except Exception as exc:
+            self.logger.debug(
+                "Closing discarded speculative stream failed error=%s",
+                exc.__class__.__name__,
+            )
+
     def _build_system_prompt(self, selected: list[SpecialistProfile]) -> str:
-        if not selected:
-            prompt = self.prompt_manager.get("general")
-        else:
-            lines = [self.prompt_manager.get("orchestrator"), "", "Specialist instructions:"]
-            for specialist in selected:
-                lines.append(f"- {specialist.label} ({specialist.domain}):")
-                lines.append(self.prompt_manager.get(specialist.domain))
-            prompt = "\n".join(lines)
+        prompt = self.prompt_assembler.body(
+            tuple(specialist.domain for specialist in selected)
+        )
 
         if not self.config.runtime.inject_current_timestamp:
             return prompt
 
-        return f"{self._timestamp_context_line()}\n\n{prompt}"
+        if self.config.runtime.timestamp_position == "start":
+            return f"{self._timestamp_context_line()}\n\n{prompt}"
+        # The static prompt stays a byte-identical prefix for provider prompt caches.
+        return f"{prompt}\n\n{self._timestamp_context_line()}"
 
     @staticmethod
     def _default_display_name_for_domain(domain: str) -> str:
@@ -297,6 +963,14 @@ class Orchestrator:
         return label
 
     def _answered_by_prefix(self, domain: str, used_model: str | None) -> str:
+        key = (domain, used_model)
+        cached = self._answered_by_prefixes.get(key)
+        if cached is None:
+            cached = self._render_answered_by_prefix(domain, used_model)
+            self._answered_by_prefixes[key] = cached
+        return cached
+
+    def _render_answered_by_prefix(self, domain: str, used_model: str | None) -> str:
         attribution = self.config.api.attribution
         if not attribution.enabled:
             return ""
@@ -352,7 +1026,23 @@ class Orchestrator:
             if role == "assistant" and isinstance(content, str) and not content.strip():
                 continue
             messages.append(serialized)
-        return messages
+        budget = self._context_budget_tokens(decision.domain)
+        if budget is None:
+            return messages
+        fitted = self.context_budget.fit(messages, decision.route_model, budget)
+        if fitted.trimmed_tokens:
+            self.logger.info(
+                "Context budget trimmed domain=%s model=%s tokens=%d->%d budget=%d "
+                "dropped_messages=%d truncated_messages=%d",
+                decision.domain,
+                decision.route_model,
+                fitted.original_tokens,
+                fitted.kept_tokens,
+                budget,
+                fitted.dropped_messages,
+                fitted.truncated_messages,
+            )
+        return fitted.messages
 
     @staticmethod
     def _extract_assistant_text(response: dict[str, Any]) -> str:
@@ -361,7 +1051,12 @@ class Orchestrator:
         except Exception:
             return ""
 
-    async def complete_non_stream(self, request: ChatCompletionRequest) -> dict[str, Any]:
+    async def complete_non_stream(
+        self,
+        request: ChatCompletionRequest,
+        *,
+        bypass_cache: bool = False,
+    ) -> dict[str, Any]:
         started_at = perf_counter()
         user_text = latest_user_text(request.messages)
         self.logger.info(
@@ -375,20 +1070,17 @@ class Orchestrator:
         session_key = self._session_key_for_request(request)
         if session_key and self._is_first_user_prompt(request.messages):
             self.session_store.reset(session_key)
-        decision = await self._decide_routing(request.messages, request.model, session_key)
-        messages = self._build_orchestrated_messages(request, decision)
-
-        passthrough = request.model_dump(
-            exclude={"messages", "model", "stream"},
-            exclude_none=True,
-        )
-        used_model, raw_response = await self.llm_router.chat_completion(
-            primary_model=decision.route_model,
-            messages=messages,
+        decision, used_model, raw_response, from_cache = await self._route_and_call(
+            request,
+            session_key,
             stream=False,
-            passthrough=passthrough,
+            use_response_cache=self._uses_response_cache(request, bypass_cache),
         )
         response = _chunk_to_dict(raw_response)
+        if not from_cache:
+            # Cached replays carry the original call's usage; counting it again
+            # would inflate the provider prompt-cache hit rate.
+            self.prompt_cache_usage.observe(used_model, response.get("usage"))
         response["model"] = decision.response_model
         assistant_text = self._extract_assistant_text(response)
         augmented = self._answered_by_prefix(decision.domain, used_model) + assistant_text
@@ -397,7 +1089,7 @@ class Orchestrator:
         except Exception:
             pass
         if session_key:
-            self.session_store.remember_domain(session_key, decision.domain)
+            self._remember_turn(request, session_key, decision)
         self.logger.info(
             "Non-stream completion finished public_model=%s internal_model=%s elapsed_ms=%d",
             decision.response_model,
@@ -406,6 +1098,113 @@ class Orchestrator:
         )
         return response
 
+    def _continuation_model(
+        self, decision: RoutingDecision, tried: set[str], interrupted: str
+    ) -> str:
+        candidates = [decision.route_model, *self.config.models.fallbacks]
+        for model in candidates:
+            if model not in tried:
+                return model
+        # Nothing untried is left; the model that streamed before breaking is a
+        # better bet than one that failed to answer at all.
+        return interrupted
+
+    async def _recovering_stream(
+        self,
+        request: ChatCompletionRequest,
+        decision: RoutingDecision,
+        used_model: str,
+        stream: Any,
+        collected_assistant_chunks: list[str],
+        failed_models: set[str],
+    ) -> AsyncIterator[dict[str, Any]]:
+        # collected_assistant_chunks is filled by stream_sse between yields, so it
+        # holds everything already sent when the upstream stream fails.
+        recovery = self.config.models.stream_recovery
+        current_model = used_model
+        # Models that already failed for this request (for example the primary when
+        # the interrupted stream came from a fallback) are not candidates.
+        tried = {used_model, *failed_models}
+        attempts = 0
+        saw_tool_calls = False
+        continuing = False
+        while True:
+            try:
+                async for chunk in stream:
+                    as_dict = _chunk_to_dict(chunk)
+                    for choice in as_dict.get("choices") or []:
+                        delta = choice.get("delta") or {}
+                        saw_tool_calls = saw_tool_calls or bool(delta.get("tool_calls"))
+                        if continuing:
+                            delta.pop("role", None)
+                    yield as_dict
+                return
+            except Exception as exc:
+                # A half-streamed tool call cannot be continued as text.
+                if (
+                    not recovery.enabled
+                    or attempts >= recovery.max_attempts
+                    or saw_tool_calls
+                ):
+                    raise
+                attempts += 1
+                partial = "".join(collected_assistant_chunks)
+                next_model = self._continuation_model(decision, tried, current_model)
+                self.logger.warning(
+                    "Stream failed mid-response model=%s error=%s sent_chars=%d; "
+                    "continuing on model=%s attempt=%d",
+                    current_model,
+                    exc.__class__.__name__,
+                    len(partial),
+                    next_model,
+                    attempts,
+                )
+                messages = self._build_orchestrated_messages(request, decision)
+                if partial:
+                    messages.append({"role": "assistant", "content": partial})
+                    messages.append(
+                        {"role": "user", "content": recovery.continuation_prompt}
+                    )
+                current_model, stream = await self.llm_router.chat_completion(
+                    primary_model=next_model,
+                    messages=messages,
+                    stream=True,
+                    passthrough=self._request_passthrough(request),
+                    exclude_models=tried,
+                    failed_models=failed_models,
+                )
+                tried.update({current_model, *failed_models})
+                continuing = True
+                self._stream_recoveries += 1
+
+    def response_cache_stats(self) -> dict[str, Any]:
+        return self.response_cache.stats()
+
+    def prompt_cache_stats(self) -> dict[str, Any]:
+        return {
+            "key_mode": self.config.runtime.prompt_cache_key,
+            "timestamp_position": self.config.runtime.timestamp_position,
+            "models": self.prompt_cache_usage.stats(),
+        }
+
+    async def aclose(self) -> None:
+        if self.semantic_cache is not None:
+            await self.semantic_cache.flush()
+
+    def semantic_cache_stats(self) -> dict[str, Any]:
+        if self.semantic_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.semantic_cache.stats()}
+
+    def context_budget_stats(self) -> dict[str, Any]:
+        return self.context_budget.stats()
+
+    def stream_stats(self) -> dict[str, Any]:
+        return {
+            "recovery_enabled": self.config.models.stream_recovery.enabled,
+            "recoveries": self._stream_recoveries,
+        }
+
     async def stream_sse(self, request: ChatCompletionRequest) -> AsyncIterator[bytes]:
         started_at = perf_counter()
         user_text = latest_user_text(request.messages)
@@ -420,29 +1219,33 @@ class Orchestrator:
         session_key = self._session_key_for_request(request)
         if session_key and self._is_first_user_prompt(request.messages):
             self.session_store.reset(session_key)
-        decision = await self._decide_routing(request.messages, request.model, session_key)
-        messages = self._build_orchestrated_messages(request, decision)
-        passthrough = request.model_dump(
-            exclude={"messages", "model", "stream"},
-            exclude_none=True,
-        )
-        used_model, stream = await self.llm_router.chat_completion(
-            primary_model=decision.route_model,
-            messages=messages,
-            stream=True,
-            passthrough=passthrough,
+        failed_models: set[str] = set()
+        decision, used_model, stream, from_cache = await self._route_and_call(
+            request, session_key, stream=True, failed_models=failed_models
         )
         if session_key:
-            self.session_store.remember_domain(session_key, decision.domain)
+            self._remember_turn(request, session_key, decision)
 
         stream_id: str | None = None
         chunk_count = 0
         prefix = self._answered_by_prefix(decision.domain, used_model)
         prefix_pending = bool(prefix)
         collected_assistant_chunks: list[str] = []
-        async for chunk in stream:
-            as_dict = _chunk_to_dict(chunk)
+        async for as_dict in self._recovering_stream(
+            request,
+            decision,
+            used_model,
+            stream,
+            collected_assistant_chunks,
+            failed_models,
+        ):
             stream_id = stream_id or as_dict.get("id")
+            if as_dict.get("usage") and not from_cache:
+                # Present only when the client asked for stream_options.include_usage.
+                self.prompt_cache_usage.observe(used_model, as_dict["usage"])
+            if stream_id:
+                # Continuation chunks come from another upstream stream.
+                as_dict["id"] = stream_id
             chunk_count += 1
             try:
                 raw_delta = as_dict["choices"][0].get("delta", {})
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import hashlib
+from threading import Lock
+from typing import Any
+
+
+def prompt_cache_key(mode: str, domain: str, session_key: str | None) -> str | None:
+    if mode == "off":
+        return None
+    if mode == "session" and session_key:
+        digest = hashlib.sha256(session_key.encode("utf-8")).hexdigest()[:16]
+        return f"mobius:{domain}:{digest}"
+    return f"mobius:{domain}"
+
+
+def _field(container: Any, name: str) -> Any:
+    if isinstance(container, dict):
+        return container.get(name)
+    return getattr(container, name, None)
+
+
+def cached_prompt_tokens(usage: Any) -> tuple[int, int] | None:
+    prompt_tokens = _field(usage, "prompt_tokens")
+    if not prompt_tokens:
+        return None
+    details = _field(usage, "prompt_tokens_details")
+    cached = _field(details, "cached_tokens") if details is not None else None
+    if cached is None:
+        cached = _field(usage, "cache_read_input_tokens")
+    return int(prompt_tokens), int(cached or 0)
+
+
+class PromptCacheUsage:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._by_model: dict[str, list[int]] = {}
+
+    def observe(self, model: str, usage: Any) -> None:
+        counts = cached_prompt_tokens(usage) if usage is not None else None
+        if counts is None:
+            return
+        with self._lock:
+            totals = self._by_model.setdefault(model, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += counts[0]
+            totals[2] += counts[1]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            items = {model: list(totals) for model, totals in self._by_model.items()}
+        return {
+            model: {
+                "responses": responses,
+                "prompt_tokens": prompt_tokens,
+                "cached_tokens": cached_tokens,
+                "cached_ratio": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+            }
+            for model, (responses, prompt_tokens, cached_tokens) in sorted(items.items())
+        }
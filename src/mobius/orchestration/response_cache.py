@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Any
+
+from mobius.config import ResponseCacheConfig
+from mobius.logging_setup import get_logger
+
+DISK_PRUNE_EVERY = 64
+
+
+def response_cache_key(
+    route_model: str,
+    messages: list[dict[str, Any]],
+    passthrough: dict[str, Any],
+) -> str:
+    material = json.dumps(
+        {"model": route_model, "messages": messages, "params": passthrough},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, config: ResponseCacheConfig) -> None:
+        self.logger = get_logger(__name__)
+        self._config = config
+        # Entries are stored serialized so callers can mutate what they get back.
+        self._entries: OrderedDict[str, tuple[float, str, str]] = OrderedDict()
+        self._lock = Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._disk_writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def record_bypass(self) -> None:
+        self._bypassed += 1
+
+    def _expired(self, stored_at: float) -> bool:
+        return time() - stored_at > self._config.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, model: str, payload: str) -> None:
+        with self._lock:
+            self._entries[key] = (stored_at, model, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._config.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> tuple[str, dict[str, Any]] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+        if entry is not None:
+            return entry[1], json.loads(entry[2])
+
+        directory = self._config.disk_directory
+        if directory is not None:
+            stored = await asyncio.to_thread(self._read_disk, directory / f"{key}.json")
+            if stored is not None:
+                stored_at, model, payload = stored
+                self._remember(key, stored_at, model, payload)
+                self._disk_hits += 1
+                return model, json.loads(payload)
+        self._misses += 1
+        return None
+
+    async def put(self, key: str, model: str, response: dict[str, Any]) -> None:
+        stored_at = time()
+        payload = json.dumps(response, ensure_ascii=False, default=str)
+        self._remember(key, stored_at, model, payload)
+        directory = self._config.disk_directory
+        if directory is not None:
+            await asyncio.to_thread(self._write_disk, directory, key, stored_at, model, payload)
+
+    def _read_disk(self, path: Path) -> tuple[float, str, str] | None:
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            self.logger.debug(
+                "Response cache read failed: %s (%s).", path, exc.__class__.__name__
+            )
+            return None
+        stored_at = float(stored.get("stored_at") or 0.0)
+        if self._expired(stored_at):
+            path.unlink(missing_ok=True)
+            return None
+        return stored_at, str(stored["model"]), json.dumps(stored["response"])
+
+    def _write_disk(
+        self,
+        directory: Path,
+        key: str,
+        stored_at: float,
+        model: str,
+        payload: str,
+    ) -> None:
+        path = directory / f"{key}.json"
+        tmp_path = directory / f".{key}.tmp"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w", encoding="utf-8") as f:
+                f.write(
+                    f'{{"stored_at": {stored_at}, "model": {json.dumps(model)}, '
+                    f'"response": {payload}}}'
+                )
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            self.logger.warning(
+                "Response cache write failed: %s (%s).", path, exc.__class__.__name__
+            )
+            return
+        self._disk_writes += 1
+        if self._disk_writes % DISK_PRUNE_EVERY == 0:
+            self._prune_disk(directory)
+
+    def _prune_disk(self, directory: Path) -> None:
+        try:
+            files = sorted(directory.glob("*.json"), key=lambda item: item.stat().st_mtime)
+            excess = len(files) - self._config.max_disk_entries
+            for path in files[: max(0, excess)]:
+                path.unlink(missing_ok=True)
+        except OSError as exc:
+            self.logger.debug("Response cache prune failed (%s).", exc.__class__.__name__)
+
+    def stats(self) -> dict[str, Any]:
+        hits = self._memory_hits + self._disk_hits
+        lookups = hits + self._misses
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "enabled": self._config.enabled,
+            "memory_hits": self._memory_hits,
+            "disk_hits": self._disk_hits,
+            "misses": self._misses,
+            "bypassed": self._bypassed,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "size": size,
+            "disk": self._config.disk_directory is not None,
+        }
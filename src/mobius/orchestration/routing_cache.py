@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+from mobius.api.schemas import OpenAIMessage
+from mobius.orchestration.specialist_router import SpecialistRoute
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize_text(text: str) -> str:
+    return WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def routing_cache_key(
+    messages: list[OpenAIMessage],
+    current_domain: str | None,
+) -> str:
+    latest_index = -1
+    for idx in range(len(messages) - 1, -1, -1):
+        if messages[idx].role == "user":
+            latest_index = idx
+            break
+    latest_text = messages[latest_index].text_content() if latest_index >= 0 else ""
+    prefix = messages[:latest_index] if latest_index >= 0 else messages
+    prefix_digest = hashlib.sha256()
+    for message in prefix:
+        prefix_digest.update(message.role.encode("utf-8"))
+        prefix_digest.update(b"\x00")
+        prefix_digest.update(_normalize_text(message.text_content()).encode("utf-8"))
+        prefix_digest.update(b"\x00")
+    material = json.dumps(
+        [_normalize_text(latest_text), current_domain or "", prefix_digest.hexdigest()],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class RoutingDecisionCache:
+    def __init__(self, *, max_entries: int = 1024, ttl_seconds: float = 300.0) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = max(0.0, ttl_seconds)
+        self._entries: OrderedDict[str, tuple[float, SpecialistRoute]] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> SpecialistRoute | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, route = entry
+            if monotonic() - stored_at > self._ttl_seconds:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return route
+
+    def put(self, key: str, route: SpecialistRoute) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic(), route)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any
+
+from mobius.config import ClassifierSkipConfig
+
+
+class ClassifierSkipPolicy:
+    def __init__(self, config: ClassifierSkipConfig) -> None:
+        self._config = config
+        self._evaluated = 0
+        self._skipped = 0
+        self._deferred = 0
+        self._corrections = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    @property
+    def mode(self) -> str:
+        return self._config.mode
+
+    def stable_domain(
+        self,
+        user_text: str,
+        history: list[tuple[str, float | None]],
+    ) -> tuple[str, float] | None:
+        if not self.enabled:
+            return None
+        self._evaluated += 1
+        if len(user_text.strip()) > self._config.max_message_chars:
+            return None
+        depth = self._config.min_stable_turns
+        if len(history) < depth:
+            return None
+        recent = history[-depth:]
+        domain = recent[0][0]
+        confidences: list[float] = []
+        for item_domain, confidence in recent:
+            if item_domain != domain or confidence is None:
+                return None
+            if confidence < self._config.min_confidence:
+                return None
+            confidences.append(confidence)
+        if self.mode == "deferred":
+            self._deferred += 1
+        else:
+            self._skipped += 1
+        return domain, min(confidences)
+
+    def record_correction(self) -> None:
+        self._corrections += 1
+
+    def stats(self) -> dict[str, Any]:
+        gated = self._skipped + self._deferred
+        return {
+            "enabled": self._config.enabled,
+            "mode": self.mode,
+            "evaluated": self._evaluated,
+            "skipped": self._skipped,
+            "deferred": self._deferred,
+            "corrections": self._corrections,
+            "skip_rate": round(gated / self._evaluated, 4) if self._evaluated else 0.0,
+        }
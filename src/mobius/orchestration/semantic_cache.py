@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from threading import Lock
+from time import time
+from typing import Any
+
+from mobius.config import SemanticCacheConfig
+from mobius.logging_setup import get_logger
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional at runtime
+    np = None  # type: ignore[assignment]
+
+
+@dataclass(frozen=True)
+class SemanticHit:
+    question: str
+    answer: str
+    model: str
+    similarity: float
+
+
+def _normalized(vector: list[float]) -> Any:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else array
+
+
+class _VectorIndex:
+    def __init__(self, capacity: int, path_prefix: str | None) -> None:
+        self.capacity = capacity
+        self._path_prefix = path_prefix
+        self.dim = 0
+        self.size = 0
+        self._vectors: Any = None
+        self._stored_at = np.zeros(capacity, dtype=np.float64)
+        self._questions: list[str] = [""] * capacity
+        self._answers: list[str] = [""] * capacity
+        self._models: list[str] = [""] * capacity
+        # Metadata records not yet appended to the log, and the log's record count.
+        self._pending: list[dict[str, Any]] = []
+        self._log_records = 0
+        self._rewrite = True
+        if path_prefix is not None:
+            self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return f"{self._path_prefix}.f32"
+
+    @property
+    def _log_path(self) -> str:
+        return f"{self._path_prefix}.jsonl"
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending)
+
+    def _load(self) -> None:
+        try:
+            with open(self._log_path, encoding="utf-8") as handle:
+                lines = handle.read().splitlines()
+            header = json.loads(lines[0])
+        except (OSError, ValueError, IndexError):
+            return
+        if header.get("capacity") != self.capacity or not header.get("dim"):
+            # Capacity changed in config; start over rather than remap slots.
+            return
+        if not os.path.exists(self._vectors_path):
+            return
+        self.dim = int(header["dim"])
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim)
+        )
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+                slot = int(record["slot"])
+            except (ValueError, KeyError, TypeError):
+                # A torn last line from a crash mid-append.
+                continue
+            if not 0 <= slot < self.capacity:
+                continue
+            self._stored_at[slot] = record["stored_at"]
+            self._questions[slot] = record["question"]
+            self._answers[slot] = record["answer"]
+            self._models[slot] = record["model"]
+            self.size = max(self.size, slot + 1)
+            self._log_records += 1
+        self._rewrite = False
+
+    def _allocate(self, dim: int) -> None:
+        self.dim = dim
+        if self._path_prefix is None:
+            self._vectors = np.zeros((self.capacity, dim), dtype=np.float32)
+            return
+        os.makedirs(os.path.dirname(self._path_prefix) or ".", exist_ok=True)
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="w+", shape=(self.capacity, dim)
+        )
+        self._rewrite = True
+
+    def _record(self, slot: int) -> dict[str, Any]:
+        return {
+            "slot": slot,
+            "stored_at": float(self._stored_at[slot]),
+            "question": self._questions[slot],
+            "answer": self._answers[slot],
+            "model": self._models[slot],
+        }
+
+    def take_writes(self) -> tuple[list[dict[str, Any]], bool]:
+        # Called under the cache lock; the returned records are written off-loop.
+        records, self._pending = self._pending, []
+        rewrite = self._rewrite or self._log_records + len(records) > 2 * self.capacity
+        if rewrite:
+            # Compact: the log is rewritten with one record per live slot.
+            records = [self._record(slot) for slot in range(self.size)]
+            self._log_records = len(records)
+        else:
+            self._log_records += len(records)
+        self._rewrite = False
+        return records, rewrite
+
+    def restore_writes(self, records: list[dict[str, Any]], rewrite: bool) -> None:
+        if rewrite:
+            self._rewrite = True
+        else:
+            self._pending[:0] = records
+            self._log_records -= len(records)
+
+    def write(self, records: list[dict[str, Any]], rewrite: bool) -> None:
+        # Vectors reach disk before the metadata that points at them.
+        self._vectors.flush()
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        if not rewrite:
+            with open(self._log_path, "a", encoding="utf-8") as handle:
+                handle.write(lines)
+            return
+        header = json.dumps({"capacity": self.capacity, "dim": self.dim}) + "\n"
+        tmp_path = f"{self._log_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(header + lines)
+        os.replace(tmp_path, self._log_path)
+
+    def search(self, vector: Any, min_stored_at: float) -> tuple[int, float] | None:
+        if self.size == 0 or vector.shape[0] != self.dim:
+            return None
+        similarities = self._vectors[: self.size] @ vector
+        similarities[self._stored_at[: self.size] < min_stored_at] = -np.inf
+        slot = int(np.argmax(similarities))
+        best = float(similarities[slot])
+        if best == -np.inf:
+            return None
+        return slot, best
+
+    def entry(self, slot: int) -> tuple[str, str, str]:
+        return self._questions[slot], self._answers[slot], self._models[slot]
+
+    def insert(self, vector: Any, question: str, answer: str, model: str) -> bool:
+        if self._vectors is None:
+            self._allocate(vector.shape[0])
+        if vector.shape[0] != self.dim:
+            return False
+        if self.size < self.capacity:
+            slot = self.size
+            self.size += 1
+        else:
+            # Full: replace the oldest entry (expired ones are always older).
+            slot = int(np.argmin(self._stored_at))
+        self._vectors[slot] = vector
+        self._stored_at[slot] = time()
+        self._questions[slot] = question
+        self._answers[slot] = answer
+        self._models[slot] = model
+        if self._path_prefix is not None:
+            self._pending.append(self._record(slot))
+        return True
+
+    def live_entries(self, min_stored_at: float) -> int:
+        return int(np.count_nonzero(self._stored_at[: self.size] >= min_stored_at))
+
+
+class SemanticAnswerCache:
+    def __init__(self, config: SemanticCacheConfig) -> None:
+        if np is None:
+            raise RuntimeError("numpy is required for the semantic answer cache.")
+        self.logger = get_logger(__name__)
+        self._config = config
+        self._indexes: dict[str, _VectorIndex] = {}
+        self._lock = Lock()
+        self._lookups = 0
+        self._hits = 0
+        self._stores = 0
+        self._embedding_errors = 0
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    @property
+    def embedding_model(self) -> str:
+        return self._config.embedding_model
+
+    def _index(self, domain: str) -> _VectorIndex:
+        index = self._indexes.get(domain)
+        if index is None:
+            directory = self._config.index_directory
+            index = self._indexes[domain] = _VectorIndex(
+                self._config.max_entries_per_domain,
+                str(directory / domain) if directory is not None else None,
+            )
+        return index
+
+    def _min_stored_at(self) -> float:
+        return time() - self._config.ttl_seconds
+
+    def lookup(self, domain: str, vector: list[float]) -> SemanticHit | None:
+        query = _normalized(vector)
+        with self._lock:
+            self._lookups += 1
+            index = self._index(domain)
+            found = index.search(query, self._min_stored_at())
+            if found is None or found[1] < self._config.similarity_threshold:
+                return None
+            self._hits += 1
+            question, answer, model = index.entry(found[0])
+        return SemanticHit(question=question, answer=answer, model=model, similarity=found[1])
+
+    def store(
+        self,
+        domain: str,
+        question: str,
+        vector: list[float],
+        model: str,
+        answer: str,
+    ) -> None:
+        if not answer.strip():
+            return
+        with self._lock:
+            try:
+                stored = self._index(domain).insert(_normalized(vector), question, answer, model)
+            except OSError as exc:
+                self.logger.warning(
+                    "Semantic cache write failed domain=%s (%s).",
+                    domain,
+                    exc.__class__.__name__,
+                )
+                return
+            if stored:
+                self._stores += 1
+        if stored:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._config.index_directory is None:
+            return
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (offline tooling); the caller flushes explicitly.
+            return
+        self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._config.flush_interval_seconds)
+        await self.flush()
+
+    async def flush(self) -> None:
+        # Disk writes (memmap flush, metadata log append) run in a worker thread,
+        # batched over everything stored since the last flush.
+        async with self._flush_lock:
+            with self._lock:
+                writes = [
+                    (domain, index, *index.take_writes())
+                    for domain, index in self._indexes.items()
+                    if index.dirty
+                ]
+            for domain, index, records, rewrite in writes:
+                try:
+                    await asyncio.to_thread(index.write, records, rewrite)
+                except OSError as exc:
+                    self.logger.warning(
+                        "Semantic cache write failed domain=%s (%s).",
+                        domain,
+                        exc.__class__.__name__,
+                    )
+                    with self._lock:
+                        index.restore_writes(records, rewrite)
+
+    def record_embedding_error(self) -> None:
+        self._embedding_errors += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            min_stored_at = self._min_stored_at()
+            entries = {
+                domain: index.live_entries(min_stored_at)
+                for domain, index in sorted(self._indexes.items())
+            }
+        return {
+            "embedding_model": self._config.embedding_model,
+            "similarity_threshold": self._config.similarity_threshold,
+            "lookups": self._lookups,
+            "hits": self._hits,
+            "hit_rate": round(self._hits / self._lookups, 4) if self._lookups else 0.0,
+            "stores": self._stores,
+            "embedding_errors": self._embedding_errors,
+            "entries": entries,
+        }
+
+
+def create_semantic_cache(config: SemanticCacheConfig) -> SemanticAnswerCache | None:
+    if not config.enabled:
+        return None
+    if np is None:
+        get_logger(__name__).warning(
+            "semantic_cache is enabled but numpy is not installed; "
+            "install 'mobius[local-routing]'. Semantic cache is off."
+        )
+        return None
+    return SemanticAnswerCache(config)
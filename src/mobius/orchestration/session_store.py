@@ -8,12 +8,23 @@ class StickySessionStore:
     def __init__(self, *, history_size: int = 3, max_sessions: int = 4096) -> None:
         self._history_size = max(1, history_size)
         self._max_sessions = max(64, max_sessions)
-        self._domains_by_session: OrderedDict[str, deque[str]] = OrderedDict()
+        self._routes_by_session: OrderedDict[str, deque[tuple[str, float | None]]] = (
+            OrderedDict()
+        )
+        self._turns_by_session: dict[str, tuple[str, str]] = {}
         self._lock = Lock()
 
     def reset(self, session_key: str) -> None:
         with self._lock:
-            self._domains_by_session.pop(session_key, None)
+            self._routes_by_session.pop(session_key, None)
+            self._turns_by_session.pop(session_key, None)
+
+    def turn_domain(self, session_key: str, turn_key: str) -> str | None:
+        with self._lock:
+            turn = self._turns_by_session.get(session_key)
+        if turn is None or turn[0] != turn_key:
+            return None
+        return turn[1]
 
     def latest_domain(self, session_key: str) -> str | None:
         history = self.recent_domains(session_key)
@@ -21,22 +32,55 @@ class StickySessionStore:
             return None
         return history[-1]
 
-    def recent_domains(self, session_key: str) -> list[str]:
+    def recent_routes(self, session_key: str) -> list[tuple[str, float | None]]:
         with self._lock:
-            history = self._domains_by_session.get(session_key)
+            history = self._routes_by_session.get(session_key)
             if not history:
                 return []
             # Refresh LRU position.
-            self._domains_by_session.move_to_end(session_key)
+            self._routes_by_session.move_to_end(session_key)
             return list(history)
 
-    def remember_domain(self, session_key: str, domain: str) -> None:
+    def recent_domains(self, session_key: str) -> list[str]:
+        return [domain for domain, _ in self.recent_routes(session_key)]
+
+    def remember_domain(
+        self,
+        session_key: str,
+        domain: str,
+        *,
+        turn_key: str | None = None,
+        confidence: float | None = None,
+    ) -> None:
         with self._lock:
-            history = self._domains_by_session.get(session_key)
+            if turn_key is not None:
+                # Tool-loop hops of the same user turn must not flood the history.
+                if self._turns_by_session.get(session_key) == (turn_key, domain):
+                    return
+                self._turns_by_session[session_key] = (turn_key, domain)
+            history = self._routes_by_session.get(session_key)
             if history is None:
                 history = deque(maxlen=self._history_size)
-                self._domains_by_session[session_key] = history
-            history.append(domain)
-            self._domains_by_session.move_to_end(session_key)
-            while len(self._domains_by_session) > self._max_sessions:
-                self._domains_by_session.popitem(last=False)
+                self._routes_by_session[session_key] = history
+            history.append((domain, confidence))
+            self._routes_by_session.move_to_end(session_key)
+            while len(self._routes_by_session) > self._max_sessions:
+                evicted, _ = self._routes_by_session.popitem(last=False)
+                self._turns_by_session.pop(evicted, None)
+
+    def correct_turn(
+        self,
+        session_key: str,
+        turn_key: str,
+        domain: str,
+        confidence: float | None,
+    ) -> bool:
+        with self._lock:
+            turn = self._turns_by_session.get(session_key)
+            history = self._routes_by_session.get(session_key)
+            # Only the latest turn is corrected; a newer turn already superseded it.
+            if turn is None or turn[0] != turn_key or not history:
+                return False
+            history[-1] = (domain, confidence)
+            self._turns_by_session[session_key] = (turn_key, domain)
+            return True
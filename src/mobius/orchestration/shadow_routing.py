@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from mobius.config import ShadowRoutingConfig
+from mobius.logging_setup import get_logger
+from mobius.providers.latency import LatencyWindow
+
+if TYPE_CHECKING:
+    from mobius.orchestration.specialist_router import SpecialistRoute
+
+
+class ShadowRoutingRecorder:
+    def __init__(self, config: ShadowRoutingConfig, model: str) -> None:
+        self.logger = get_logger(__name__)
+        self._config = config
+        self.model = model
+        self._live_latency = LatencyWindow(size=config.latency_window)
+        self._shadow_latency = LatencyWindow(size=config.latency_window)
+        self._samples = 0
+        self._agreements = 0
+        self._errors = 0
+
+    def should_sample(self) -> bool:
+        return random.random() < self._config.sample_rate
+
+    async def record(
+        self,
+        live_route: SpecialistRoute,
+        live_seconds: float,
+        shadow_route: SpecialistRoute,
+        shadow_seconds: float,
+    ) -> None:
+        agreed = shadow_route.domain == live_route.domain
+        self._samples += 1
+        self._agreements += int(agreed)
+        self._live_latency.observe(live_seconds)
+        self._shadow_latency.observe(shadow_seconds)
+        if not agreed:
+            self.logger.debug(
+                "Shadow routing disagreed live=%s shadow=%s model=%s",
+                live_route.domain,
+                shadow_route.domain,
+                self.model,
+            )
+        await self._write(
+            {
+                "live_model": live_route.orchestrator_model,
+                "live_domain": live_route.domain,
+                "live_confidence": live_route.confidence,
+                "live_ms": round(live_seconds * 1000, 1),
+                "shadow_model": self.model,
+                "shadow_domain": shadow_route.domain,
+                "shadow_confidence": shadow_route.confidence,
+                "shadow_ms": round(shadow_seconds * 1000, 1),
+                "agreed": agreed,
+            }
+        )
+
+    async def record_error(
+        self,
+        live_route: SpecialistRoute,
+        live_seconds: float,
+        error: Exception,
+    ) -> None:
+        self._errors += 1
+        self.logger.debug(
+            "Shadow routing failed model=%s error=%s",
+            self.model,
+            error.__class__.__name__,
+        )
+        await self._write(
+            {
+                "live_model": live_route.orchestrator_model,
+                "live_domain": live_route.domain,
+                "live_ms": round(live_seconds * 1000, 1),
+                "shadow_model": self.model,
+                "error": error.__class__.__name__,
+            }
+        )
+
+    async def _write(self, entry: dict[str, Any]) -> None:
+        path = self._config.log_file
+        if path is None:
+            return
+        entry = {"timestamp": datetime.now(timezone.utc).isoformat(), **entry}
+        # File I/O stays off the event loop that serves live traffic.
+        await asyncio.to_thread(self._append, path, entry)
+
+    def _append(self, path: Path, entry: dict[str, Any]) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as exc:
+            self.logger.warning(
+                "Shadow routing log write failed: %s (%s).",
+                path,
+                exc.__class__.__name__,
+            )
+
+    @staticmethod
+    def _latency_ms(window: LatencyWindow, quantile: float) -> float | None:
+        value = window.percentile(quantile)
+        return round(value * 1000, 1) if value is not None else None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "sample_rate": self._config.sample_rate,
+            "samples": self._samples,
+            "errors": self._errors,
+            "agreements": self._agreements,
+            "agreement_rate": (
+                round(self._agreements / self._samples, 4) if self._samples else 0.0
+            ),
+            "live_latency_ms": {
+                "p50": self._latency_ms(self._live_latency, 0.5),
+                "p95": self._latency_ms(self._live_latency, 0.95),
+            },
+            "shadow_latency_ms": {
+                "p50": self._latency_ms(self._shadow_latency, 0.5),
+                "p95": self._latency_ms(self._shadow_latency, 0.95),
+            },
+        }
+
+
+def create_shadow_recorder(config: ShadowRoutingConfig) -> ShadowRoutingRecorder | None:
+    if not config.enabled:
+        return None
+    if not config.model:
+        get_logger(__name__).warning(
+            "routing.shadow is enabled but routing.shadow.model is not set; "
+            "shadow routing is off."
+        )
+        return None
+    return ShadowRoutingRecorder(config, config.model)
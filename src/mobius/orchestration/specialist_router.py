@@ -1,17 +1,109 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from time import perf_counter
 from typing import Any
 
 from mobius.config import AppConfig
 from mobius.logging_setup import get_logger
+from mobius.orchestration.classifier_batcher import (
+    ClassificationBatcher,
+    PendingClassification,
+)
+from mobius.orchestration.classifier_input import bounded_classifier_input
+from mobius.orchestration.label_protocol import (
+    label_confidence,
+    label_request_params,
+    parse_label,
+)
+from mobius.orchestration.local_classifier import (
+    LOCAL_CLASSIFIER_MODEL,
+    create_local_classifier,
+)
+from mobius.orchestration.shadow_routing import (
+    ShadowRoutingRecorder,
+    create_shadow_recorder,
+)
 from mobius.orchestration.specialists import SPECIALISTS, get_specialist, normalize_domain
+from mobius.orchestration.switch_matcher import ExplicitSwitchMatcher
+from mobius.providers.latency import LatencyWindow
 from mobius.providers.litellm_router import LiteLLMRouter
 from mobius.runtime_context import timestamp_context_line
 
 JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL | re.IGNORECASE)
+JSON_ARRAY_BLOCK_RE = re.compile(r"```(?:json)?\s*(\[.*?\])\s*```", re.DOTALL | re.IGNORECASE)
+SPECIALIST_FIELD_RE = re.compile(r'"specialist"\s*:\s*"([^"]*)"')
+CONTINUITY_POLICY = (
+    "Continuity policy:\n"
+    "- If current_domain is not none, prefer keeping that domain.\n"
+    "- Change domain only if the latest user message clearly requests a different "
+    "specialist/domain or shows a clear topic shift.\n"
+    "- Explicit switch examples include phrases like "
+    "'route to health specialist' or 'naj odgovori personal_development specialist'.\n"
+)
+SPECIALIST_LINES = "\n".join(
+    f"- {profile.domain}: {profile.routing_hint}" for profile in SPECIALISTS
+)
+# The routing prompts only depend on the static catalog, so everything except the
+# per-session continuity lines is assembled once at import time.
+ROUTING_PROMPT_HEAD = (
+    "You are the routing orchestrator for Mobius.\n"
+    "Your job: choose exactly ONE specialist for the latest user message.\n"
+    "Routing continuity context (from the active chat session):\n"
+)
+ROUTING_PROMPT_TAIL = (
+    f"{CONTINUITY_POLICY}"
+    "Always respond with ONLY a single JSON object and nothing else.\n"
+    "Do not include markdown, code fences, commentary, or extra keys.\n"
+    "JSON schema:\n"
+    '{'
+    '"specialist":"<one of allowed domains>",'
+    '"confidence":<float 0..1>,'
+    '"reason":"<short reason>"'
+    '}\n'
+    "If unsure, choose general.\n"
+    "Allowed specialists:\n"
+    f"{SPECIALIST_LINES}"
+)
+# Compact protocol: a bare domain label (or an enum-constrained object where the
+# provider supports response schemas) instead of a JSON object with a reason.
+LABEL_ROUTING_PROMPT_TAIL = (
+    f"{CONTINUITY_POLICY}"
+    "Always respond with ONLY the domain name of the chosen specialist, exactly as "
+    "written in the allowed list, and nothing else.\n"
+    "If unsure, respond with general.\n"
+    "Allowed specialists:\n"
+    f"{SPECIALIST_LINES}"
+)
+BATCH_ROUTING_SYSTEM_PROMPT = (
+    "You are the routing orchestrator for Mobius.\n"
+    "Your job: choose exactly ONE specialist for the latest user message of EACH "
+    "item. Items come from independent chat sessions.\n"
+    "Each item carries its own routing continuity context "
+    "(current_domain, recent_domains).\n"
+    f"{CONTINUITY_POLICY}"
+    "Always respond with ONLY a JSON array with one object per item and nothing "
+    "else.\n"
+    "Do not include markdown, code fences, commentary, or extra keys.\n"
+    "JSON schema:\n"
+    '[{'
+    '"id":<item id>,'
+    '"specialist":"<one of allowed domains>",'
+    '"confidence":<float 0..1>,'
+    '"reason":"<short reason>"'
+    '}]\n'
+    "If unsure, choose general.\n"
+    "Allowed specialists:\n"
+    f"{SPECIALIST_LINES}"
+)
+CONFIDENCE_FIELD_RE = re.compile(r'"confidence"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}]')
+# Upper bound on the background drain of an early-committed streamed route when
+# runtime.routing_timeout_ms is unset; a stalled tail must not hold the stream open.
+STREAMED_ROUTE_DRAIN_TIMEOUT_SECONDS = 10.0
 
 
 @dataclass(frozen=True)
@@ -20,6 +112,30 @@ class SpecialistRoute:
     confidence: float
     reason: str
     orchestrator_model: str | None
+    # Set on early-committed streamed routes; resolves to the same route with the
+    # confidence the classifier reported once its answer finished.
+    settled: asyncio.Future[SpecialistRoute] | None = field(
+        default=None, compare=False, repr=False
+    )
+
+
+async def settled_route(route: SpecialistRoute) -> SpecialistRoute:
+    if route.settled is None:
+        return route
+    await asyncio.wait([route.settled])
+    if route.settled.cancelled():
+        return route
+    return route.settled.result()
+
+
+async def _close_iterator(iterator: Any) -> None:
+    closer = getattr(iterator, "aclose", None)
+    if closer is None:
+        return
+    try:
+        await closer()
+    except Exception:
+        pass
 
 
 def _response_to_dict(chunk: Any) -> dict[str, Any]:
@@ -48,6 +164,70 @@ def _extract_text(response: dict[str, Any]) -> str:
     return ""
 
 
+@lru_cache(maxsize=512)
+def _routing_system_prompt(
+    current_domain_line: str,
+    recent_domains_line: str,
+    protocol: str = "json",
+) -> str:
+    tail = LABEL_ROUTING_PROMPT_TAIL if protocol == "label" else ROUTING_PROMPT_TAIL
+    return (
+        f"{ROUTING_PROMPT_HEAD}"
+        f"- current_domain: {current_domain_line}\n"
+        f"- recent_domains: {recent_domains_line}\n"
+        f"{tail}"
+    )
+
+
+def _extract_delta_text(chunk: dict[str, Any]) -> str:
+    try:
+        value = chunk["choices"][0].get("delta", {}).get("content")
+    except Exception:
+        return ""
+    return value if isinstance(value, str) else ""
+
+
+def _partial_routing_payload(text: str) -> dict[str, Any] | None:
+    specialist = SPECIALIST_FIELD_RE.search(text)
+    if specialist is None:
+        return None
+    payload: dict[str, Any] = {
+        "specialist": specialist.group(1),
+        "reason": "streamed-early-commit",
+    }
+    confidence = CONFIDENCE_FIELD_RE.search(text)
+    if confidence is not None:
+        payload["confidence"] = confidence.group(1)
+    return payload
+
+
+def _extract_json_items(text: str) -> dict[int, dict[str, Any]]:
+    candidate = text.strip()
+    match = JSON_ARRAY_BLOCK_RE.search(candidate)
+    if match:
+        candidate = match.group(1).strip()
+    else:
+        start = candidate.find("[")
+        end = candidate.rfind("]")
+        if start != -1 and end != -1 and end > start:
+            candidate = candidate[start : end + 1]
+    try:
+        loaded = json.loads(candidate)
+    except Exception:
+        return {}
+    if not isinstance(loaded, list):
+        return {}
+    items: dict[int, dict[str, Any]] = {}
+    for entry in loaded:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            items[int(entry.get("id"))] = entry
+        except (TypeError, ValueError):
+            continue
+    return items
+
+
 def _extract_json_payload(text: str) -> dict[str, Any]:
     candidate = text.strip()
     match = JSON_BLOCK_RE.search(candidate)
@@ -71,11 +251,425 @@ class SpecialistRouter:
         self.llm_router = llm_router
         self.logger = get_logger(__name__)
         self.allowed_domains = [profile.domain for profile in SPECIALISTS]
+        self.switch_matcher = (
+            ExplicitSwitchMatcher(
+                {
+                    domain: item.display_name
+                    for domain, item in config.specialists.by_domain.items()
+                }
+            )
+            if config.routing.explicit_switch
+            else None
+        )
+        self.local_classifier = create_local_classifier(config.routing.local_classifier)
+        self._retrain_task: asyncio.Task[None] | None = None
+        self._background_tasks: set[asyncio.Task[None]] = set()
+        self._latency = LatencyWindow(size=config.routing.hedging.latency_window)
+        self._hedges_fired = 0
+        self._hedges_won = 0
+        self.shadow = create_shadow_recorder(config.routing.shadow)
+        batching = config.routing.batching
+        self._batcher = (
+            ClassificationBatcher(
+                handler=self._classify_batch,
+                window_ms=batching.window_ms,
+                max_batch_size=batching.max_batch_size,
+            )
+            if batching.enabled
+            else None
+        )
+        if batching.enabled:
+            ignored = [
+                name
+                for name, active in (
+                    ("routing.protocol=label", config.routing.protocol == "label"),
+                    ("routing.hedging", config.routing.hedging.enabled),
+                )
+                if active
+            ]
+            if ignored:
+                # Multi-item batches are one JSON-array request on the candidate list;
+                # only batches of one go through the single-message path.
+                self.logger.warning(
+                    "Batched routing requests use the JSON protocol without hedging; "
+                    "%s only applies to single-item batches.",
+                    " and ".join(ignored),
+                )
 
     @property
     def model(self) -> str:
         return self.config.models.orchestrator
 
+    def _local_route(self, user_text: str, current_domain: str | None) -> SpecialistRoute | None:
+        if self.local_classifier is None:
+            return None
+        domain, confidence = self.local_classifier.predict(user_text)
+        if confidence < self.local_classifier.threshold:
+            self.logger.debug(
+                "Local classifier below threshold domain=%s confidence=%.2f",
+                domain,
+                confidence,
+            )
+            return None
+        # The local model only sees the bare message; switching away from the
+        # session's domain is left to the classifier, which sees continuity.
+        sticky_domain = normalize_domain(current_domain or "")
+        if sticky_domain in self.allowed_domains and domain != sticky_domain:
+            self.logger.debug(
+                "Local classifier deferred domain=%s confidence=%.2f sticky=%s",
+                domain,
+                confidence,
+                sticky_domain,
+            )
+            return None
+        self.logger.debug(
+            "Local classifier routed domain=%s confidence=%.2f", domain, confidence
+        )
+        return SpecialistRoute(
+            domain=domain,
+            confidence=confidence,
+            reason="local-classifier",
+            orchestrator_model=LOCAL_CLASSIFIER_MODEL,
+        )
+
+    def _record_for_local_classifier(
+        self,
+        user_text: str,
+        route: SpecialistRoute,
+        current_domain: str | None,
+    ) -> None:
+        classifier = self.local_classifier
+        if classifier is None or route.orchestrator_model is None:
+            return
+        if route.settled is not None:
+            route.settled.add_done_callback(
+                lambda settled: settled.cancelled()
+                or self._record_for_local_classifier(
+                    user_text, settled.result(), current_domain
+                )
+            )
+            return
+        if (
+            route.domain == normalize_domain(current_domain or "")
+            and len(user_text) <= classifier.follow_up_max_chars
+        ):
+            # Short follow-ups are labelled by session continuity rather than by
+            # their text; learning them would bind phrases like "ok do it" to a domain.
+            return
+        if not classifier.record(user_text, route.domain, route.confidence):
+            return
+        task = asyncio.create_task(
+            asyncio.to_thread(
+                classifier.append_training_log, user_text, route.domain, route.confidence
+            )
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        if not classifier.retrain_due:
+            return
+        if self._retrain_task is not None and not self._retrain_task.done():
+            return
+        self._retrain_task = asyncio.create_task(asyncio.to_thread(classifier.retrain))
+
+    def _route_from_payload(
+        self,
+        payload: dict[str, Any],
+        used_model: str,
+        user_text: str,
+    ) -> SpecialistRoute:
+        domain = normalize_domain(str(payload.get("specialist", "") or ""))
+        if domain not in self.allowed_domains:
+            self.logger.warning(
+                "Orchestrator returned invalid specialist '%s'; using general.", domain
+            )
+            return SpecialistRoute(
+                domain="general",
+                confidence=0.0,
+                reason="invalid-specialist",
+                orchestrator_model=used_model,
+            )
+        confidence_raw = payload.get("confidence", 0.0)
+        try:
+            confidence = float(confidence_raw)
+        except Exception:
+            confidence = 0.0
+        confidence = max(0.0, min(1.0, confidence))
+        reason = str(payload.get("reason", "") or "").strip()
+        chosen = get_specialist(domain)
+        self.logger.debug(
+            "Orchestrator routed domain=%s confidence=%.2f reason=%s model=%s",
+            chosen.domain,
+            confidence,
+            reason,
+            used_model,
+        )
+        return SpecialistRoute(
+            domain=chosen.domain,
+            confidence=confidence,
+            reason=reason,
+            orchestrator_model=used_model,
+        )
+
+    async def _classify_with_model(
+        self,
+        candidate_model: str,
+        messages: list[dict[str, Any]],
+        user_text: str,
+    ) -> SpecialistRoute:
+        if self.config.routing.protocol == "label":
+            return await self._classify_label(candidate_model, messages, user_text)
+        if self.config.routing.streaming_classifier:
+            return await self._classify_streaming(candidate_model, messages, user_text)
+        return await self._classify_json(candidate_model, messages, user_text)
+
+    async def _classify_json(
+        self,
+        candidate_model: str,
+        messages: list[dict[str, Any]],
+        user_text: str,
+    ) -> SpecialistRoute:
+        # Keep orchestrator call minimal because some models reject optional
+        # generation params like temperature/max_tokens.
+        used_model, raw = await self.llm_router.chat_completion(
+            primary_model=candidate_model,
+            messages=messages,
+            stream=False,
+            passthrough=None,
+            include_fallbacks=False,
+        )
+        parsed = _response_to_dict(raw)
+        text = _extract_text(parsed)
+        payload = _extract_json_payload(text)
+        return self._route_from_payload(payload, used_model, user_text)
+
+    async def _classify_label(
+        self,
+        candidate_model: str,
+        messages: list[dict[str, Any]],
+        user_text: str,
+    ) -> SpecialistRoute:
+        label_config = self.config.routing.label
+        used_model, raw = await self.llm_router.chat_completion(
+            primary_model=candidate_model,
+            messages=messages,
+            stream=False,
+            passthrough=label_request_params(candidate_model, label_config),
+            include_fallbacks=False,
+        )
+        parsed = _response_to_dict(raw)
+        confidence = label_confidence(parsed)
+        payload = {
+            "specialist": parse_label(_extract_text(parsed)),
+            "confidence": (
+                confidence if confidence is not None else label_config.unscored_confidence
+            ),
+            "reason": "label-logprob" if confidence is not None else "label",
+        }
+        return self._route_from_payload(payload, used_model, user_text)
+
+    async def _timed_classify(
+        self,
+        candidate_model: str,
+        messages: list[dict[str, Any]],
+        user_text: str,
+    ) -> SpecialistRoute:
+        started_at = perf_counter()
+        route = await self._classify_with_model(candidate_model, messages, user_text)
+        self._latency.observe(perf_counter() - started_at)
+        return route
+
+    def _hedge_delay_seconds(self) -> float:
+        hedging = self.config.routing.hedging
+        observed = self._latency.percentile(hedging.delay_percentile)
+        delay_ms = observed * 1000 if observed is not None else hedging.initial_delay_ms
+        delay_ms = max(hedging.min_delay_ms, min(hedging.max_delay_ms, delay_ms))
+        return delay_ms / 1000
+
+    async def _classify_hedged(
+        self,
+        candidates: list[str],
+        messages: list[dict[str, Any]],
+        user_text: str,
+    ) -> SpecialistRoute:
+        delay = self._hedge_delay_seconds()
+        tasks: dict[asyncio.Task[SpecialistRoute], str] = {}
+
+        def launch(model: str) -> None:
+            task = asyncio.create_task(self._timed_classify(model, messages, user_text))
+            tasks[task] = model
+
+        launch(candidates[0])
+        next_index = 1
+        pending: set[asyncio.Task[SpecialistRoute]] = set(tasks)
+        invalid_route: SpecialistRoute | None = None
+        last_error: Exception | None = None
+        try:
+            while pending or next_index < len(candidates):
+                if not pending:
+                    launch(candidates[next_index])
+                    pending = {task for task in tasks if not task.done()}
+                    next_index += 1
+                timeout = delay if next_index < len(candidates) else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self._hedges_fired += 1
+                    self.logger.info(
+                        "Routing hedge fired after %dms model=%s",
+                        int(delay * 1000),
+                        candidates[next_index],
+                    )
+                    launch(candidates[next_index])
+                    pending = {task for task in tasks if not task.done()}
+                    next_index += 1
+                    continue
+                for task in done:
+                    model = tasks[task]
+                    error = task.exception()
+                    if error is not None:
+                        last_error = error if isinstance(error, Exception) else None
+                        self.logger.warning(
+                            "Orchestrator routing failed model=%s error=%s",
+                            model,
+                            error.__class__.__name__,
+                        )
+                        continue
+                    route = task.result()
+                    if route.reason == "invalid-specialist":
+                        invalid_route = invalid_route or route
+                        continue
+                    if model != candidates[0]:
+                        self._hedges_won += 1
+                    return route
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if invalid_route is not None:
+            return invalid_route
+        raise last_error or RuntimeError("No routing candidates answered.")
+
+    def stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {
+            "hedging": {
+                "enabled": self.config.routing.hedging.enabled,
+                "fired": self._hedges_fired,
+                "won": self._hedges_won,
+                "delay_ms": int(self._hedge_delay_seconds() * 1000),
+            },
+        }
+        if self._batcher is not None:
+            stats["batching"] = self._batcher.stats()
+        if self.local_classifier is not None:
+            stats["local_classifier"] = self.local_classifier.stats()
+        if self.shadow is not None:
+            stats["shadow"] = self.shadow.stats()
+        return stats
+
+    async def _classify_streaming(
+        self,
+        candidate_model: str,
+        messages: list[dict[str, Any]],
+        user_text: str,
+    ) -> SpecialistRoute:
+        used_model, stream = await self.llm_router.chat_completion(
+            primary_model=candidate_model,
+            messages=messages,
+            stream=True,
+            passthrough=None,
+            include_fallbacks=False,
+        )
+        iterator = stream.__aiter__()
+        buffer: list[str] = []
+        while True:
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            piece = _extract_delta_text(_response_to_dict(chunk))
+            if not piece:
+                continue
+            buffer.append(piece)
+            early_payload = _partial_routing_payload("".join(buffer))
+            if early_payload is None:
+                continue
+            # Commit as soon as the specialist value is complete; the remaining
+            # confidence/reason tokens are drained in the background and the final
+            # confidence is published through route.settled.
+            route = replace(
+                self._route_from_payload(early_payload, used_model, user_text),
+                settled=asyncio.get_running_loop().create_future(),
+            )
+            task = asyncio.create_task(
+                self._finish_streamed_route(iterator, buffer, route, used_model, user_text)
+            )
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+            return route
+
+        payload = _extract_json_payload("".join(buffer))
+        return self._route_from_payload(payload, used_model, user_text)
+
+    async def _finish_streamed_route(
+        self,
+        iterator: Any,
+        buffer: list[str],
+        early_route: SpecialistRoute,
+        used_model: str,
+        user_text: str,
+    ) -> None:
+        settled = early_route.settled
+
+        async def drain() -> None:
+            async for chunk in iterator:
+                piece = _extract_delta_text(_response_to_dict(chunk))
+                if piece:
+                    buffer.append(piece)
+
+        timeout_ms = self.config.runtime.routing_timeout_ms
+        timeout = timeout_ms / 1000 if timeout_ms else STREAMED_ROUTE_DRAIN_TIMEOUT_SECONDS
+        try:
+            try:
+                await asyncio.wait_for(drain(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.logger.debug(
+                    "Streamed routing tail timed out model=%s timeout_s=%.3f",
+                    used_model,
+                    timeout,
+                )
+                await _close_iterator(iterator)
+                return
+            payload = _extract_json_payload("".join(buffer))
+            final_route = self._route_from_payload(payload, used_model, user_text)
+            confidence = final_route.confidence
+            if final_route.domain != early_route.domain:
+                self.logger.warning(
+                    "Streamed routing payload changed after early commit domain=%s -> %s",
+                    early_route.domain,
+                    final_route.domain,
+                )
+                # The committed domain is not what the classifier settled on.
+                confidence = 0.0
+            if settled is not None:
+                settled.set_result(
+                    replace(
+                        early_route,
+                        confidence=confidence,
+                        reason=final_route.reason,
+                        settled=None,
+                    )
+                )
+        except Exception as exc:
+            self.logger.debug(
+                "Streamed routing tail failed model=%s error=%s",
+                used_model,
+                exc.__class__.__name__,
+            )
+        finally:
+            if settled is not None and not settled.done():
+                settled.cancel()
+
     async def classify(
         self,
         latest_user_text: str,
@@ -92,6 +686,42 @@ class SpecialistRouter:
                 orchestrator_model=None,
             )
 
+        if self.switch_matcher is not None:
+            switched_domain = self.switch_matcher.match(user_text)
+            if switched_domain is not None:
+                self.logger.debug("Explicit switch command routed domain=%s", switched_domain)
+                return SpecialistRoute(
+                    domain=switched_domain,
+                    confidence=1.0,
+                    reason="explicit-switch",
+                    orchestrator_model=None,
+                )
+
+        # Long pastes (logs, configs) are cut to a bounded excerpt so classifier
+        # tokens and latency do not grow with the message size.
+        user_text = bounded_classifier_input(user_text, self.config.routing.input)
+
+        local_route = self._local_route(user_text, current_domain)
+        if local_route is not None:
+            return local_route
+
+        if self._batcher is not None:
+            return await self._batcher.submit(
+                user_text,
+                current_domain=current_domain,
+                recent_domains=list(recent_domains or []),
+            )
+        return await self._classify_llm(
+            user_text,
+            current_domain=current_domain,
+            recent_domains=recent_domains,
+        )
+
+    def _continuity_lines(
+        self,
+        current_domain: str | None,
+        recent_domains: list[str] | None,
+    ) -> tuple[str, str]:
         normalized_recent_domains: list[str] = []
         for domain in recent_domains or []:
             normalized = normalize_domain(str(domain))
@@ -111,54 +741,160 @@ class SpecialistRouter:
         recent_domains_line = (
             ", ".join(normalized_recent_domains) if normalized_recent_domains else "none"
         )
-        specialist_lines = "\n".join(
-            f"- {profile.domain}: {profile.routing_hint}" for profile in SPECIALISTS
-        )
-        system_prompt = (
-            "You are the routing orchestrator for Mobius.\n"
-            "Your job: choose exactly ONE specialist for the latest user message.\n"
-            "Routing continuity context (from the active chat session):\n"
-            f"- current_domain: {current_domain_line}\n"
-            f"- recent_domains: {recent_domains_line}\n"
-            "Continuity policy:\n"
-            "- If current_domain is not none, prefer keeping that domain.\n"
-            "- Change domain only if the latest user message clearly requests a different "
-            "specialist/domain or shows a clear topic shift.\n"
-            "- Explicit switch examples include phrases like "
-            "'route to health specialist' or 'naj odgovori personal_development specialist'.\n"
-            "Always respond with ONLY a single JSON object and nothing else.\n"
-            "Do not include markdown, code fences, commentary, or extra keys.\n"
-            "JSON schema:\n"
-            '{'
-            '"specialist":"<one of allowed domains>",'
-            '"confidence":<float 0..1>,'
-            '"reason":"<short reason>"'
-            '}\n'
-            "If unsure, choose general.\n"
-            "Allowed specialists:\n"
-            f"{specialist_lines}"
-        )
+        return current_domain_line, recent_domains_line
+
+    def _with_routing_timestamp(self, system_prompt: str) -> str:
         if (
             self.config.runtime.inject_current_timestamp
             and self.config.runtime.include_timestamp_in_routing
         ):
-            system_prompt = (
+            return (
                 f"{timestamp_context_line(self.config.runtime.timezone)}\n\n"
                 f"{system_prompt}"
             )
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_text},
-        ]
+        return system_prompt
+
+    def _candidate_models(self) -> list[str]:
         candidates: list[str] = [self.model]
         if self.model.startswith("gpt-") and "/" not in self.model:
             candidates.append(f"openai/{self.model}")
+        return candidates
+
+    async def _classify_llm(
+        self,
+        user_text: str,
+        *,
+        current_domain: str | None,
+        recent_domains: list[str] | None,
+    ) -> SpecialistRoute:
+        messages = self._routing_messages(user_text, current_domain, recent_domains)
+        started_at = perf_counter()
+        route = await self._classify_live(messages, user_text)
+        self._record_for_local_classifier(user_text, route, current_domain)
+        if self.shadow is not None and route.orchestrator_model is not None:
+            self._start_shadow(messages, user_text, route, perf_counter() - started_at)
+        return route
+
+    def _routing_messages(
+        self,
+        user_text: str,
+        current_domain: str | None,
+        recent_domains: list[str] | None,
+    ) -> list[dict[str, Any]]:
+        current_domain_line, recent_domains_line = self._continuity_lines(
+            current_domain, recent_domains
+        )
+        system_prompt = _routing_system_prompt(
+            current_domain_line, recent_domains_line, self.config.routing.protocol
+        )
+        return [
+            {"role": "system", "content": self._with_routing_timestamp(system_prompt)},
+            {"role": "user", "content": user_text},
+        ]
+
+    async def _classify_live(
+        self,
+        messages: list[dict[str, Any]],
+        user_text: str,
+    ) -> SpecialistRoute:
+        candidates = self._candidate_models()
+        hedging = self.config.routing.hedging
+        if hedging.enabled:
+            if hedging.backup_model and hedging.backup_model not in candidates:
+                candidates.append(hedging.backup_model)
+            try:
+                return await self._classify_hedged(candidates, messages, user_text)
+            except Exception as exc:
+                return self._error_route(exc)
 
         last_error: Exception | None = None
         for candidate_model in candidates:
             try:
-                # Keep orchestrator call minimal because some models reject optional
-                # generation params like temperature/max_tokens.
+                return await self._timed_classify(candidate_model, messages, user_text)
+            except Exception as exc:
+                last_error = exc
+                self.logger.warning(
+                    "Orchestrator routing failed model=%s error=%s",
+                    candidate_model,
+                    exc.__class__.__name__,
+                )
+                self.logger.debug("Orchestrator routing details: %s", str(exc))
+
+        return self._error_route(last_error)
+
+    def _start_shadow(
+        self,
+        messages: list[dict[str, Any]],
+        user_text: str,
+        live_route: SpecialistRoute,
+        live_seconds: float,
+    ) -> None:
+        shadow = self.shadow
+        if shadow is None or not shadow.should_sample():
+            return
+        task = asyncio.create_task(
+            self._run_shadow(shadow, messages, user_text, live_route, live_seconds)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _run_shadow(
+        self,
+        shadow: ShadowRoutingRecorder,
+        messages: list[dict[str, Any]],
+        user_text: str,
+        live_route: SpecialistRoute,
+        live_seconds: float,
+    ) -> None:
+        model = shadow.model
+        started_at = perf_counter()
+        try:
+            if self.config.routing.protocol == "label":
+                route = await self._classify_label(model, messages, user_text)
+            else:
+                route = await self._classify_json(model, messages, user_text)
+        except Exception as exc:
+            await shadow.record_error(live_route, live_seconds, exc)
+            return
+        await shadow.record(live_route, live_seconds, route, perf_counter() - started_at)
+
+    async def _classify_batch(
+        self, items: list[PendingClassification]
+    ) -> list[SpecialistRoute]:
+        if len(items) == 1:
+            item = items[0]
+            return [
+                await self._classify_llm(
+                    item.user_text,
+                    current_domain=item.current_domain,
+                    recent_domains=item.recent_domains,
+                )
+            ]
+
+        batch_items: list[dict[str, Any]] = []
+        for idx, item in enumerate(items, start=1):
+            current_domain_line, recent_domains_line = self._continuity_lines(
+                item.current_domain, item.recent_domains
+            )
+            batch_items.append(
+                {
+                    "id": idx,
+                    "current_domain": current_domain_line,
+                    "recent_domains": recent_domains_line,
+                    "message": item.user_text,
+                }
+            )
+        system_prompt = BATCH_ROUTING_SYSTEM_PROMPT
+        messages = [
+            {"role": "system", "content": self._with_routing_timestamp(system_prompt)},
+            {"role": "user", "content": json.dumps(batch_items, ensure_ascii=False)},
+        ]
+
+        payloads: dict[int, dict[str, Any]] = {}
+        used_model: str | None = None
+        started_at = perf_counter()
+        for candidate_model in self._candidate_models():
+            try:
                 used_model, raw = await self.llm_router.chat_completion(
                     primary_model=candidate_model,
                     messages=messages,
@@ -166,51 +902,63 @@ class SpecialistRouter:
                     passthrough=None,
                     include_fallbacks=False,
                 )
-                parsed = _response_to_dict(raw)
-                text = _extract_text(parsed)
-                payload = _extract_json_payload(text)
-                domain = normalize_domain(str(payload.get("specialist", "") or ""))
-                if domain not in self.allowed_domains:
-                    self.logger.warning(
-                        "Orchestrator returned invalid specialist '%s'; using general.", domain
-                    )
-                    return SpecialistRoute(
-                        domain="general",
-                        confidence=0.0,
-                        reason="invalid-specialist",
-                        orchestrator_model=used_model,
-                    )
-                confidence_raw = payload.get("confidence", 0.0)
-                try:
-                    confidence = float(confidence_raw)
-                except Exception:
-                    confidence = 0.0
-                confidence = max(0.0, min(1.0, confidence))
-                reason = str(payload.get("reason", "") or "").strip()
-                chosen = get_specialist(domain)
-                self.logger.debug(
-                    "Orchestrator routed domain=%s confidence=%.2f reason=%s model=%s",
-                    chosen.domain,
-                    confidence,
-                    reason,
-                    used_model,
-                )
-                return SpecialistRoute(
-                    domain=chosen.domain,
-                    confidence=confidence,
-                    reason=reason,
-                    orchestrator_model=used_model,
-                )
+                payloads = _extract_json_items(_extract_text(_response_to_dict(raw)))
+                break
             except Exception as exc:
-                last_error = exc
                 self.logger.warning(
-                    "Orchestrator routing failed model=%s error=%s",
+                    "Batched orchestrator routing failed model=%s size=%d error=%s",
                     candidate_model,
+                    len(items),
                     exc.__class__.__name__,
                 )
-                self.logger.debug("Orchestrator routing details: %s", str(exc))
+                self.logger.debug("Batched routing details: %s", str(exc))
+
+        routes: list[SpecialistRoute | None] = []
+        for idx, item in enumerate(items, start=1):
+            payload = payloads.get(idx)
+            if payload is None or used_model is None:
+                routes.append(None)
+                continue
+            route = self._route_from_payload(payload, used_model, item.user_text)
+            self._record_for_local_classifier(item.user_text, route, item.current_domain)
+            if self.shadow is not None:
+                # The shadow model sees the single-message request the item would
+                # have sent on its own, so agreement stays comparable.
+                self._start_shadow(
+                    self._routing_messages(
+                        item.user_text, item.current_domain, item.recent_domains
+                    ),
+                    item.user_text,
+                    route,
+                    perf_counter() - started_at,
+                )
+            routes.append(route)
+
+        # Items the batch answer did not cover are classified on their own.
+        missing = [idx for idx, route in enumerate(routes) if route is None]
+        if missing:
+            self.logger.info(
+                "Batched routing missing %d of %d items; classifying individually.",
+                len(missing),
+                len(items),
+            )
+            singles = await asyncio.gather(
+                *(
+                    self._classify_llm(
+                        items[idx].user_text,
+                        current_domain=items[idx].current_domain,
+                        recent_domains=items[idx].recent_domains,
+                    )
+                    for idx in missing
+                )
+            )
+            for idx, route in zip(missing, singles):
+                routes[idx] = route
+        return [route for route in routes if route is not None]
 
-        error_name = last_error.__class__.__name__ if last_error else "UnknownError"
+    @staticmethod
+    def _error_route(error: Exception | None) -> SpecialistRoute:
+        error_name = error.__class__.__name__ if error else "UnknownError"
         return SpecialistRoute(
             domain="general",
             confidence=0.0,
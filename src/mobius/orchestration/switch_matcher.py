@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Mapping
+
+from mobius.specialist_catalog import SPECIALIST_CATALOG, normalize_domain
+
+# Slovenian domain names users type in explicit switch commands.
+SLOVENIAN_DOMAIN_ALIASES: dict[str, tuple[str, ...]] = {
+    "general": ("splošni", "splosni", "splošno", "splosno"),
+    "health": ("zdravje", "zdravstveni", "zdravnik"),
+    "parenting": ("starševstvo", "starsevstvo", "starševski", "starsevski"),
+    "relationships": ("odnosi", "partnerski odnosi", "odnose"),
+    "homelab": ("domači lab", "domaci lab"),
+    "personal_development": ("osebni razvoj", "osebnostni razvoj"),
+}
+
+SPECIALIST_NOUN = r"\s+(?:specialist|specialista|specialistu|expert|agent|strokovnjak|strokovnjaka)"
+OPTIONAL_SPECIALIST_NOUN = f"(?:{SPECIALIST_NOUN})?"
+# Command phrasings that also occur in ordinary sentences ("ask general questions",
+# "switch to general anesthesia"). They count as a switch only when the alias is
+# followed by a specialist noun, or when the whole message is the command.
+COMMAND_PREFIXES: tuple[str, ...] = (
+    # English: "route to health specialist", "switch me over to the mentor".
+    r"(?:route|switch|send|hand|pass|transfer|redirect|move)"
+    r"(?:\s+(?:me|this|it|us|over|back|the\s+conversation|the\s+chat))*"
+    r"\s+to\s+(?:the\s+)?",
+    # English: "ask the tinkerer", "talk to the health specialist".
+    r"(?:ask|talk\s+to|speak\s+(?:to|with))\s+(?:the\s+)?",
+    # Slovenian: "preklopi na zdravje", "vprašaj osebni razvoj".
+    r"(?:preklopi|preusmeri|prestavi|usmeri)(?:\s+me)?\s+(?:na|k|v)\s+",
+    r"(?:vprašaj|vprasaj)\s+",
+)
+COMMAND = "(?:" + "|".join(COMMAND_PREFIXES) + "){alias}"
+# Matched at the start of the message only: "switch to general.", "please ask the mentor".
+COMMAND_MESSAGE_TEMPLATE = (
+    r"\s*(?:(?:please|pls|prosim|lahko|can\s+you|could\s+you)\s+)?"
+    + COMMAND
+    + r"\s*(?:$|[.,!?;:])"
+)
+SWITCH_TEMPLATES: tuple[str, ...] = (
+    r"\b" + COMMAND + SPECIALIST_NOUN + r"\b",
+    # English: "let the homelab specialist answer", "have the mentor take over".
+    r"\b(?:let|have)\s+(?:the\s+)?{alias}" + OPTIONAL_SPECIALIST_NOUN
+    + r"\s+(?:answer|respond|reply|handle|take\s+over)\b",
+    # Slovenian: "naj odgovori personal_development specialist".
+    r"\bnaj\s+(?:odgovori|odgovarja|prevzame|pomaga)\s+(?:the\s+)?{alias}"
+    + OPTIONAL_SPECIALIST_NOUN + r"\b",
+)
+# Display names used as an addressee at the start: "Mentor, ...", "@The Tinkerer: ...".
+ADDRESSEE_TEMPLATE = r"\s*@?(?:(?:hey|hi|hello|živjo|zivjo|hej)\s+)?(?:the\s+)?{alias}\s*[,:!]"
+SEARCH_WINDOW_CHARS = 400
+# Every switch command starts with one of these words; messages without any of them
+# skip the regex scan entirely.
+TRIGGER_WORDS: frozenset[str] = frozenset(
+    {
+        "route", "switch", "send", "hand", "pass", "transfer", "redirect", "move",
+        "let", "have", "ask", "talk", "speak", "naj", "preklopi", "preusmeri",
+        "prestavi", "usmeri", "vprašaj", "vprasaj",
+    }
+)
+PUNCTUATION_TABLE = str.maketrans({char: " " for char in "!\"#$%&'()*+,./:;<=>?@[\\]^`{|}~"})
+
+
+def _strip_article(name: str) -> str:
+    lowered = name.strip().lower()
+    return lowered[4:].strip() if lowered.startswith("the ") else lowered
+
+
+def _alias_pattern(alias: str) -> str:
+    return r"[\s_-]+".join(re.escape(part) for part in alias.split())
+
+
+class ExplicitSwitchMatcher:
+    def __init__(self, display_names: Mapping[str, str | None] | None = None) -> None:
+        candidates: dict[str, set[str]] = {}
+        addressees: dict[str, set[str]] = {}
+
+        def add(target: dict[str, set[str]], alias: str, domain: str) -> None:
+            key = " ".join(alias.lower().replace("_", " ").replace("-", " ").split())
+            if key:
+                target.setdefault(key, set()).add(domain)
+
+        for profile in SPECIALIST_CATALOG:
+            add(candidates, profile.domain, profile.domain)
+            label = profile.label.lower().removesuffix(" specialist")
+            add(candidates, label, profile.domain)
+            for alias in SLOVENIAN_DOMAIN_ALIASES.get(profile.domain, ()):
+                add(candidates, alias, profile.domain)
+        for raw_domain, display_name in (display_names or {}).items():
+            if not display_name:
+                continue
+            domain = normalize_domain(raw_domain)
+            add(candidates, _strip_article(display_name), domain)
+            add(addressees, _strip_article(display_name), domain)
+
+        # Aliases shared by several domains (for example two "The Coach" display
+        # names) are ambiguous and left to the classifier.
+        self._domains_by_alias = {
+            alias: next(iter(domains))
+            for alias, domains in candidates.items()
+            if len(domains) == 1
+        }
+        addressee_domains = {
+            alias: next(iter(domains))
+            for alias, domains in addressees.items()
+            if len(domains) == 1 and alias in self._domains_by_alias
+        }
+        self._switch_re = self._compile(SWITCH_TEMPLATES, self._domains_by_alias)
+        self._command_re = self._compile((COMMAND_MESSAGE_TEMPLATE,), self._domains_by_alias)
+        self._addressee_re = (
+            self._compile((ADDRESSEE_TEMPLATE,), addressee_domains)
+            if addressee_domains
+            else None
+        )
+
+    @staticmethod
+    def _compile(templates: tuple[str, ...], aliases: Mapping[str, str]) -> re.Pattern[str]:
+        ordered = sorted(aliases, key=len, reverse=True)
+        alias_group = "(?P<alias>" + "|".join(_alias_pattern(a) for a in ordered) + ")"
+        branches = [
+            template.replace("{alias}", alias_group.replace("?P<alias>", f"?P<alias{idx}>"))
+            for idx, template in enumerate(templates)
+        ]
+        # Patterns are matched against a lowercased window; avoiding IGNORECASE keeps
+        # the per-position scan cheap.
+        return re.compile("|".join(f"(?:{branch})" for branch in branches))
+
+    def _domain_for(self, match: re.Match[str]) -> str | None:
+        for value in match.groupdict().values():
+            if value:
+                key = " ".join(value.replace("_", " ").replace("-", " ").split())
+                return self._domains_by_alias.get(key)
+        return None
+
+    def match(self, text: str) -> str | None:
+        window = text[:SEARCH_WINDOW_CHARS].lower()
+        if self._addressee_re is not None:
+            found = self._addressee_re.match(window)
+            if found:
+                return self._domain_for(found)
+        if TRIGGER_WORDS.isdisjoint(window.translate(PUNCTUATION_TABLE).split()):
+            return None
+        found = self._command_re.match(window) or self._switch_re.search(window)
+        if found:
+            return self._domain_for(found)
+        return None
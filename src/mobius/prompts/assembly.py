@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from mobius.prompts.manager import PromptManager
+from mobius.specialist_catalog import SPECIALISTS_BY_DOMAIN
+
+
+class SystemPromptAssembler:
+    def __init__(self, prompt_manager: PromptManager) -> None:
+        self._prompt_manager = prompt_manager
+        self._version: int | None = None
+        self._bodies: dict[tuple[str, ...], str] = {}
+
+    def _render(self, domains: tuple[str, ...]) -> str:
+        if not domains:
+            return self._prompt_manager.get("general")
+        lines = [self._prompt_manager.get("orchestrator"), "", "Specialist instructions:"]
+        for domain in domains:
+            label = SPECIALISTS_BY_DOMAIN[domain].label
+            lines.append(f"- {label} ({domain}):")
+            lines.append(self._prompt_manager.get(domain))
+        return "\n".join(lines)
+
+    def body(self, domains: tuple[str, ...]) -> str:
+        # One reload check per request; rendered bodies are reused until a prompt
+        # file fingerprint changes and PromptManager bumps its version.
+        self._prompt_manager.maybe_reload()
+        version = self._prompt_manager.version
+        if version != self._version:
+            self._bodies = {}
+            self._version = version
+        cached = self._bodies.get(domains)
+        if cached is None:
+            cached = self._render(domains)
+            self._bodies[domains] = cached
+        return cached
@@ -49,6 +49,7 @@ class PromptManager:
         self._auto_reload = config.specialists.auto_reload
         self._prompts: dict[str, str] = {}
         self._fingerprints: dict[str, str] = {}
+        self._version = 0
         self._load_all(initial=True)
 
     @property
@@ -111,6 +112,7 @@ class PromptManager:
             fingerprints[key] = self._fingerprint(path)
         self._prompts = loaded
         self._fingerprints = fingerprints
+        self._version += 1
         if initial:
             self.logger.info(
                 "Prompt manager initialized (dir=%s auto_reload=%s).",
@@ -140,6 +142,10 @@ class PromptManager:
     def resolved_prompt_files(self) -> dict[str, str]:
         return {key: str(self._path_for(key)) for key in self._prompt_keys}
 
+    @property
+    def version(self) -> int:
+        return self._version
+
     @property
     def auto_reload(self) -> bool:
         return self._auto_reload
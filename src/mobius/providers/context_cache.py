@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+import httpx
+
+from mobius.config import ContextCacheConfig
+from mobius.logging_setup import get_logger
+
+
+@dataclass(frozen=True)
+class CacheablePrefix:
+    label: str
+    text: str
+    version: int
+
+
+@dataclass
+class _CachedContext:
+    name: str
+    version: int
+    fingerprint: str
+    expires_at: float
+
+
+@dataclass
+class _CreateFailure:
+    version: int
+    attempts: int
+    retry_at: float
+
+
+def gemini_native_base_url(base_url: str) -> str:
+    # https://generativelanguage.googleapis.com/v1beta/openai/ -> .../v1beta
+    trimmed = base_url.rstrip("/")
+    if trimmed.endswith("/openai"):
+        trimmed = trimmed[: -len("/openai")]
+    return trimmed
+
+
+def gemini_model_name(model: str) -> str:
+    return f"models/{model.removeprefix('openai/').removeprefix('models/')}"
+
+
+class GeminiContextCache:
+    def __init__(
+        self,
+        config: ContextCacheConfig,
+        *,
+        api_key: str,
+        base_url: str,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.logger = get_logger(__name__)
+        self._config = config
+        self._api_key = api_key
+        self._base_url = gemini_native_base_url(base_url)
+        self._http_client = http_client
+        self._owns_client = http_client is None
+        self._contexts: dict[tuple[str, str], _CachedContext] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self._failures: dict[tuple[str, str], _CreateFailure] = {}
+        self._created = 0
+        self._reused = 0
+        self._refreshed = 0
+        self._errors = 0
+        self._invalidated = 0
+        self._backoff_skips = 0
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient()
+        return self._http_client
+
+    def _headers(self) -> dict[str, str]:
+        return {"x-goog-api-key": self._api_key}
+
+    def applies_to(self, prefix: CacheablePrefix | None) -> bool:
+        return prefix is not None and len(prefix.text) >= self._config.min_chars
+
+    async def handle(self, model: str, prefix: CacheablePrefix) -> str | None:
+        key = (model, prefix.label)
+        current = self._contexts.get(key)
+        if self._is_fresh(current, prefix):
+            self._reused += 1
+            return current.name  # type: ignore[union-attr]
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            current = self._contexts.get(key)
+            if self._is_fresh(current, prefix):
+                self._reused += 1
+                return current.name  # type: ignore[union-attr]
+            fingerprint = hashlib.sha256(prefix.text.encode("utf-8")).hexdigest()
+            if (
+                current is not None
+                and current.fingerprint == fingerprint
+                and current.expires_at > monotonic() + self._config.refresh_margin_seconds
+            ):
+                # Prompt files were reloaded but this prompt did not change.
+                current.version = prefix.version
+                self._reused += 1
+                return current.name
+            failure = self._failures.get(key)
+            if (
+                failure is not None
+                and failure.version == prefix.version
+                and failure.retry_at > monotonic()
+            ):
+                # Creation failed recently for this prompt version (for example
+                # below Gemini's minimum token count); send it inline until then.
+                self._backoff_skips += 1
+                return None
+            try:
+                name = await self._create(model, prefix.text)
+            except Exception as exc:
+                self._errors += 1
+                attempts = (
+                    failure.attempts + 1
+                    if failure is not None and failure.version == prefix.version
+                    else 1
+                )
+                backoff = min(
+                    self._config.failure_backoff_seconds * 2 ** (attempts - 1),
+                    self._config.ttl_seconds,
+                )
+                self._failures[key] = _CreateFailure(
+                    version=prefix.version,
+                    attempts=attempts,
+                    retry_at=monotonic() + backoff,
+                )
+                self.logger.warning(
+                    "Context cache creation failed model=%s label=%s error=%s; "
+                    "retrying in %ds",
+                    model,
+                    prefix.label,
+                    exc.__class__.__name__,
+                    int(backoff),
+                )
+                return None
+            self._failures.pop(key, None)
+            self._contexts[key] = _CachedContext(
+                name=name,
+                version=prefix.version,
+                fingerprint=fingerprint,
+                expires_at=monotonic() + self._config.ttl_seconds,
+            )
+            if current is None:
+                self._created += 1
+            else:
+                self._refreshed += 1
+                await self._delete(current.name)
+            self.logger.info(
+                "Context cache ready model=%s label=%s name=%s", model, prefix.label, name
+            )
+            return name
+
+    def _is_fresh(self, current: _CachedContext | None, prefix: CacheablePrefix) -> bool:
+        return (
+            current is not None
+            and current.version == prefix.version
+            and current.expires_at > monotonic() + self._config.refresh_margin_seconds
+        )
+
+    def invalidate(self, model: str, name: str) -> None:
+        for key, context in list(self._contexts.items()):
+            if key[0] == model and context.name == name:
+                del self._contexts[key]
+                self._invalidated += 1
+
+    async def _create(self, model: str, text: str) -> str:
+        response = await self._client().post(
+            f"{self._base_url}/cachedContents",
+            headers=self._headers(),
+            json={
+                "model": gemini_model_name(model),
+                "systemInstruction": {"parts": [{"text": text}]},
+                "ttl": f"{self._config.ttl_seconds}s",
+            },
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        return str(response.json()["name"])
+
+    async def _delete(self, name: str) -> None:
+        try:
+            await self._client().delete(
+                f"{self._base_url}/{name}", headers=self._headers(), timeout=10.0
+            )
+        except Exception as exc:
+            self.logger.debug(
+                "Context cache delete failed name=%s error=%s", name, exc.__class__.__name__
+            )
+
+    async def aclose(self) -> None:
+        for context in list(self._contexts.values()):
+            await self._delete(context.name)
+        self._contexts.clear()
+        if self._owns_client and self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self._config.enabled,
+            "contexts": len(self._contexts),
+            "created": self._created,
+            "reused": self._reused,
+            "refreshed": self._refreshed,
+            "invalidated": self._invalidated,
+            "errors": self._errors,
+            "backoff_skips": self._backoff_skips,
+        }
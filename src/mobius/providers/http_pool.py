@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+import urllib.request
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator
+
+import httpcore
+import httpx
+
+from mobius.config import ConnectionPoolConfig
+from mobius.logging_setup import get_logger
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except Exception:  # pragma: no cover - optional at runtime
+    HTTP2_AVAILABLE = False
+
+
+def _is_ip_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        backend: httpcore.AsyncNetworkBackend | None = None,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._addresses: dict[tuple[str, int], tuple[str, float]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    async def _resolve(self, host: str, port: int) -> str:
+        if _is_ip_literal(host):
+            return host
+        key = (host, port)
+        cached = self._addresses.get(key)
+        now = monotonic()
+        if cached is not None and cached[1] > now:
+            self._hits += 1
+            return cached[0]
+        self._misses += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+        address = str(infos[0][4][0])
+        self._addresses[key] = (address, now + self._ttl_seconds)
+        return address
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable[Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        # TLS still verifies and sends SNI for the original host name; httpcore
+        # passes it to start_tls separately from the connect address.
+        address = await self._resolve(host, port)
+        return await self._backend.connect_tcp(
+            address,
+            port,
+            timeout=timeout,
+            local_address=local_address,
+            socket_options=socket_options,
+        )
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: Iterable[Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "entries": len(self._addresses),
+        }
+
+
+# Most specific first; httpx mirrors httpcore's exception hierarchy.
+EXCEPTION_MAP: tuple[tuple[type[Exception], type[httpx.TransportError]], ...] = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+@contextmanager
+def _mapped_errors(request: httpx.Request) -> Iterator[None]:
+    try:
+        yield
+    except Exception as exc:
+        for core_error, httpx_error in EXCEPTION_MAP:
+            if isinstance(exc, core_error):
+                raise httpx_error(str(exc), request=request) from exc
+        raise
+
+
+def _env_proxies() -> dict[str, str]:
+    return {
+        scheme: url
+        for scheme, url in urllib.request.getproxies().items()
+        if scheme in {"http", "https", "all"}
+    }
+
+
+def _limits(config: ConnectionPoolConfig) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry_seconds,
+    )
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterable[bytes], request: httpx.Request) -> None:
+        self._stream = stream
+        self._request = request
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _mapped_errors(self._request):
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        close = getattr(self._stream, "aclose", None)
+        if close is not None:
+            await close()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    # A public-API transport over an httpcore pool, so the pool can use the
+    # DNS-caching network backend.
+    def __init__(
+        self,
+        config: ConnectionPoolConfig,
+        *,
+        backend: httpcore.AsyncNetworkBackend | None = None,
+    ) -> None:
+        self.http2 = config.http2 and HTTP2_AVAILABLE
+        limits = _limits(config)
+        self.dns = (
+            CachingDNSBackend(ttl_seconds=config.dns_cache_ttl_seconds, backend=backend)
+            if config.dns_cache_ttl_seconds > 0
+            else None
+        )
+        self.pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=self.http2,
+            network_backend=self.dns or backend,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _mapped_errors(request):
+            response = await self.pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream, request),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        connections = list(self.pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        stats: dict[str, Any] = {
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "http2": self.http2,
+        }
+        if self.dns is not None:
+            stats["dns_cache"] = self.dns.stats()
+        return stats
+
+
+class ProviderHTTPPool:
+    def __init__(self, name: str, config: ConnectionPoolConfig) -> None:
+        self.name = name
+        self.config = config
+        self.transport: PooledTransport | None = None
+        self._requests = 0
+        if _env_proxies():
+            # An explicit transport would bypass HTTP(S)_PROXY, so let httpx build
+            # its proxy-aware transports; the DNS cache does not apply there.
+            self.http2 = config.http2 and HTTP2_AVAILABLE
+            self.http_client = httpx.AsyncClient(limits=_limits(config), http2=self.http2)
+            return
+        self.transport = PooledTransport(config)
+        self.http2 = self.transport.http2
+        self.http_client = httpx.AsyncClient(transport=self.transport)
+
+    def mark_request(self) -> None:
+        self._requests += 1
+
+    async def warm_up(self, base_url: str) -> None:
+        # Any response (even 404) leaves an established TLS connection in the pool.
+        try:
+            await self.http_client.get(base_url, timeout=5.0)
+        except Exception as exc:
+            get_logger(__name__).info(
+                "Connection warmup failed provider=%s error=%s",
+                self.name,
+                exc.__class__.__name__,
+            )
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self._requests,
+            "max_connections": self.config.max_connections,
+            "max_keepalive_connections": self.config.max_keepalive_connections,
+            "keepalive_expiry_seconds": self.config.keepalive_expiry_seconds,
+            **(
+                self.transport.stats()
+                if self.transport is not None
+                else {"proxied": True, "http2": self.http2}
+            ),
+        }
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from collections import deque
+from threading import Lock
+
+
+class LatencyWindow:
+    def __init__(self, *, size: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=max(1, size))
+        self._lock = Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(max(0.0, seconds))
+
+    def percentile(self, quantile: float) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        rank = max(0.0, min(1.0, quantile)) * (len(ordered) - 1)
+        lower = int(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        weight = rank - lower
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * weight
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
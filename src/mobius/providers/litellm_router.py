@@ -1,17 +1,225 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, AsyncIterator, Collection
 
-from litellm import acompletion, aembedding
+import httpx
+from litellm import (
+    acompletion,
+    aembedding,
+    get_llm_provider,
+    get_supported_openai_params,
+)
+from openai import APIConnectionError, AsyncOpenAI
 
 from mobius.config import AppConfig
 from mobius.logging_setup import get_logger
+from mobius.providers.context_cache import CacheablePrefix, GeminiContextCache
+from mobius.providers.http_pool import ProviderHTTPPool
+from mobius.providers.latency import LatencyWindow
+from mobius.providers.model_health import ModelHealthTracker
+
+DEFAULT_OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+
+@lru_cache(maxsize=256)
+def _uses_openai_client(litellm_model: str) -> bool:
+    try:
+        return get_llm_provider(litellm_model)[1] == "openai"
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=256)
+def _supports_prompt_cache_key(litellm_model: str) -> bool:
+    try:
+        model, provider, _, _ = get_llm_provider(litellm_model)
+        params = get_supported_openai_params(model=model, custom_llm_provider=provider)
+    except Exception:
+        return False
+    return "prompt_cache_key" in (params or [])
+
+
+class TTFTTimeoutError(TimeoutError):
+    def __init__(self, model: str) -> None:
+        super().__init__(f"No first token from model={model} before the TTFT timeout.")
+        self.model = model
+
+
+def _is_health_failure(exc: BaseException) -> bool:
+    # Timeouts, connection errors, rate limits and server errors say something about
+    # the model; other 4xx errors come from the request (e.g. passthrough params).
+    if isinstance(exc, (TimeoutError, APIConnectionError, httpx.TransportError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def _has_first_token(chunk: dict[str, Any]) -> bool:
+    for choice in chunk.get("choices") or []:
+        delta = choice.get("delta") or {}
+        if delta.get("content") or delta.get("tool_calls") or choice.get("finish_reason"):
+            return True
+    return False
+
+
+async def _close_stream(stream: Any) -> None:
+    closer = getattr(stream, "aclose", None)
+    if closer is None:
+        return
+    try:
+        await closer()
+    except Exception:
+        pass
+
+
+async def _replay_stream(
+    buffered: list[Any],
+    iterator: AsyncIterator[Any],
+    stream: Any,
+) -> AsyncIterator[Any]:
+    try:
+        for chunk in buffered:
+            yield chunk
+        async for chunk in iterator:
+            yield chunk
+    finally:
+        await _close_stream(stream)
+
+
+def _total_tokens(response: Any) -> int:
+    if isinstance(response, dict):
+        usage = response.get("usage")
+    else:
+        usage = getattr(response, "usage", None)
+    if isinstance(usage, dict):
+        return int(usage.get("total_tokens") or 0)
+    return int(getattr(usage, "total_tokens", 0) or 0)
+
+
+def _estimated_prompt_tokens(messages: list[dict[str, Any]]) -> int:
+    chars = sum(len(str(message.get("content") or "")) for message in messages)
+    return chars // 4
 
 
 class LiteLLMRouter:
     def __init__(self, config: AppConfig) -> None:
         self.config = config
         self.logger = get_logger(__name__)
+        self._pools: dict[str, ProviderHTTPPool] = {}
+        self._clients: dict[str, AsyncOpenAI] = {}
+        self.health = ModelHealthTracker(config.models.health)
+        self._latencies: dict[str, LatencyWindow] = {}
+        self._hedges_fired = 0
+        self._hedges_won = 0
+        self._hedge_tokens_wasted = 0
+        self._ttft_fallbacks: dict[str, int] = {}
+        self._context_cache: GeminiContextCache | None = None
+
+    def open_pools(self) -> None:
+        providers = {
+            "openai": self.config.providers.openai,
+            "gemini": self.config.providers.gemini,
+        }
+        for name, provider in providers.items():
+            if name in self._pools or not provider.pool.enabled or not provider.api_key:
+                continue
+            pool = ProviderHTTPPool(name, provider.pool)
+            self._pools[name] = pool
+            self._clients[name] = AsyncOpenAI(
+                api_key=provider.api_key,
+                base_url=provider.base_url or DEFAULT_OPENAI_BASE_URL,
+                http_client=pool.http_client,
+            )
+            self.logger.info(
+                "Connection pool ready provider=%s max_connections=%d http2=%s",
+                name,
+                provider.pool.max_connections,
+                pool.http2,
+            )
+
+    async def warm_up(self) -> None:
+        for name, pool in self._pools.items():
+            if pool.config.warmup:
+                await pool.warm_up(str(self._clients[name].base_url))
+
+    async def aclose(self) -> None:
+        if self._context_cache is not None:
+            await self._context_cache.aclose()
+            self._context_cache = None
+        pools = list(self._pools.values())
+        self._pools.clear()
+        self._clients.clear()
+        for pool in pools:
+            await pool.aclose()
+
+    def pool_stats(self) -> dict[str, Any]:
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    def context_cache(self) -> GeminiContextCache | None:
+        config = self.config.models.context_cache
+        gemini = self.config.providers.gemini
+        if self._context_cache is not None or not config.enabled:
+            return self._context_cache
+        # Cached contents are referenced through Gemini's OpenAI-compatible endpoint.
+        if not gemini.api_key or "/openai" not in (gemini.base_url or "").lower():
+            return None
+        pool = self._pools.get("gemini")
+        self._context_cache = GeminiContextCache(
+            config,
+            api_key=gemini.api_key,
+            base_url=gemini.base_url or "",
+            http_client=pool.http_client if pool is not None else None,
+        )
+        return self._context_cache
+
+    def context_cache_stats(self) -> dict[str, Any]:
+        if self._context_cache is None:
+            return {"enabled": self.config.models.context_cache.enabled}
+        return self._context_cache.stats()
+
+    async def _with_cached_context(
+        self,
+        model: str,
+        messages: list[dict[str, Any]],
+        prefix: CacheablePrefix | None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        if prefix is None or not self._is_gemini_model(model):
+            return messages, None
+        cache = self.context_cache()
+        if cache is None or not cache.applies_to(prefix):
+            return messages, None
+        system = messages[0] if messages else {}
+        content = system.get("content")
+        if system.get("role") != "system" or not isinstance(content, str):
+            return messages, None
+        if not content.startswith(prefix.text):
+            return messages, None
+        handle = await cache.handle(model, prefix)
+        if handle is None:
+            return messages, None
+        # Gemini rejects a system instruction next to cached content, so whatever
+        # follows the cached prompt (the timestamp) is sent as a leading user turn.
+        remainder = content[len(prefix.text) :].strip()
+        head = [{"role": "user", "content": remainder}] if remainder else []
+        return [*head, *messages[1:]], handle
+
+    def health_stats(self) -> dict[str, Any]:
+        return self.health.stats()
+
+    def _pooled_client(self, model: str, litellm_model: str) -> AsyncOpenAI | None:
+        # Pooled clients only apply to calls LiteLLM sends through its OpenAI client
+        # (OpenAI models and Gemini's OpenAI-compatible endpoint).
+        if not self._clients or not _uses_openai_client(litellm_model):
+            return None
+        provider = "gemini" if self._is_gemini_model(model) else "openai"
+        pool = self._pools.get(provider)
+        if pool is None:
+            return None
+        pool.mark_request()
+        return self._clients[provider]
 
     def list_models(self) -> list[str]:
         specialist_models = [
@@ -65,50 +273,77 @@ class LiteLLMRouter:
         stream: bool,
         passthrough: dict[str, Any] | None = None,
         include_fallbacks: bool = True,
+        hedge: bool = False,
+        prompt_cache_key: str | None = None,
+        cacheable_prefix: CacheablePrefix | None = None,
+        exclude_models: Collection[str] = (),
+        failed_models: set[str] | None = None,
     ) -> tuple[str, Any]:
+        # failed_models, when given, collects every model that failed during this call.
+        failed = failed_models if failed_models is not None else set()
         models_to_try = (
-            [primary_model, *self.config.models.fallbacks]
+            self.health.order(primary_model, self.config.models.fallbacks)
             if include_fallbacks
             else [primary_model]
         )
-        seen: set[str] = set()
-        ordered_models = [m for m in models_to_try if not (m in seen or seen.add(m))]
+        seen: set[str] = set(exclude_models) - {primary_model}
+        candidates = [m for m in models_to_try if not (m in seen or seen.add(m))]
 
+        if (
+            hedge
+            and not stream
+            and self.config.models.hedging.enabled
+            and len(candidates) > 1
+        ):
+            return await self._hedged_completion(
+                primary_model,
+                candidates,
+                messages,
+                passthrough,
+                prompt_cache_key,
+                cacheable_prefix,
+                failed,
+            )
+
+        # Circuits are checked right before each attempt so that fallbacks which
+        # are never tried do not take (and strand) a half-open probe.
+        remaining = list(candidates)
+        attempted = False
         last_error: Exception | None = None
-        for model in ordered_models:
+        while True:
+            model = self._next_allowed(remaining)
+            if model is None:
+                if attempted or not candidates:
+                    break
+                # Every circuit is open: still try the primary rather than fail without a call.
+                self.logger.warning(
+                    "All model circuits open; trying primary model=%s", candidates[0]
+                )
+                model = candidates[0]
+            attempted = True
             try:
                 self.logger.debug(
                     "Trying model=%s stream=%s fallback_count=%d",
                     model,
                     stream,
-                    max(0, len(ordered_models) - 1),
+                    len(remaining),
                 )
-                litellm_model = self._litellm_model_for_call(model)
-                call_kwargs = {
-                    "model": litellm_model,
-                    "messages": messages,
-                    "stream": stream,
-                    **self._provider_kwargs(model),
-                    **(passthrough or {}),
-                }
-                response = await acompletion(**self._clean(call_kwargs))
-                if model != primary_model:
-                    self.logger.warning(
-                        "Primary model failed, fallback model used: %s -> %s",
-                        primary_model,
-                        model,
-                    )
-                else:
-                    self.logger.debug("Model request succeeded with primary model=%s", model)
+                # The watchdog only abandons a stream when another model can take over.
+                has_next = any(self.health.available(m) for m in remaining)
+                response = await self._call_model(
+                    model,
+                    messages,
+                    stream,
+                    passthrough,
+                    ttft_timeout=self._ttft_timeout_seconds(model) if has_next else None,
+                    prompt_cache_key=prompt_cache_key,
+                    cacheable_prefix=cacheable_prefix,
+                )
+                self._log_model_used(primary_model, model)
                 return model, response
             except Exception as exc:  # pragma: no cover - provider-dependent
+                failed.add(model)
                 last_error = exc
-                self.logger.warning(
-                    "Model call failed for model=%s error=%s",
-                    model,
-                    exc.__class__.__name__,
-                )
-                self.logger.debug("Model failure details: %s", str(exc))
                 continue
 
         if last_error is not None:
@@ -116,6 +351,312 @@ class LiteLLMRouter:
             raise last_error
         raise RuntimeError("No model candidates configured.")
 
+    def _next_allowed(self, remaining: list[str]) -> str | None:
+        while remaining:
+            model = remaining.pop(0)
+            if self.health.allow(model):
+                return model
+            self.logger.info("Skipping model with open circuit model=%s", model)
+        return None
+
+    async def _call_model(
+        self,
+        model: str,
+        messages: list[dict[str, Any]],
+        stream: bool,
+        passthrough: dict[str, Any] | None,
+        *,
+        ttft_timeout: float | None = None,
+        prompt_cache_key: str | None = None,
+        cacheable_prefix: CacheablePrefix | None = None,
+    ) -> Any:
+        call_messages, cached_context = await self._with_cached_context(
+            model, messages, cacheable_prefix
+        )
+        # Creating a cached context is not model latency; start the clock (and the
+        # TTFT deadline) once the handle is in hand.
+        started = perf_counter()
+        try:
+            litellm_model = self._litellm_model_for_call(model)
+            call_kwargs = {
+                "model": litellm_model,
+                "messages": call_messages,
+                "stream": stream,
+                "client": self._pooled_client(model, litellm_model),
+                **self._provider_kwargs(model),
+                **(passthrough or {}),
+            }
+            if prompt_cache_key and not self._is_gemini_model(model):
+                if _supports_prompt_cache_key(litellm_model):
+                    call_kwargs["prompt_cache_key"] = prompt_cache_key
+            if cached_context is not None:
+                call_kwargs["extra_body"] = {
+                    **(call_kwargs.get("extra_body") or {}),
+                    "extra_body": {"google": {"cached_content": cached_context}},
+                }
+            if stream and ttft_timeout is not None:
+                response = await self._stream_with_ttft_watchdog(
+                    model, call_kwargs, started + ttft_timeout
+                )
+            else:
+                response = await acompletion(**self._clean(call_kwargs))
+        except TTFTTimeoutError:
+            self.health.record_failure(model, perf_counter() - started)
+            self._ttft_fallbacks[model] = self._ttft_fallbacks.get(model, 0) + 1
+            self.logger.warning(
+                "Stream TTFT timeout, falling back model=%s timeout_ms=%d",
+                model,
+                int((ttft_timeout or 0) * 1000),
+            )
+            raise
+        except Exception as exc:
+            if (
+                cached_context is not None
+                and self._context_cache is not None
+                and not _is_health_failure(exc)
+            ):
+                # The handle expired or was rejected upstream: drop it (the next
+                # request recreates it) and resend this one with the prompt inline.
+                self._context_cache.invalidate(model, cached_context)
+                self.logger.info(
+                    "Cached context rejected model=%s error=%s; retrying inline",
+                    model,
+                    exc.__class__.__name__,
+                )
+                return await self._call_model(
+                    model,
+                    messages,
+                    stream,
+                    passthrough,
+                    ttft_timeout=ttft_timeout,
+                    prompt_cache_key=prompt_cache_key,
+                )
+            if _is_health_failure(exc):
+                self.health.record_failure(model, perf_counter() - started)
+            else:
+                self.health.release(model)
+            self.logger.warning(
+                "Model call failed for model=%s error=%s",
+                model,
+                exc.__class__.__name__,
+            )
+            self.logger.debug("Model failure details: %s", str(exc))
+            raise
+        elapsed = perf_counter() - started
+        self.health.record_success(model, elapsed)
+        if not stream:
+            # Stream calls return at first byte, so only full completions feed the
+            # hedge delay window.
+            self._latency_window(model).observe(elapsed)
+        return response
+
+    def _ttft_timeout_seconds(self, model: str) -> float | None:
+        watchdog = self.config.models.stream_watchdog
+        if not watchdog.enabled:
+            return None
+        return watchdog.by_model.get(model, watchdog.ttft_timeout_ms) / 1000
+
+    async def _stream_with_ttft_watchdog(
+        self,
+        model: str,
+        call_kwargs: dict[str, Any],
+        deadline: float,
+    ) -> AsyncIterator[Any]:
+        stream: Any = None
+        buffered: list[Any] = []
+        try:
+            stream = await asyncio.wait_for(
+                acompletion(**self._clean(call_kwargs)),
+                max(0.0, deadline - perf_counter()),
+            )
+            iterator = stream.__aiter__()
+            # Role-only preamble chunks do not count as the first token; they are
+            # buffered and replayed ahead of it.
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        iterator.__anext__(), max(0.0, deadline - perf_counter())
+                    )
+                except StopAsyncIteration:
+                    break
+                buffered.append(chunk)
+                if _has_first_token(self._response_to_dict(chunk)):
+                    break
+        except asyncio.TimeoutError as exc:
+            if stream is not None:
+                await _close_stream(stream)
+            raise TTFTTimeoutError(model) from exc
+        except BaseException:
+            if stream is not None:
+                await _close_stream(stream)
+            raise
+        return _replay_stream(buffered, iterator, stream)
+
+    def ttft_stats(self) -> dict[str, Any]:
+        watchdog = self.config.models.stream_watchdog
+        return {
+            "enabled": watchdog.enabled,
+            "ttft_timeout_ms": watchdog.ttft_timeout_ms,
+            "by_model": dict(watchdog.by_model),
+            "fallbacks": dict(self._ttft_fallbacks),
+        }
+
+    def _log_model_used(self, primary_model: str, model: str) -> None:
+        if model != primary_model:
+            self.logger.warning(
+                "Primary model failed, fallback model used: %s -> %s",
+                primary_model,
+                model,
+            )
+        else:
+            self.logger.debug("Model request succeeded with primary model=%s", model)
+
+    def _latency_window(self, model: str) -> LatencyWindow:
+        window = self._latencies.get(model)
+        if window is None:
+            window = self._latencies[model] = LatencyWindow(
+                size=self.config.models.hedging.latency_window
+            )
+        return window
+
+    def _hedge_delay_seconds(self, model: str) -> float:
+        hedging = self.config.models.hedging
+        if hedging.delay_ms is not None:
+            return hedging.delay_ms / 1000
+        observed = self._latency_window(model).percentile(hedging.delay_percentile)
+        delay_ms = observed * 1000 if observed is not None else hedging.initial_delay_ms
+        delay_ms = max(hedging.min_delay_ms, min(hedging.max_delay_ms, delay_ms))
+        return delay_ms / 1000
+
+    async def _hedged_completion(
+        self,
+        primary_model: str,
+        candidates: list[str],
+        messages: list[dict[str, Any]],
+        passthrough: dict[str, Any] | None,
+        prompt_cache_key: str | None,
+        cacheable_prefix: CacheablePrefix | None,
+        failed: set[str],
+    ) -> tuple[str, Any]:
+        remaining = list(candidates)
+        first = self._next_allowed(remaining)
+        if first is None:
+            self.logger.warning(
+                "All model circuits open; trying primary model=%s", candidates[0]
+            )
+            first = candidates[0]
+        hedge_model: str | None = None
+        delay = self._hedge_delay_seconds(first)
+        tasks: dict[asyncio.Task[Any], str] = {}
+
+        def launch(model: str) -> None:
+            task = asyncio.create_task(
+                self._call_model(
+                    model,
+                    messages,
+                    False,
+                    passthrough,
+                    prompt_cache_key=prompt_cache_key,
+                    cacheable_prefix=cacheable_prefix,
+                )
+            )
+            tasks[task] = model
+
+        launch(first)
+        pending: set[asyncio.Task[Any]] = set(tasks)
+        hedged = False
+        fired = False
+        last_error: Exception | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedged = True
+                    hedge_model = self._next_allowed(remaining)
+                    if hedge_model is None:
+                        continue
+                    fired = True
+                    self._hedges_fired += 1
+                    self.logger.info(
+                        "Completion hedge fired after %dms model=%s -> %s",
+                        int(delay * 1000),
+                        first,
+                        hedge_model,
+                    )
+                    launch(hedge_model)
+                    pending = {task for task in tasks if not task.done()}
+                    continue
+                winner: asyncio.Task[Any] | None = None
+                for task in done:
+                    error = task.exception()
+                    if error is not None:
+                        failed.add(tasks[task])
+                        last_error = error if isinstance(error, Exception) else last_error
+                    elif winner is None:
+                        winner = task
+                if winner is not None:
+                    model = tasks[winner]
+                    if fired and model == hedge_model:
+                        self._hedges_won += 1
+                    for task in done:
+                        if task is not winner and task.exception() is None:
+                            self._hedge_tokens_wasted += _total_tokens(task.result())
+                    self._log_model_used(primary_model, model)
+                    return model, winner.result()
+                if not hedged:
+                    # Primary failed before the hedge delay: plain fallback order.
+                    hedged = True
+                    hedge_model = self._next_allowed(remaining)
+                    if hedge_model is not None:
+                        launch(hedge_model)
+                    pending = {task for task in tasks if not task.done()}
+        finally:
+            for task, model in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    self.health.release(model)
+                    # A cancelled call is still billed for its prompt; estimate it.
+                    self._hedge_tokens_wasted += _estimated_prompt_tokens(messages)
+
+        while (model := self._next_allowed(remaining)) is not None:
+            try:
+                response = await self._call_model(
+                    model,
+                    messages,
+                    False,
+                    passthrough,
+                    prompt_cache_key=prompt_cache_key,
+                    cacheable_prefix=cacheable_prefix,
+                )
+                self._log_model_used(primary_model, model)
+                return model, response
+            except Exception as exc:  # pragma: no cover - provider-dependent
+                failed.add(model)
+                last_error = exc
+        self.logger.error("All model candidates failed.")
+        raise last_error or RuntimeError("No model candidates answered.")
+
+    def hedge_stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.config.models.hedging.enabled,
+            "domains": sorted(
+                domain
+                for domain, item in self.config.specialists.by_domain.items()
+                if item.hedge
+            ),
+            "fired": self._hedges_fired,
+            "won": self._hedges_won,
+            "tokens_wasted": self._hedge_tokens_wasted,
+            "delay_ms": {
+                model: int(self._hedge_delay_seconds(model) * 1000)
+                for model in sorted(self._latencies)
+            },
+        }
+
     async def embedding(
         self,
         *,
@@ -141,6 +682,7 @@ class LiteLLMRouter:
                 call_kwargs = {
                     "model": litellm_model,
                     "input": input_text,
+                    "client": self._pooled_client(model, litellm_model),
                     **self._provider_kwargs(model),
                 }
                 raw = await aembedding(**self._clean(call_kwargs))
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Any, Literal
+
+from mobius.config import ModelHealthConfig
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+@dataclass
+class _ModelState:
+    circuit: CircuitState = "closed"
+    latency_ewma: float | None = None
+    error_rate: float = 0.0
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    probe_started_at: float | None = None
+    requests: int = 0
+    failures: int = 0
+    skipped: int = 0
+
+
+class ModelHealthTracker:
+    def __init__(self, config: ModelHealthConfig) -> None:
+        self._config = config
+        self._models: dict[str, _ModelState] = {}
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            state = self._models[model] = _ModelState()
+        return state
+
+    def order(self, primary_model: str, fallbacks: list[str]) -> list[str]:
+        if not self.enabled or not self._config.latency_ordered_fallbacks:
+            return [primary_model, *fallbacks]
+        with self._lock:
+            latencies = {
+                model: self._models[model].latency_ewma
+                for model in fallbacks
+                if model in self._models
+            }
+        # Models without samples keep their configured order after measured ones.
+        ranked = sorted(
+            fallbacks,
+            key=lambda model: (
+                latencies.get(model) is None,
+                latencies.get(model) or 0.0,
+            ),
+        )
+        return [primary_model, *ranked]
+
+    def _probe_blocked(self, state: _ModelState, now: float) -> bool:
+        if state.circuit == "closed":
+            return False
+        if state.circuit == "open" and now - state.opened_at < self._config.open_seconds:
+            return True
+        # One probe at a time; a probe that never reported back (cancelled
+        # request) is replaced after another open interval.
+        return (
+            state.probe_started_at is not None
+            and now - state.probe_started_at < self._config.open_seconds
+        )
+
+    def available(self, model: str) -> bool:
+        # Like allow(), but without taking the half-open probe.
+        if not self.enabled:
+            return True
+        with self._lock:
+            state = self._models.get(model)
+            return state is None or not self._probe_blocked(state, monotonic())
+
+    def allow(self, model: str) -> bool:
+        if not self.enabled:
+            return True
+        now = monotonic()
+        with self._lock:
+            state = self._state(model)
+            if state.circuit == "closed":
+                return True
+            if self._probe_blocked(state, now):
+                state.skipped += 1
+                return False
+            state.circuit = "half_open"
+            state.probe_started_at = now
+            return True
+
+    def release(self, model: str) -> None:
+        # The call ended without saying anything about model health (for example a
+        # 4xx caused by the request); let the next request probe instead.
+        if not self.enabled:
+            return
+        with self._lock:
+            state = self._models.get(model)
+            if state is not None and state.circuit == "half_open":
+                state.probe_started_at = None
+
+    def _observe(self, state: _ModelState, seconds: float, failed: bool) -> None:
+        alpha = self._config.ewma_alpha
+        state.requests += 1
+        state.error_rate = alpha * float(failed) + (1 - alpha) * state.error_rate
+        if not failed:
+            state.latency_ewma = (
+                seconds
+                if state.latency_ewma is None
+                else alpha * seconds + (1 - alpha) * state.latency_ewma
+            )
+
+    def record_success(self, model: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            state = self._state(model)
+            self._observe(state, seconds, failed=False)
+            state.circuit = "closed"
+            state.consecutive_failures = 0
+            state.probe_started_at = None
+
+    def record_failure(self, model: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            state = self._state(model)
+            self._observe(state, seconds, failed=True)
+            state.failures += 1
+            state.consecutive_failures += 1
+            if (
+                state.circuit == "half_open"
+                or state.consecutive_failures >= self._config.failure_threshold
+            ):
+                state.circuit = "open"
+                state.opened_at = monotonic()
+                state.probe_started_at = None
+
+    def circuit(self, model: str) -> CircuitState:
+        with self._lock:
+            state = self._models.get(model)
+            return state.circuit if state is not None else "closed"
+
+    def circuits(self) -> dict[str, CircuitState]:
+        with self._lock:
+            return {model: state.circuit for model, state in self._models.items()}
+
+    def stats(self) -> dict[str, Any]:
+        now = monotonic()
+        with self._lock:
+            models = {
+                model: {
+                    "circuit": state.circuit,
+                    "latency_ewma_ms": (
+                        round(state.latency_ewma * 1000, 1)
+                        if state.latency_ewma is not None
+                        else None
+                    ),
+                    "error_rate": round(state.error_rate, 4),
+                    "consecutive_failures": state.consecutive_failures,
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "skipped": state.skipped,
+                    "open_for_seconds": (
+                        round(max(0.0, self._config.open_seconds - (now - state.opened_at)), 1)
+                        if state.circuit == "open"
+                        else None
+                    ),
+                }
+                for model, state in self._models.items()
+            }
+        return {
+            "enabled": self.enabled,
+            "latency_ordered_fallbacks": self._config.latency_ordered_fallbacks,
+            "models": models,
+        }
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Collection
+
+from mobius.api.schemas import OpenAIMessage
+from mobius.config import AppConfig
+from mobius.orchestration.local_classifier import seed_examples
+from mobius.orchestration.orchestrator import Orchestrator
+from mobius.orchestration.specialist_router import SpecialistRouter
+from mobius.prompts.manager import PromptManager
+from mobius.providers.context_cache import CacheablePrefix
+from mobius.providers.latency import LatencyWindow
+from mobius.providers.litellm_router import LiteLLMRouter
+from mobius.specialist_catalog import SPECIALIST_DOMAINS, normalize_domain
+
+CORPUS_FORMAT = "mobius-routing-corpus"
+CORPUS_VERSION = 1
+BACKENDS: tuple[str, ...] = ("recorded", "mock", "live")
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class RoutingCase:
+    case_id: str
+    messages: list[dict[str, Any]]
+    expected_domain: str
+    recent_domains: list[str] = field(default_factory=list)
+    recorded_response: str | None = None
+    recorded_usage: dict[str, int] | None = None
+    recorded_latency_ms: float = 0.0
+
+
+@dataclass
+class CaseResult:
+    case_id: str
+    expected_domain: str
+    predicted_domain: str
+    latency_ms: float
+    prompt_tokens: int
+    completion_tokens: int
+    reason: str
+
+
+def load_corpus(path: Path) -> list[RoutingCase]:
+    cases: list[RoutingCase] = []
+    with path.open("r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    if not lines:
+        raise ValueError(f"Routing corpus is empty: {path}")
+    header = json.loads(lines[0])
+    if not isinstance(header, dict) or header.get("format") != CORPUS_FORMAT:
+        raise ValueError(
+            f"Routing corpus must start with a header line "
+            f'{{"format": "{CORPUS_FORMAT}", "version": {CORPUS_VERSION}}}.'
+        )
+    if header.get("version") != CORPUS_VERSION:
+        raise ValueError(
+            f"Unsupported routing corpus version {header.get('version')!r}; "
+            f"expected {CORPUS_VERSION}."
+        )
+    for line_number, line in enumerate(lines[1:], start=2):
+        item = json.loads(line)
+        expected = normalize_domain(str(item.get("expected_domain", "")))
+        if expected not in SPECIALIST_DOMAINS:
+            raise ValueError(
+                f"Line {line_number}: unknown expected_domain "
+                f"{item.get('expected_domain')!r}."
+            )
+        messages = item.get("messages")
+        if not isinstance(messages, list) or not messages:
+            raise ValueError(f"Line {line_number}: messages must be a non-empty list.")
+        recorded_response = item.get("recorded_response")
+        if isinstance(recorded_response, dict):
+            recorded_response = json.dumps(recorded_response)
+        cases.append(
+            RoutingCase(
+                case_id=str(item.get("id") or f"line-{line_number}"),
+                messages=messages,
+                expected_domain=expected,
+                recent_domains=[
+                    normalize_domain(str(domain))
+                    for domain in item.get("recent_domains") or []
+                ],
+                recorded_response=recorded_response,
+                recorded_usage=item.get("recorded_usage"),
+                recorded_latency_ms=float(item.get("recorded_latency_ms") or 0.0),
+            )
+        )
+    return cases
+
+
+_current_case: contextvars.ContextVar[RoutingCase] = contextvars.ContextVar(
+    "routing_eval_case"
+)
+_current_usage: contextvars.ContextVar[list[int]] = contextvars.ContextVar(
+    "routing_eval_usage"
+)
+
+
+def _estimate_tokens(messages: list[dict[str, Any]]) -> int:
+    return sum(len(str(message.get("content") or "")) for message in messages) // (
+        CHARS_PER_TOKEN
+    )
+
+
+def _mock_domain(text: str) -> str:
+    tokens = set(TOKEN_RE.findall(text.lower()))
+    scores: dict[str, int] = {}
+    for example, domain in seed_examples():
+        overlap = len(tokens & set(TOKEN_RE.findall(example.lower())))
+        scores[domain] = scores.get(domain, 0) + overlap
+    best = max(scores.items(), key=lambda item: item[1], default=("general", 0))
+    return best[0] if best[1] > 0 else "general"
+
+
+class EvalLLMRouter:
+    def __init__(
+        self,
+        *,
+        config: AppConfig,
+        backend: str,
+        mock_latency_ms: float = 0.0,
+    ) -> None:
+        self.config = config
+        self.backend = backend
+        self.mock_latency_ms = mock_latency_ms
+        self._live = LiteLLMRouter(config) if backend == "live" else None
+
+    def list_models(self) -> list[str]:
+        if self._live is not None:
+            return self._live.list_models()
+        return LiteLLMRouter(self.config).list_models()
+
+    def _mock_text(self, messages: list[dict[str, Any]]) -> str:
+        user_text = str(messages[-1].get("content") or "")
+        domain = _mock_domain(user_text)
+        if self.config.routing.protocol == "label":
+            return domain
+        return json.dumps({"specialist": domain, "confidence": 0.9, "reason": "mock"})
+
+    async def chat_completion(
+        self,
+        *,
+        primary_model: str,
+        messages: list[dict[str, Any]],
+        stream: bool,
+        passthrough: dict[str, Any] | None = None,
+        include_fallbacks: bool = True,
+        hedge: bool = False,
+        prompt_cache_key: str | None = None,
+        cacheable_prefix: CacheablePrefix | None = None,
+        exclude_models: Collection[str] = (),
+        failed_models: set[str] | None = None,
+    ) -> tuple[str, Any]:
+        if self._live is not None:
+            used_model, response = await self._live.chat_completion(
+                primary_model=primary_model,
+                messages=messages,
+                stream=stream,
+                passthrough=passthrough,
+                include_fallbacks=include_fallbacks,
+                hedge=hedge,
+                prompt_cache_key=prompt_cache_key,
+                cacheable_prefix=cacheable_prefix,
+                exclude_models=exclude_models,
+                failed_models=failed_models,
+            )
+            parsed = LiteLLMRouter._response_to_dict(response)
+            usage = parsed.get("usage") or {}
+            self._record_usage(
+                messages,
+                usage.get("prompt_tokens"),
+                usage.get("completion_tokens"),
+            )
+            return used_model, response
+
+        if self.backend == "recorded":
+            case = _current_case.get()
+            if case.recorded_response is None:
+                raise RuntimeError(f"Case {case.case_id} has no recorded_response.")
+            await asyncio.sleep(case.recorded_latency_ms / 1000)
+            text = case.recorded_response
+            usage = case.recorded_usage or {}
+            self._record_usage(
+                messages, usage.get("prompt_tokens"), usage.get("completion_tokens"), text
+            )
+        else:
+            await asyncio.sleep(self.mock_latency_ms / 1000)
+            text = self._mock_text(messages)
+            self._record_usage(messages, None, None, text)
+        return primary_model, {"choices": [{"message": {"content": text}}]}
+
+    @staticmethod
+    def _record_usage(
+        messages: list[dict[str, Any]],
+        prompt_tokens: int | None,
+        completion_tokens: int | None,
+        completion_text: str = "",
+    ) -> None:
+        usage = _current_usage.get(None)
+        if usage is None:
+            return
+        usage[0] += int(
+            prompt_tokens if prompt_tokens is not None else _estimate_tokens(messages)
+        )
+        usage[1] += int(
+            completion_tokens
+            if completion_tokens is not None
+            else len(completion_text) // CHARS_PER_TOKEN
+        )
+
+
+def _eval_config(config: AppConfig) -> AppConfig:
+    eval_config = config.model_copy(deep=True)
+    # Cases are independent: cross-case caching, batching windows and streamed
+    # early commits would measure the harness rather than the classifier.
+    eval_config.routing.cache.enabled = False
+    eval_config.routing.batching.enabled = False
+    eval_config.routing.streaming_classifier = False
+    # Replaying a corpus must not feed the production training or shadow logs.
+    eval_config.routing.local_classifier.training_log = None
+    eval_config.routing.shadow.enabled = False
+    return eval_config
+
+
+async def run_routing_eval(
+    config: AppConfig,
+    cases: list[RoutingCase],
+    *,
+    backend: str = "recorded",
+    concurrency: int = 8,
+    mock_latency_ms: float = 0.0,
+) -> list[CaseResult]:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown routing-eval backend {backend!r}.")
+    eval_config = _eval_config(config)
+    llm_router = EvalLLMRouter(
+        config=eval_config, backend=backend, mock_latency_ms=mock_latency_ms
+    )
+    specialist_router = SpecialistRouter(
+        config=eval_config,
+        llm_router=llm_router,  # type: ignore[arg-type]
+    )
+    orchestrator = Orchestrator(
+        config=eval_config,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=specialist_router,
+        prompt_manager=PromptManager(eval_config),
+    )
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_case(index: int, case: RoutingCase) -> CaseResult:
+        async with semaphore:
+            _current_case.set(case)
+            usage = [0, 0]
+            _current_usage.set(usage)
+            session_key = f"routing-eval:{index}"
+            for domain in case.recent_domains:
+                orchestrator.session_store.remember_domain(session_key, domain)
+            messages = [OpenAIMessage.model_validate(item) for item in case.messages]
+            started_at = perf_counter()
+            decision = await orchestrator._decide_routing(messages, None, session_key)
+            latency_ms = (perf_counter() - started_at) * 1000
+            return CaseResult(
+                case_id=case.case_id,
+                expected_domain=case.expected_domain,
+                predicted_domain=decision.domain,
+                latency_ms=latency_ms,
+                prompt_tokens=usage[0],
+                completion_tokens=usage[1],
+                reason=decision.reason,
+            )
+
+    # Each case runs in its own task so the context variables stay per case.
+    return list(
+        await asyncio.gather(*(run_case(idx, case) for idx, case in enumerate(cases)))
+    )
+
+
+def summarize_results(results: list[CaseResult]) -> dict[str, Any]:
+    domains = [
+        domain
+        for domain in SPECIALIST_DOMAINS
+        if any(
+            domain in (result.expected_domain, result.predicted_domain)
+            for result in results
+        )
+    ]
+    confusion = {
+        expected: {predicted: 0 for predicted in domains} for expected in domains
+    }
+    per_domain: dict[str, dict[str, Any]] = {}
+    windows: dict[str, LatencyWindow] = {}
+    overall = LatencyWindow(size=max(1, len(results)))
+    for result in results:
+        confusion[result.expected_domain][result.predicted_domain] += 1
+        stats = per_domain.setdefault(
+            result.expected_domain,
+            {"cases": 0, "correct": 0, "prompt_tokens": 0, "completion_tokens": 0},
+        )
+        stats["cases"] += 1
+        stats["correct"] += int(result.predicted_domain == result.expected_domain)
+        stats["prompt_tokens"] += result.prompt_tokens
+        stats["completion_tokens"] += result.completion_tokens
+        windows.setdefault(
+            result.expected_domain, LatencyWindow(size=max(1, len(results)))
+        ).observe(result.latency_ms)
+        overall.observe(result.latency_ms)
+
+    for domain, stats in per_domain.items():
+        stats["accuracy"] = round(stats["correct"] / stats["cases"], 4)
+        stats["p50_ms"] = round(windows[domain].percentile(0.5) or 0.0, 1)
+        stats["p95_ms"] = round(windows[domain].percentile(0.95) or 0.0, 1)
+
+    correct = sum(
+        int(result.predicted_domain == result.expected_domain) for result in results
+    )
+    return {
+        "cases": len(results),
+        "accuracy": round(correct / len(results), 4) if results else 0.0,
+        "prompt_tokens": sum(result.prompt_tokens for result in results),
+        "completion_tokens": sum(result.completion_tokens for result in results),
+        "p50_ms": round(overall.percentile(0.5) or 0.0, 1),
+        "p95_ms": round(overall.percentile(0.95) or 0.0, 1),
+        "per_domain": per_domain,
+        "confusion": confusion,
+    }
+
+
+def format_summary(summary: dict[str, Any]) -> str:
+    lines = [
+        "Routing Evaluation",
+        "==================",
+        f"Cases: {summary['cases']}",
+        f"Accuracy: {summary['accuracy']:.2%}",
+        f"Classifier tokens: prompt={summary['prompt_tokens']} "
+        f"completion={summary['completion_tokens']}",
+        f"Latency: p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms",
+        "",
+        f"{'domain':<22}{'cases':>7}{'acc':>9}{'p50 ms':>9}{'p95 ms':>9}{'tokens':>9}",
+    ]
+    for domain, stats in summary["per_domain"].items():
+        tokens = stats["prompt_tokens"] + stats["completion_tokens"]
+        lines.append(
+            f"{domain:<22}{stats['cases']:>7}{stats['accuracy']:>9.2%}"
+            f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{tokens:>9}"
+        )
+    confusion = summary["confusion"]
+    if confusion:
+        columns = list(confusion)
+        lines.extend(["", "Confusion matrix (rows: expected, columns: predicted)"])
+        lines.append(" " * 22 + "".join(f"{column[:10]:>11}" for column in columns))
+        for expected, row in confusion.items():
+            lines.append(
+                f"{expected:<22}" + "".join(f"{row[column]:>11}" for column in columns)
+            )
+    return "\n".join(lines)
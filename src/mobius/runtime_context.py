@@ -1,12 +1,26 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Literal
 from zoneinfo import ZoneInfo
 
+TimestampGranularity = Literal["second", "minute", "hour", "day"]
 
-def timestamp_context_line(timezone_name: str) -> str:
+
+def timestamp_context_line(
+    timezone_name: str,
+    granularity: TimestampGranularity = "second",
+) -> str:
     now = datetime.now(ZoneInfo(timezone_name))
+    if granularity == "day":
+        stamp = now.date().isoformat()
+    elif granularity == "hour":
+        stamp = now.replace(minute=0, second=0, microsecond=0).isoformat(timespec="minutes")
+    elif granularity == "minute":
+        stamp = now.replace(second=0, microsecond=0).isoformat(timespec="minutes")
+    else:
+        stamp = now.isoformat()
     return (
-        f"Current timestamp: {now.isoformat()} ({timezone_name}). "
+        f"Current timestamp: {stamp} ({timezone_name}). "
         "Use this as the authoritative current date and time for this request."
     )
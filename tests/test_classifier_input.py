@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from mobius.config import ClassifierInputConfig
+from mobius.orchestration.classifier_input import bounded_classifier_input
+
+
+def test_short_messages_are_unchanged() -> None:
+    text = "Why does my Proxmox backup fail every night?"
+    assert bounded_classifier_input(text, ClassifierInputConfig()) is text
+
+
+def test_large_code_blocks_are_collapsed() -> None:
+    config = ClassifierInputConfig(max_chars=400)
+    code = "\n".join(f"  key_{idx}: value_{idx}" for idx in range(200))
+    text = f"Is this compose file wrong?\n```yaml\nservices:\n{code}\n```\nThanks!"
+    reduced = bounded_classifier_input(text, config)
+    assert reduced.startswith("Is this compose file wrong?\n```yaml\nservices:")
+    assert "code lines omitted" in reduced
+    assert reduced.endswith("```\nThanks!")
+    assert len(reduced) <= config.max_chars
+
+
+def test_long_paste_keeps_head_tail_and_sampled_lines_within_budget() -> None:
+    config = ClassifierInputConfig(max_chars=2000, head_chars=800, tail_chars=400)
+    lines = [f"Jan 01 00:00:{idx % 60:02d} pve kernel: event {idx}" for idx in range(50_000)]
+    text = "My node keeps crashing, here is the log:\n" + "\n".join(lines) + "\nWhat now?"
+    reduced = bounded_classifier_input(text, config)
+    assert len(reduced) <= config.max_chars
+    assert reduced.startswith("My node keeps crashing")
+    assert reduced.endswith("What now?")
+    assert "sampled lines follow" in reduced
+    sampled = reduced.split("sampled lines follow ...]\n")[1].split("\n[... end")[0]
+    events = [int(line.rsplit(" ", 1)[1]) for line in sampled.splitlines()]
+    assert len(events) > 5
+    assert min(events) > 10 and max(events) < 49_990
+
+
+def test_disabled_builder_passes_text_through() -> None:
+    text = "x" * 10_000
+    assert bounded_classifier_input(text, ClassifierInputConfig(enabled=False)) == text
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Any
+
+from mobius.config import ContextBudgetConfig
+from mobius.orchestration.context_budget import TRIM_MARKER, ContextBudgeter
+
+
+def _budgeter(**overrides: object) -> ContextBudgeter:
+    return ContextBudgeter(ContextBudgetConfig.model_validate({"enabled": True, **overrides}))
+
+
+def _history(turns: int) -> list[dict[str, Any]]:
+    messages: list[dict[str, Any]] = [{"role": "system", "content": "You are helpful."}]
+    for index in range(turns):
+        messages.append({"role": "user", "content": f"question {index} " + "word " * 100})
+        messages.append({"role": "assistant", "content": f"answer {index} " + "token " * 150})
+    messages.append({"role": "user", "content": "And now?"})
+    return messages
+
+
+def test_history_under_budget_is_unchanged() -> None:
+    budgeter = _budgeter()
+    messages = _history(2)
+    result = budgeter.fit(messages, "gpt-4o-mini", 100000)
+    assert result.messages is messages
+    assert result.trimmed_tokens == 0
+    assert budgeter.stats()["trimmed_requests"] == 0
+
+
+def test_oldest_turns_are_dropped_and_newest_kept() -> None:
+    budgeter = _budgeter()
+    messages = _history(6)
+    result = budgeter.fit(messages, "gpt-4o-mini", 900)
+    kept = result.messages
+    assert kept[0] == messages[0]
+    assert kept[-1] == messages[-1]
+    assert kept[-3:-1] == messages[-3:-1]
+    assert not any("question 0 " in str(message["content"]) for message in kept)
+    assert result.kept_tokens <= 900
+    assert sum(budgeter.count("gpt-4o-mini", message) for message in kept) + 3 == (
+        result.kept_tokens
+    )
+    assert result.trimmed_tokens == result.original_tokens - result.kept_tokens > 0
+    stats = budgeter.stats()
+    assert stats["trimmed_requests"] == 1
+    assert stats["dropped_messages"] == result.dropped_messages
+
+
+def test_boundary_message_is_cut_to_its_most_recent_part() -> None:
+    budgeter = _budgeter()
+    messages = _history(3)
+    # Room for the newest assistant answer plus part of the question before it.
+    newest_answer = budgeter.count("gpt-4o-mini", messages[-2])
+    required = sum(budgeter.count("gpt-4o-mini", m) for m in (messages[0], messages[-1])) + 3
+    result = budgeter.fit(messages, "gpt-4o-mini", required + newest_answer + 60)
+    assert result.truncated_messages == 1
+    shortened = result.messages[1]
+    assert shortened["role"] == "user"
+    assert shortened["content"].startswith(TRIM_MARKER)
+    assert shortened["content"].endswith("word ")
+    assert result.messages[2] == messages[-2]
+    assert result.kept_tokens <= required + newest_answer + 60
+
+
+def test_tool_calls_stay_with_their_results_and_latest_turn_is_kept() -> None:
+    budgeter = _budgeter()
+    tool_call = {
+        "id": "call_1",
+        "type": "function",
+        "function": {"name": "search", "arguments": '{"q": "x"}'},
+    }
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": "You are helpful."},
+        {"role": "user", "content": "old " * 300},
+        {"role": "assistant", "content": None, "tool_calls": [tool_call]},
+        {"role": "tool", "tool_call_id": "call_1", "content": "result " * 300},
+        {"role": "assistant", "content": "done"},
+        {"role": "user", "content": "latest " * 400},
+    ]
+    result = budgeter.fit(messages, "gemini-2.5-flash", 300)
+    assert result.messages == [messages[0], messages[-1]]
+    assert result.dropped_messages == 4
+    assert budgeter.stats()["over_budget"] == 1
+
+
+def test_token_counts_are_cached_per_message() -> None:
+    budgeter = _budgeter()
+    messages = _history(1)
+    budgeter.fit(messages, "gpt-4o-mini", 100000)
+    budgeter.fit([*messages, {"role": "user", "content": "More?"}], "gpt-4o-mini", 100000)
+    stats = budgeter.stats()
+    assert stats["token_cache_size"] == 5
+    assert stats["token_cache_hit_rate"] == 0.4444
+
+    bounded = _budgeter(token_cache_size=2)
+    bounded.fit(messages, "gpt-4o-mini", 100000)
+    assert bounded.stats()["token_cache_size"] == 2
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import httpx
+
+from mobius.config import AppConfig
+from mobius.providers.context_cache import CacheablePrefix, GeminiContextCache
+from mobius.providers.litellm_router import LiteLLMRouter
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+
+
+def _config() -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "server": {"api_keys": []},
+            "providers": {
+                "openai": {"api_key": "openai-key"},
+                "gemini": {"api_key": "gemini-key", "base_url": GEMINI_BASE_URL},
+            },
+            "models": {
+                "orchestrator": "gpt-5-nano-2025-08-07",
+                "context_cache": {"enabled": True, "min_chars": 10},
+            },
+            "api": {"public_model_id": "mobius"},
+            "specialists": {
+                "prompts_directory": "./system_prompts",
+                "orchestrator_prompt_file": "_orchestrator.md",
+                "by_domain": {
+                    domain: {"model": "gemini-2.5-flash", "prompt_file": f"{domain}.md"}
+                    for domain in (
+                        "general",
+                        "health",
+                        "parenting",
+                        "relationships",
+                        "homelab",
+                        "personal_development",
+                    )
+                },
+            },
+        }
+    )
+
+
+class MockGeminiProvider:
+    def __init__(self) -> None:
+        self.contexts: dict[str, dict[str, Any]] = {}
+        self.deleted: list[str] = []
+        self.completions: list[dict[str, Any]] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        assert request.headers["x-goog-api-key"] == "gemini-key"
+        if request.method == "POST" and request.url.path == "/v1beta/cachedContents":
+            body = json.loads(request.content)
+            name = f"cachedContents/{len(self.contexts) + 1}"
+            self.contexts[name] = body
+            return httpx.Response(200, json={"name": name, "model": body["model"]})
+        if request.method == "DELETE":
+            self.deleted.append(request.url.path.removeprefix("/v1beta/"))
+            return httpx.Response(200, json={})
+        return httpx.Response(404)
+
+    async def acompletion(self, **kwargs: Any) -> dict[str, Any]:
+        self.completions.append(kwargs)
+        handle = (kwargs.get("extra_body") or {}).get("extra_body", {}).get("google", {})
+        name = handle.get("cached_content")
+        if name is not None and name not in self.contexts:
+            raise RuntimeError(f"unknown cached content {name}")
+        if any(message["role"] == "system" for message in kwargs["messages"]) and name:
+            raise RuntimeError("system instruction cannot be combined with cached content")
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+
+def _router(provider: MockGeminiProvider, monkeypatch: Any) -> LiteLLMRouter:
+    config = _config()
+    router = LiteLLMRouter(config)
+    router._context_cache = GeminiContextCache(
+        config.models.context_cache,
+        api_key="gemini-key",
+        base_url=GEMINI_BASE_URL,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(provider.handler)),
+    )
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", provider.acompletion)
+    return router
+
+
+async def _call(router: LiteLLMRouter, model: str, prefix: CacheablePrefix) -> None:
+    await router.chat_completion(
+        primary_model=model,
+        messages=[
+            {"role": "system", "content": f"{prefix.text}\n\nCurrent timestamp: now."},
+            {"role": "user", "content": "Hi"},
+        ],
+        stream=False,
+        include_fallbacks=False,
+        cacheable_prefix=prefix,
+    )
+
+
+def test_specialist_prompt_is_cached_and_referenced(monkeypatch: Any) -> None:
+    provider = MockGeminiProvider()
+    router = _router(provider, monkeypatch)
+    prefix = CacheablePrefix(label="health", text="Health specialist prompt.", version=1)
+
+    async def run() -> None:
+        await _call(router, "gemini-2.5-flash", prefix)
+        await _call(router, "gemini-2.5-flash", prefix)
+
+    asyncio.run(run())
+    assert list(provider.contexts) == ["cachedContents/1"]
+    created = provider.contexts["cachedContents/1"]
+    assert created["model"] == "models/gemini-2.5-flash"
+    assert created["systemInstruction"] == {"parts": [{"text": prefix.text}]}
+    for call in provider.completions:
+        assert call["extra_body"] == {
+            "extra_body": {"google": {"cached_content": "cachedContents/1"}}
+        }
+        assert call["messages"] == [
+            {"role": "user", "content": "Current timestamp: now."},
+            {"role": "user", "content": "Hi"},
+        ]
+    assert router.context_cache_stats()["reused"] == 1
+
+
+def test_prompt_change_refreshes_cached_context(monkeypatch: Any) -> None:
+    provider = MockGeminiProvider()
+    router = _router(provider, monkeypatch)
+
+    async def run() -> None:
+        await _call(router, "gemini-2.5-flash", CacheablePrefix("health", "Prompt v1.", 1))
+        await _call(router, "gemini-2.5-flash", CacheablePrefix("health", "Prompt v2.", 2))
+        # Reload without a content change keeps the handle.
+        await _call(router, "gemini-2.5-flash", CacheablePrefix("health", "Prompt v2.", 3))
+        await router.aclose()
+
+    asyncio.run(run())
+    handles = [
+        call["extra_body"]["extra_body"]["google"]["cached_content"]
+        for call in provider.completions
+    ]
+    assert handles == ["cachedContents/1", "cachedContents/2", "cachedContents/2"]
+    assert provider.contexts["cachedContents/2"]["systemInstruction"]["parts"][0]["text"] == (
+        "Prompt v2."
+    )
+    assert provider.deleted == ["cachedContents/1", "cachedContents/2"]
+
+
+def test_non_gemini_models_and_expired_handles(monkeypatch: Any) -> None:
+    provider = MockGeminiProvider()
+    router = _router(provider, monkeypatch)
+    prefix = CacheablePrefix(label="homelab", text="Homelab specialist prompt.", version=1)
+
+    async def run() -> None:
+        await _call(router, "gpt-4o-mini", prefix)
+        await _call(router, "gemini-2.5-flash", prefix)
+        provider.contexts.clear()  # expired upstream
+        # The rejected handle is dropped and the request is resent inline.
+        await _call(router, "gemini-2.5-flash", prefix)
+        await _call(router, "gemini-2.5-flash", prefix)
+
+    asyncio.run(run())
+    assert "extra_body" not in provider.completions[0]
+    assert provider.completions[0]["messages"][0]["role"] == "system"
+    rejected, inline_retry = provider.completions[2:4]
+    assert "extra_body" in rejected
+    assert "extra_body" not in inline_retry
+    assert inline_retry["messages"][0]["role"] == "system"
+    assert router.context_cache_stats()["invalidated"] == 1
+    assert router.health_stats()["models"]["gemini-2.5-flash"]["failures"] == 0
+    assert list(provider.contexts) == ["cachedContents/1"]
+    assert provider.completions[-1]["extra_body"]["extra_body"]["google"] == {
+        "cached_content": "cachedContents/1"
+    }
+
+
+def test_failed_creation_backs_off_per_prompt_version(monkeypatch: Any) -> None:
+    provider = MockGeminiProvider()
+    router = _router(provider, monkeypatch)
+    posts: list[str] = []
+
+    def rejecting_handler(request: httpx.Request) -> httpx.Response:
+        posts.append(request.url.path)
+        return httpx.Response(400, json={"error": {"message": "too few tokens"}})
+
+    router._context_cache._http_client = httpx.AsyncClient(  # type: ignore[union-attr]
+        transport=httpx.MockTransport(rejecting_handler)
+    )
+
+    short = CacheablePrefix("health", "Short health prompt.", 1)
+    longer = CacheablePrefix("health", "Longer health prompt.", 2)
+
+    async def run() -> None:
+        await _call(router, "gemini-2.5-flash", short)
+        await _call(router, "gemini-2.5-flash", short)
+        # A new prompt version is tried again right away.
+        await _call(router, "gemini-2.5-flash", longer)
+
+    asyncio.run(run())
+    assert len(posts) == 2
+    assert all("extra_body" not in call for call in provider.completions)
+    stats = router.context_cache_stats()
+    assert stats["errors"] == 2
+    assert stats["backoff_skips"] == 1
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpcore
+import httpx
+import pytest
+
+from mobius.config import ConnectionPoolConfig
+from mobius.providers.http_pool import CachingDNSBackend, PooledTransport, ProviderHTTPPool
+
+
+@pytest.fixture(autouse=True)
+def _no_env_proxies(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.lower(), raising=False)
+
+
+def test_dns_cache_resolves_each_host_once_within_ttl() -> None:
+    backend = CachingDNSBackend(ttl_seconds=60, backend=httpcore.AsyncMockBackend([]))
+
+    async def run() -> None:
+        await backend.connect_tcp("localhost", 443)
+        await backend.connect_tcp("localhost", 443)
+        await backend.connect_tcp("127.0.0.1", 443)
+
+    asyncio.run(run())
+    assert backend.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_pooled_transport_applies_limits_and_reports_stats() -> None:
+    config = ConnectionPoolConfig(max_connections=7, max_keepalive_connections=3)
+    transport = PooledTransport(config)
+    stats = transport.stats()
+    assert stats["connections"] == 0
+    assert stats["dns_cache"]["misses"] == 0
+
+
+def test_pooled_transport_sends_requests_through_the_dns_backend() -> None:
+    backend = httpcore.AsyncMockBackend(
+        [b"HTTP/1.1 200 OK\r\n", b"Content-Length: 2\r\n", b"\r\n", b"ok"]
+    )
+    transport = PooledTransport(ConnectionPoolConfig(http2=False), backend=backend)
+
+    async def run() -> httpx.Response:
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.get("http://127.0.0.1:8080/v1/models")
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.text == "ok"
+
+
+def test_pooled_transport_raises_httpx_errors() -> None:
+    transport = PooledTransport(
+        ConnectionPoolConfig(http2=False), backend=httpcore.AsyncMockBackend([])
+    )
+
+    async def run() -> None:
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("http://127.0.0.1:8080/v1/models")
+
+    with pytest.raises(httpx.RemoteProtocolError):
+        asyncio.run(run())
+
+
+def test_env_proxy_keeps_httpx_proxy_handling(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.internal:3128")
+    pool = ProviderHTTPPool("openai", ConnectionPoolConfig())
+    assert pool.transport is None
+    assert pool.stats()["proxied"] is True
+    asyncio.run(pool.aclose())
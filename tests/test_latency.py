@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from mobius.providers.latency import LatencyWindow
+
+
+def test_latency_window_percentile_interpolates_recent_samples() -> None:
+    window = LatencyWindow(size=4)
+    assert window.percentile(0.9) is None
+    for seconds in (9.0, 1.0, 2.0, 3.0, 4.0):
+        window.observe(seconds)
+    assert window.count == 4
+    assert window.percentile(0.0) == 1.0
+    assert window.percentile(1.0) == 4.0
+    assert window.percentile(0.5) == 2.5
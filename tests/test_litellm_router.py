@@ -3,6 +3,9 @@ from __future__ import annotations
 import asyncio
 from typing import Any
 
+import litellm
+import pytest
+
 from mobius.config import AppConfig
 from mobius.providers.litellm_router import LiteLLMRouter
 
@@ -96,3 +99,320 @@ def test_chat_completion_uses_rewritten_model(monkeypatch: Any) -> None:
     assert seen["base_url"] == "https://generativelanguage.googleapis.com/v1beta/openai/"
     assert seen["api_key"] == "gemini-key"
     assert response["choices"][0]["message"]["content"] == "ok"
+
+
+def test_pooled_clients_are_passed_per_provider_and_closed(monkeypatch: Any) -> None:
+    router = LiteLLMRouter(_config())
+    router.open_pools()
+    seen: list[dict[str, Any]] = []
+
+    async def fake_acompletion(**kwargs: Any) -> dict[str, Any]:
+        seen.append(kwargs)
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", fake_acompletion)
+
+    async def run() -> dict[str, Any]:
+        for model in ("gpt-4o-mini", "gemini-2.5-flash"):
+            await router.chat_completion(
+                primary_model=model,
+                messages=[{"role": "user", "content": "hello"}],
+                stream=False,
+                include_fallbacks=False,
+            )
+        stats = router.pool_stats()
+        await router.aclose()
+        return stats
+
+    stats = asyncio.run(run())
+    openai_client, gemini_client = seen[0]["client"], seen[1]["client"]
+    assert openai_client is not gemini_client
+    assert str(gemini_client.base_url).startswith(
+        "https://generativelanguage.googleapis.com/v1beta/openai"
+    )
+    assert stats["openai"]["requests"] == 1
+    assert stats["gemini"]["requests"] == 1
+    assert stats["openai"]["http2"] is True
+    assert router.pool_stats() == {}
+
+
+def test_pools_can_be_disabled_per_provider() -> None:
+    config = _config()
+    config.providers.gemini.pool.enabled = False
+    router = LiteLLMRouter(config)
+    router.open_pools()
+    assert set(router.pool_stats()) == {"openai"}
+    assert router._pooled_client("gemini-2.5-flash", "openai/gemini-2.5-flash") is None
+    asyncio.run(router.aclose())
+
+
+def test_open_circuit_skips_failing_primary_until_probe(monkeypatch: Any) -> None:
+    config = _config()
+    config.models.fallbacks = ["gemini-2.5-flash"]
+    config.models.health.failure_threshold = 2
+    config.models.health.open_seconds = 60
+    router = LiteLLMRouter(config)
+    calls: list[str] = []
+    down = {"gpt-4o-mini"}
+
+    async def fake_acompletion(**kwargs: Any) -> dict[str, Any]:
+        calls.append(kwargs["model"])
+        if kwargs["model"] in down:
+            raise TimeoutError("primary down")
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", fake_acompletion)
+
+    async def call() -> str:
+        used_model, _ = await router.chat_completion(
+            primary_model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "hello"}],
+            stream=False,
+        )
+        return used_model
+
+    for _ in range(3):
+        assert asyncio.run(call()) == "gemini-2.5-flash"
+    assert calls.count("gpt-4o-mini") == 2
+    assert router.health.circuit("gpt-4o-mini") == "open"
+    stats = router.health_stats()["models"]["gpt-4o-mini"]
+    assert stats["skipped"] == 1
+    assert stats["failures"] == 2
+
+    # Once the open interval elapses a single probe is allowed; success closes it.
+    router.health._models["gpt-4o-mini"].opened_at -= 61
+    down.clear()
+    assert asyncio.run(call()) == "gpt-4o-mini"
+    assert router.health.circuit("gpt-4o-mini") == "closed"
+
+
+def test_untried_fallback_does_not_take_half_open_probe(monkeypatch: Any) -> None:
+    config = _config()
+    config.models.fallbacks = ["gemini-2.5-flash"]
+    config.models.health.failure_threshold = 1
+    config.models.health.open_seconds = 60
+    router = LiteLLMRouter(config)
+    router.health.record_failure("gemini-2.5-flash", 1.0)
+    router.health._models["gemini-2.5-flash"].opened_at -= 61
+
+    async def fake_acompletion(**kwargs: Any) -> dict[str, Any]:
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", fake_acompletion)
+    used_model, _ = asyncio.run(
+        router.chat_completion(
+            primary_model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "hello"}],
+            stream=False,
+        )
+    )
+    assert used_model == "gpt-4o-mini"
+    # The fallback was never called, so its probe is still available.
+    assert router.health.circuit("gemini-2.5-flash") == "open"
+    assert router.health.allow("gemini-2.5-flash") is True
+
+
+def test_only_timeouts_rate_limits_and_server_errors_count_as_failures(
+    monkeypatch: Any,
+) -> None:
+    config = _config()
+    config.models.health.failure_threshold = 1
+    router = LiteLLMRouter(config)
+    errors: dict[str, Exception] = {
+        "bad-request-model": litellm.BadRequestError(
+            message="unsupported parameter", model="bad-request-model", llm_provider="openai"
+        ),
+        "rate-limited-model": litellm.RateLimitError(
+            message="slow down", model="rate-limited-model", llm_provider="openai"
+        ),
+        "server-error-model": litellm.InternalServerError(
+            message="boom", model="server-error-model", llm_provider="openai"
+        ),
+        "timeout-model": litellm.Timeout(
+            message="timed out", model="timeout-model", llm_provider="openai"
+        ),
+    }
+
+    async def fake_acompletion(**kwargs: Any) -> dict[str, Any]:
+        raise errors[kwargs["model"]]
+
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", fake_acompletion)
+    monkeypatch.setattr(router, "_litellm_model_for_call", lambda model: model)
+    for model, error in errors.items():
+        with pytest.raises(type(error)):
+            asyncio.run(
+                router.chat_completion(
+                    primary_model=model,
+                    messages=[{"role": "user", "content": "hello"}],
+                    stream=False,
+                )
+            )
+    assert router.health.circuit("bad-request-model") == "closed"
+    assert router.health_stats()["models"]["bad-request-model"]["failures"] == 0
+    for model in ("rate-limited-model", "server-error-model", "timeout-model"):
+        assert router.health.circuit(model) == "open"
+
+
+def test_excluded_models_are_skipped_and_failures_are_reported(monkeypatch: Any) -> None:
+    config = _config()
+    config.models.fallbacks = ["gemini-2.5-flash", "gpt-4.1-mini", "gpt-4o-mini"]
+    router = LiteLLMRouter(config)
+    calls: list[str] = []
+
+    async def fake_acompletion(**kwargs: Any) -> dict[str, Any]:
+        calls.append(kwargs["model"])
+        if kwargs["model"] == "gpt-4.1-mini":
+            raise TimeoutError("down")
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", fake_acompletion)
+    monkeypatch.setattr(router, "_litellm_model_for_call", lambda model: model)
+    failed: set[str] = set()
+    used_model, _ = asyncio.run(
+        router.chat_completion(
+            primary_model="gpt-4.1-mini",
+            messages=[{"role": "user", "content": "hello"}],
+            stream=False,
+            exclude_models={"gemini-2.5-flash", "gpt-4.1-mini"},
+            failed_models=failed,
+        )
+    )
+    # The primary itself is never excluded; the excluded fallback is skipped.
+    assert calls == ["gpt-4.1-mini", "gpt-4o-mini"]
+    assert used_model == "gpt-4o-mini"
+    assert failed == {"gpt-4.1-mini"}
+
+
+def test_fallbacks_can_be_ordered_by_observed_latency() -> None:
+    config = _config()
+    config.models.fallbacks = ["slow-model", "fast-model", "new-model"]
+    config.models.health.latency_ordered_fallbacks = True
+    router = LiteLLMRouter(config)
+    router.health.record_success("slow-model", 2.0)
+    router.health.record_success("fast-model", 0.3)
+    assert router.health.order("primary", config.models.fallbacks) == [
+        "primary",
+        "fast-model",
+        "slow-model",
+        "new-model",
+    ]
+
+
+def test_hedged_completion_fires_after_delay_and_fallback_wins(monkeypatch: Any) -> None:
+    config = _config()
+    config.models.fallbacks = ["gemini-2.5-flash"]
+    config.models.hedging.enabled = True
+    config.models.hedging.delay_ms = 20
+    router = LiteLLMRouter(config)
+    cancelled: list[str] = []
+
+    async def fake_acompletion(**kwargs: Any) -> dict[str, Any]:
+        if kwargs["model"] == "gpt-4o-mini":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(kwargs["model"])
+                raise
+        return {
+            "choices": [{"message": {"content": kwargs["model"]}}],
+            "usage": {"total_tokens": 12},
+        }
+
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", fake_acompletion)
+
+    async def run(hedge: bool) -> str:
+        used_model, _ = await router.chat_completion(
+            primary_model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "x" * 40}],
+            stream=False,
+            hedge=hedge,
+        )
+        return used_model
+
+    assert asyncio.run(run(hedge=True)) == "gemini-2.5-flash"
+    stats = router.hedge_stats()
+    assert stats["fired"] == 1
+    assert stats["won"] == 1
+    assert stats["tokens_wasted"] == 10
+    assert cancelled == ["gpt-4o-mini"]
+
+
+def test_hedge_delay_uses_rolling_percentile_within_bounds() -> None:
+    config = _config()
+    config.models.hedging.min_delay_ms = 500
+    config.models.hedging.max_delay_ms = 3000
+    router = LiteLLMRouter(config)
+    assert router._hedge_delay_seconds("gpt-4o-mini") == 3.0
+    for seconds in (0.8, 1.0, 1.2, 1.4, 1.6):
+        router._latency_window("gpt-4o-mini").observe(seconds)
+    assert abs(router._hedge_delay_seconds("gpt-4o-mini") - 1.52) < 1e-9
+
+
+def test_stalled_stream_falls_back_after_ttft_timeout(monkeypatch: Any) -> None:
+    config = _config()
+    config.models.fallbacks = ["gemini-2.5-flash"]
+    config.models.stream_watchdog.enabled = True
+    config.models.stream_watchdog.by_model = {"gpt-4o-mini": 30}
+    router = LiteLLMRouter(config)
+    closed: list[str] = []
+
+    class FakeStream:
+        def __init__(self, model: str, stall: bool) -> None:
+            self.model = model
+            self.stall = stall
+
+        async def __aiter__(self) -> Any:
+            yield {"choices": [{"delta": {"role": "assistant"}}]}
+            if self.stall:
+                await asyncio.sleep(5)
+            yield {"choices": [{"delta": {"content": self.model}}]}
+
+        async def aclose(self) -> None:
+            closed.append(self.model)
+
+    async def fake_acompletion(**kwargs: Any) -> FakeStream:
+        return FakeStream(kwargs["model"], stall=kwargs["model"] == "gpt-4o-mini")
+
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", fake_acompletion)
+
+    async def run() -> tuple[str, list[Any]]:
+        used_model, stream = await router.chat_completion(
+            primary_model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "hello"}],
+            stream=True,
+        )
+        return used_model, [chunk async for chunk in stream]
+
+    used_model, chunks = asyncio.run(run())
+    assert used_model == "gemini-2.5-flash"
+    assert [chunk["choices"][0]["delta"] for chunk in chunks] == [
+        {"role": "assistant"},
+        {"content": "openai/gemini-2.5-flash"},
+    ]
+    assert closed == ["gpt-4o-mini"]
+    assert router.ttft_stats()["fallbacks"] == {"gpt-4o-mini": 1}
+
+
+def test_prompt_cache_key_is_only_sent_to_supporting_providers(monkeypatch: Any) -> None:
+    router = LiteLLMRouter(_config())
+    seen: list[dict[str, Any]] = []
+
+    async def fake_acompletion(**kwargs: Any) -> dict[str, Any]:
+        seen.append(kwargs)
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+    monkeypatch.setattr("mobius.providers.litellm_router.acompletion", fake_acompletion)
+
+    async def run() -> None:
+        for model in ("gpt-4o-mini", "gemini-2.5-flash"):
+            await router.chat_completion(
+                primary_model=model,
+                messages=[{"role": "user", "content": "hello"}],
+                stream=False,
+                include_fallbacks=False,
+                prompt_cache_key="mobius:health:abc",
+            )
+
+    asyncio.run(run())
+    assert seen[0]["prompt_cache_key"] == "mobius:health:abc"
+    assert "prompt_cache_key" not in seen[1]
@@ -5,7 +5,7 @@ import json
 import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Collection
 
 import pytest
 
@@ -14,6 +14,7 @@ from mobius.config import AppConfig, load_config
 from mobius.orchestration.orchestrator import Orchestrator
 from mobius.orchestration.specialist_router import SpecialistRouter
 from mobius.prompts.manager import PromptManager
+from mobius.providers.context_cache import CacheablePrefix
 from mobius.providers.litellm_router import LiteLLMRouter
 
 PREFIX_RE = re.compile(
@@ -122,6 +123,11 @@ class SpyLiteLLMRouter(LiteLLMRouter):
         stream: bool,
         passthrough: dict[str, Any] | None = None,
         include_fallbacks: bool = True,
+        hedge: bool = False,
+        prompt_cache_key: str | None = None,
+        cacheable_prefix: CacheablePrefix | None = None,
+        exclude_models: Collection[str] = (),
+        failed_models: set[str] | None = None,
     ) -> tuple[str, Any]:
         requested_include_fallbacks = include_fallbacks
         call_record: dict[str, Any] = {
@@ -142,6 +148,11 @@ class SpyLiteLLMRouter(LiteLLMRouter):
                 stream=stream,
                 passthrough=passthrough,
                 include_fallbacks=include_fallbacks,
+                hedge=hedge,
+                prompt_cache_key=prompt_cache_key,
+                cacheable_prefix=cacheable_prefix,
+                exclude_models=exclude_models,
+                failed_models=failed_models,
             )
             call_record["used_model"] = used_model
             raw_dict = _response_to_dict(raw)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from mobius.config import AppConfig, LocalClassifierConfig
+from mobius.orchestration.local_classifier import LOCAL_CLASSIFIER_MODEL, LocalRoutingClassifier
+from mobius.orchestration.specialist_router import SpecialistRouter
+
+
+class StubLLMRouter:
+    def __init__(
+        self,
+        outputs: list[str],
+        model_name: str = "gpt-5-nano-2025-08-07",
+        fail_for_models: set[str] | None = None,
+    ) -> None:
+        self.outputs = outputs
+        self.model_name = model_name
+        self.fail_for_models = fail_for_models or set()
+        self.calls: list[dict[str, Any]] = []
+
+    async def chat_completion(
+        self,
+        *,
+        primary_model: str,
+        messages: list[dict[str, Any]],
+        stream: bool,
+        passthrough: dict[str, Any] | None = None,
+        include_fallbacks: bool = True,
+    ) -> tuple[str, Any]:
+        self.calls.append(
+            {
+                "primary_model": primary_model,
+                "messages": messages,
+                "stream": stream,
+                "passthrough": passthrough or {},
+                "include_fallbacks": include_fallbacks,
+            }
+        )
+        if primary_model in self.fail_for_models:
+            raise RuntimeError(f"forced-failure:{primary_model}")
+        content = self.outputs.pop(0)
+        return self.model_name, {"choices": [{"message": {"content": content}}]}
+
+
+def _config() -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "server": {"api_keys": []},
+            "providers": {
+                "openai": {"api_key": "test-openai-key"},
+                "gemini": {
+                    "api_key": "test-gemini-key",
+                    "base_url": "https://generativelanguage.googleapis.com/v1beta/openai/",
+                },
+            },
+            "models": {
+                "orchestrator": "gpt-5-nano-2025-08-07",
+                "fallbacks": [],
+            },
+            "api": {
+                "public_model_id": "mobius",
+                "allow_provider_model_passthrough": False,
+            },
+            "specialists": {
+                "prompts_directory": "./system_prompts",
+                "orchestrator_prompt_file": "_orchestrator.md",
+                "by_domain": {
+                    "general": {"model": "gpt-4o-mini", "prompt_file": "general.md"},
+                    "health": {"model": "gpt-4o-mini", "prompt_file": "health.md"},
+                    "parenting": {
+                        "model": "gpt-4o-mini",
+                        "prompt_file": "parenting.md",
+                    },
+                    "relationships": {
+                        "model": "gpt-4o-mini",
+                        "prompt_file": "relationships.md",
+                    },
+                    "homelab": {"model": "gemini-2.5-flash", "prompt_file": "homelab.md"},
+                    "personal_development": {
+                        "model": "gpt-4o-mini",
+                        "prompt_file": "personal_development.md",
+                    },
+                },
+            },
+        }
+    )
+
+
+def test_seeded_classifier_prefers_catalog_domain() -> None:
+    classifier = LocalRoutingClassifier(LocalClassifierConfig(enabled=True))
+    domain, confidence = classifier.predict("Docker networking issue with LXC")
+    assert domain == "homelab"
+    assert confidence > 0.5
+    _, unrelated_confidence = classifier.predict("thanks")
+    assert unrelated_confidence < 0.5
+
+
+def test_confident_local_route_skips_llm_classifier() -> None:
+    config = _config()
+    config.routing.local_classifier.enabled = True
+    config.routing.local_classifier.confidence_threshold = 0.6
+    llm = StubLLMRouter(outputs=[])
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify("Docker networking issue with LXC"))
+    assert result.domain == "homelab"
+    assert result.reason == "local-classifier"
+    assert result.orchestrator_model == LOCAL_CLASSIFIER_MODEL
+    assert llm.calls == []
+
+
+def test_low_confidence_falls_through_and_logs_decision(tmp_path: Path) -> None:
+    log_path = tmp_path / "routing-decisions.jsonl"
+    config = _config()
+    config.routing.local_classifier.enabled = True
+    config.routing.local_classifier.training_log = log_path
+    llm = StubLLMRouter(
+        outputs=['{"specialist":"parenting","confidence":0.9,"reason":"child behavior"}']
+    )
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+
+    async def run() -> Any:
+        route = await router.classify("My toddler refuses to brush teeth.")
+        await asyncio.gather(*router._background_tasks)
+        return route
+
+    result = asyncio.run(run())
+    assert result.domain == "parenting"
+    assert len(llm.calls) == 1
+    logged = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert logged == [
+        {"text": "My toddler refuses to brush teeth.", "domain": "parenting", "confidence": 0.9}
+    ]
+
+
+def test_confident_local_route_does_not_override_sticky_domain() -> None:
+    config = _config()
+    config.routing.local_classifier.enabled = True
+    config.routing.local_classifier.confidence_threshold = 0.6
+    llm = StubLLMRouter(
+        outputs=['{"specialist":"parenting","confidence":0.8,"reason":"continuity"}']
+    )
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+    switched = asyncio.run(
+        router.classify("Docker networking issue with LXC", current_domain="parenting")
+    )
+    assert switched.reason != "local-classifier"
+    assert len(llm.calls) == 1
+    kept = asyncio.run(
+        router.classify("Docker networking issue with LXC", current_domain="homelab")
+    )
+    assert kept.reason == "local-classifier"
+    assert len(llm.calls) == 1
+
+
+def test_short_follow_ups_labelled_by_continuity_are_not_logged(tmp_path: Path) -> None:
+    log_path = tmp_path / "routing-decisions.jsonl"
+    config = _config()
+    config.routing.local_classifier.enabled = True
+    config.routing.local_classifier.training_log = log_path
+    llm = StubLLMRouter(
+        outputs=[
+            '{"specialist":"health","confidence":0.95,"reason":"continuity"}',
+            '{"specialist":"parenting","confidence":0.9,"reason":"switch"}',
+        ]
+    )
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+
+    async def run() -> None:
+        await router.classify("ok do it", current_domain="health")
+        await router.classify("ok my toddler again", current_domain="health")
+        await asyncio.gather(*router._background_tasks)
+
+    asyncio.run(run())
+    logged = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [item["text"] for item in logged] == ["ok my toddler again"]
+
+
+def test_retraining_from_logged_decisions_raises_confidence(tmp_path: Path) -> None:
+    log_path = tmp_path / "routing-decisions.jsonl"
+    query = "My toddler refuses to brush teeth."
+    baseline = LocalRoutingClassifier(LocalClassifierConfig(enabled=True))
+    _, baseline_confidence = baseline.predict(query)
+
+    lines = [
+        json.dumps({"text": text, "domain": "parenting", "confidence": 0.95})
+        for text in (
+            "My toddler refuses to brush teeth.",
+            "Toddler tantrums at bedtime.",
+            "How do I get my toddler to brush teeth?",
+        )
+    ]
+    log_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    trained = LocalRoutingClassifier(
+        LocalClassifierConfig(enabled=True, training_log=log_path)
+    )
+    domain, confidence = trained.predict(query)
+    assert domain == "parenting"
+    assert confidence > baseline_confidence
+    assert trained.stats()["logged_examples"] == 3
@@ -35,14 +35,20 @@ def test_diagnostics_endpoints_are_available() -> None:
     assert payload["version"] == __version__
     assert payload["config"]["api"]["public_model_id"] == "mobius"
     assert payload["config"]["api"]["attribution"]["enabled"] is True
+    assert payload["routing"]["cache"]["hits"] == 0
+    assert payload["routing"]["cache"]["misses"] == 0
 
 
 class _StubOrchestrator:
     def __init__(self) -> None:
         self.last_user: str | None = None
+        self.bypass_cache: bool | None = None
 
-    async def complete_non_stream(self, payload: Any) -> dict[str, Any]:
+    async def complete_non_stream(
+        self, payload: Any, *, bypass_cache: bool = False
+    ) -> dict[str, Any]:
         self.last_user = getattr(payload, "user", None)
+        self.bypass_cache = bypass_cache
         return {
             "id": "chatcmpl-test",
             "object": "chat.completion",
@@ -125,3 +131,24 @@ def test_chat_completion_prefers_payload_user_over_forwarded_header() -> None:
     )
     assert response.status_code == 200
     assert stub.last_user == "payload-user"
+
+
+def test_chat_completion_cache_bypass_header_is_forwarded() -> None:
+    app = create_app()
+    stub = _StubOrchestrator()
+    app.state.services["orchestrator"] = stub
+    client = TestClient(app)
+    response = client.post(
+        "/v1/chat/completions",
+        headers={
+            "Authorization": "Bearer dev-local-key",
+            "X-Mobius-Cache": "bypass",
+        },
+        json={
+            "model": "mobius",
+            "messages": [{"role": "user", "content": "test"}],
+            "stream": False,
+        },
+    )
+    assert response.status_code == 200
+    assert stub.bypass_cache is True
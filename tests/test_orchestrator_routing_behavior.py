@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass, field
-from typing import Any
+import json
+from dataclasses import dataclass, field, replace
+from typing import Any, Collection
+
+import pytest
 
 from mobius.api.schemas import ChatCompletionRequest
 from mobius.config import AppConfig
 from mobius.orchestration.orchestrator import Orchestrator
+from mobius.orchestration.routing_cache import routing_cache_key
 from mobius.orchestration.specialist_router import SpecialistRoute
+from mobius.providers.context_cache import CacheablePrefix
 
 
 class StubLLMRouter:
@@ -30,6 +35,11 @@ class StubLLMRouter:
         stream: bool,
         passthrough: dict[str, Any] | None = None,
         include_fallbacks: bool = True,
+        hedge: bool = False,
+        prompt_cache_key: str | None = None,
+        cacheable_prefix: CacheablePrefix | None = None,
+        exclude_models: Collection[str] = (),
+        failed_models: set[str] | None = None,
     ) -> tuple[str, Any]:
         self.calls.append(
             {
@@ -38,6 +48,10 @@ class StubLLMRouter:
                 "stream": stream,
                 "passthrough": passthrough or {},
                 "include_fallbacks": include_fallbacks,
+                "hedge": hedge,
+                "prompt_cache_key": prompt_cache_key,
+                "cacheable_prefix": cacheable_prefix,
+                "exclude_models": set(exclude_models),
             }
         )
         return primary_model, {"choices": [{"message": {"content": self.answer_text}}]}
@@ -74,6 +88,11 @@ class StubSpecialistRouter:
 
 
 class StubPromptManager:
+    version = 1
+
+    def maybe_reload(self) -> None:
+        return None
+
     def get(self, key: str) -> str:
         prompts = {
             "orchestrator": "orchestrator prompt",
@@ -399,3 +418,721 @@ def test_build_system_prompt_for_general_domain() -> None:
     prompt = orchestrator._build_system_prompt([])
     assert isinstance(prompt, str)
     assert "general prompt" in prompt
+
+
+def _followup_request(session_id: str) -> ChatCompletionRequest:
+    return _request(
+        [
+            {"role": "user", "content": "Can you help with my homelab network?"},
+            {"role": "assistant", "content": "Previous answer from Mobius."},
+            {"role": "user", "content": "What should I improve next?"},
+        ],
+        session_id=session_id,
+    )
+
+
+def test_speculative_generation_overlaps_classifier_for_sticky_domain() -> None:
+    cfg = _config()
+    cfg.routing.speculative_generation = True
+    llm_router = StubLLMRouter(answer_text="Add monitoring.")
+
+    class SlowSpecialistRouter(StubSpecialistRouter):
+        calls_started_before_route: int = -1
+
+        async def classify(self, latest_user_text: str, **kwargs: Any) -> SpecialistRoute:
+            await asyncio.sleep(0.01)
+            self.calls_started_before_route = len(llm_router.calls)
+            return await super().classify(latest_user_text, **kwargs)
+
+    specialist_router = SlowSpecialistRouter(domain="homelab")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=specialist_router,  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    orchestrator.session_store.remember_domain("session_id:chat-s1", "homelab")
+
+    response = asyncio.run(orchestrator.complete_non_stream(_followup_request("chat-s1")))
+    content = str(response["choices"][0]["message"]["content"] or "")
+    assert specialist_router.calls_started_before_route == 1
+    assert len(llm_router.calls) == 1
+    assert llm_router.calls[0]["primary_model"] == "gemini-2.5-flash"
+    assert content.startswith("*Answered by The Builder (the homelab specialist)")
+
+
+def test_speculative_generation_is_replaced_when_classifier_switches_domain() -> None:
+    cfg = _config()
+    cfg.routing.speculative_generation = True
+
+    class SlowLLMRouter(StubLLMRouter):
+        async def chat_completion(self, **kwargs: Any) -> tuple[str, Any]:
+            if kwargs["primary_model"] == "gemini-2.5-flash":
+                await asyncio.sleep(1)
+            return await super().chat_completion(**kwargs)
+
+    llm_router = SlowLLMRouter(answer_text="Stretch daily.")
+    specialist_router = StubSpecialistRouter(domain="health")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=specialist_router,  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    orchestrator.session_store.remember_domain("session_id:chat-s2", "homelab")
+
+    response = asyncio.run(orchestrator.complete_non_stream(_followup_request("chat-s2")))
+    content = str(response["choices"][0]["message"]["content"] or "")
+    assert [call["primary_model"] for call in llm_router.calls] == ["gpt-4o-mini"]
+    assert content.startswith("*Answered by The Healer (the health specialist)")
+    assert orchestrator.session_store.recent_domains("session_id:chat-s2") == [
+        "homelab",
+        "health",
+    ]
+
+
+def test_request_cancelled_while_discarding_speculation_does_not_start_routed_call() -> None:
+    cfg = _config()
+    cfg.routing.speculative_generation = True
+    discarding = asyncio.Event()
+
+    class SlowCleanupLLMRouter(StubLLMRouter):
+        async def chat_completion(self, **kwargs: Any) -> tuple[str, Any]:
+            if kwargs["primary_model"] == "gemini-2.5-flash":
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    discarding.set()
+                    # Upstream cleanup that outlives the cancel request.
+                    await asyncio.shield(asyncio.sleep(0.05))
+                    raise
+            return await super().chat_completion(**kwargs)
+
+    class SlowSpecialistRouter(StubSpecialistRouter):
+        async def classify(self, latest_user_text: str, **kwargs: Any) -> SpecialistRoute:
+            await asyncio.sleep(0.01)
+            return await super().classify(latest_user_text, **kwargs)
+
+    llm_router = SlowCleanupLLMRouter()
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=SlowSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    orchestrator.session_store.remember_domain("session_id:chat-s3", "homelab")
+
+    async def run() -> None:
+        request_task = asyncio.create_task(
+            orchestrator.complete_non_stream(_followup_request("chat-s3"))
+        )
+        await discarding.wait()
+        request_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request_task
+
+    asyncio.run(run())
+    assert llm_router.calls == []
+
+
+def test_routing_cache_skips_classifier_for_regenerated_request() -> None:
+    orchestrator, llm_router, specialist_router = _build_orchestrator(
+        domain="health",
+        answer_text="Rest and ice.",
+    )
+    request = _request([{"role": "user", "content": "My knee hurts after running."}])
+    asyncio.run(orchestrator.complete_non_stream(request))
+    asyncio.run(orchestrator.complete_non_stream(request))
+    assert specialist_router.classify_calls == 1
+    assert [call["primary_model"] for call in llm_router.calls] == [
+        "gpt-4o-mini",
+        "gpt-4o-mini",
+    ]
+    stats = orchestrator.routing_stats()["cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_routing_cache_can_be_disabled() -> None:
+    cfg = _config()
+    cfg.routing.cache.enabled = False
+    specialist_router = StubSpecialistRouter(domain="health")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=StubLLMRouter(),  # type: ignore[arg-type]
+        specialist_router=specialist_router,  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    request = _request([{"role": "user", "content": "My knee hurts after running."}])
+    asyncio.run(orchestrator.complete_non_stream(request))
+    asyncio.run(orchestrator.complete_non_stream(request))
+    assert specialist_router.classify_calls == 2
+
+
+class HangingSpecialistRouter(StubSpecialistRouter):
+    async def classify(self, latest_user_text: str, **kwargs: Any) -> SpecialistRoute:
+        self.classify_calls += 1
+        await asyncio.sleep(5)
+        raise AssertionError("classifier should have been abandoned")
+
+
+def test_routing_timeout_keeps_sticky_session_domain() -> None:
+    cfg = _config()
+    cfg.runtime.routing_timeout_ms = 20
+    llm_router = StubLLMRouter(answer_text="Check the bridge config.")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=HangingSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    orchestrator.session_store.remember_domain("session_id:chat-t1", "homelab")
+    response = asyncio.run(orchestrator.complete_non_stream(_followup_request("chat-t1")))
+    content = str(response["choices"][0]["message"]["content"] or "")
+    assert content.startswith("*Answered by The Builder (the homelab specialist)")
+    assert llm_router.calls[0]["primary_model"] == "gemini-2.5-flash"
+    stats = orchestrator.routing_stats()
+    assert stats["timeouts"] == 1
+    assert stats["errors"] == 0
+
+
+def test_routing_timeout_without_session_history_uses_general() -> None:
+    cfg = _config()
+    cfg.runtime.routing_timeout_ms = 20
+    llm_router = StubLLMRouter(answer_text="Here is a plan.")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=HangingSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    request = _request([{"role": "user", "content": "Help me plan my week."}])
+    response = asyncio.run(orchestrator.complete_non_stream(request))
+    content = str(response["choices"][0]["message"]["content"] or "")
+    assert content.startswith("Here is a plan.")
+
+
+def test_classifier_error_keeps_sticky_session_domain() -> None:
+    orchestrator, llm_router, specialist_router = _build_orchestrator(domain="general")
+    specialist_router.reason = "orchestrator-error:RuntimeError"
+    orchestrator.session_store.remember_domain("session_id:chat-e1", "homelab")
+    asyncio.run(orchestrator.complete_non_stream(_followup_request("chat-e1")))
+    assert llm_router.calls[0]["primary_model"] == "gemini-2.5-flash"
+    stats = orchestrator.routing_stats()
+    assert stats["errors"] == 1
+    assert stats["timeouts"] == 0
+
+
+def test_tool_call_continuation_reuses_routing_of_originating_turn() -> None:
+    cfg = _config()
+    cfg.routing.cache.enabled = False
+    llm_router = StubLLMRouter(answer_text="Checking the node.")
+    specialist_router = StubSpecialistRouter(domain="homelab")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=specialist_router,  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    user_turn = {"role": "user", "content": "Why is my Proxmox node offline?"}
+    tool_call = {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": "call_1",
+                "type": "function",
+                "function": {"name": "node_status", "arguments": "{}"},
+            }
+        ],
+    }
+    tool_result = {"role": "tool", "tool_call_id": "call_1", "content": "offline"}
+
+    asyncio.run(orchestrator.complete_non_stream(_request([user_turn], session_id="t1")))
+    # The classifier now switches; tool hops must keep the turn's original domain.
+    specialist_router.domain = "health"
+    asyncio.run(
+        orchestrator.complete_non_stream(
+            _request([user_turn, tool_call, tool_result], session_id="t1")
+        )
+    )
+    asyncio.run(
+        orchestrator.complete_non_stream(_request([user_turn, tool_call], session_id="t1"))
+    )
+
+    assert specialist_router.classify_calls == 1
+    assert [call["primary_model"] for call in llm_router.calls] == ["gemini-2.5-flash"] * 3
+    assert orchestrator.session_store.recent_domains("session_id:t1") == ["homelab"]
+    assert orchestrator.routing_stats()["tool_continuations"] == 2
+
+    asyncio.run(
+        orchestrator.complete_non_stream(
+            _request(
+                [
+                    user_turn,
+                    tool_call,
+                    tool_result,
+                    {"role": "assistant", "content": "The node is offline."},
+                    {"role": "user", "content": "My back hurts from carrying it."},
+                ],
+                session_id="t1",
+            )
+        )
+    )
+    assert specialist_router.classify_calls == 2
+    assert llm_router.calls[-1]["primary_model"] == "gpt-4o-mini"
+
+
+def _stable_session_orchestrator(
+    mode: str, classifier_domain: str
+) -> tuple[Orchestrator, StubSpecialistRouter]:
+    cfg = _config()
+    cfg.routing.cache.enabled = False
+    cfg.routing.skip_policy.enabled = True
+    cfg.routing.skip_policy.mode = mode  # type: ignore[assignment]
+    specialist_router = StubSpecialistRouter(domain=classifier_domain, confidence=0.95)
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=StubLLMRouter(),  # type: ignore[arg-type]
+        specialist_router=specialist_router,  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    for _ in range(2):
+        orchestrator.session_store.remember_domain(
+            "session_id:chat-p1", "homelab", confidence=0.93
+        )
+    return orchestrator, specialist_router
+
+
+def test_skip_policy_skips_classifier_for_short_followup_in_stable_session() -> None:
+    orchestrator, specialist_router = _stable_session_orchestrator("skip", "health")
+    request = _request(
+        [
+            {"role": "user", "content": "Can you help with my homelab network?"},
+            {"role": "assistant", "content": "Previous answer from Mobius."},
+            {"role": "user", "content": "ok do it"},
+        ],
+        session_id="chat-p1",
+    )
+    asyncio.run(orchestrator.complete_non_stream(request))
+    assert specialist_router.classify_calls == 0
+    assert orchestrator.session_store.latest_domain("session_id:chat-p1") == "homelab"
+    stats = orchestrator.routing_stats()["skip_policy"]
+    assert stats["skipped"] == 1
+    assert stats["skip_rate"] == 1.0
+
+    long_request = _request(
+        [
+            {"role": "user", "content": "Can you help with my homelab network?"},
+            {"role": "assistant", "content": "Previous answer from Mobius."},
+            {
+                "role": "user",
+                "content": "Actually, I have been getting headaches every afternoon "
+                "and wonder whether it is related to screen time.",
+            },
+        ],
+        session_id="chat-p1",
+    )
+    asyncio.run(orchestrator.complete_non_stream(long_request))
+    assert specialist_router.classify_calls == 1
+    assert orchestrator.routing_stats()["skip_policy"]["skip_rate"] == 0.5
+
+
+def test_skip_policy_deferred_classifier_corrects_sticky_domain() -> None:
+    orchestrator, specialist_router = _stable_session_orchestrator("deferred", "health")
+    request = _request(
+        [
+            {"role": "user", "content": "Can you help with my homelab network?"},
+            {"role": "assistant", "content": "Previous answer from Mobius."},
+            {"role": "user", "content": "and what about tomorrow?"},
+        ],
+        session_id="chat-p1",
+    )
+
+    async def run() -> dict[str, Any]:
+        response = await orchestrator.complete_non_stream(request)
+        await asyncio.gather(*orchestrator._background_tasks)
+        return response
+
+    response = asyncio.run(run())
+    content = str(response["choices"][0]["message"]["content"] or "")
+    assert content.startswith("*Answered by The Builder (the homelab specialist)")
+    assert specialist_router.classify_calls == 1
+    assert orchestrator.session_store.recent_routes("session_id:chat-p1")[-1] == (
+        "health",
+        0.95,
+    )
+    stats = orchestrator.routing_stats()["skip_policy"]
+    assert stats["deferred"] == 1
+    assert stats["corrections"] == 1
+
+
+def test_skip_policy_requires_confident_stable_history() -> None:
+    orchestrator, specialist_router = _stable_session_orchestrator("skip", "homelab")
+    orchestrator.session_store.remember_domain(
+        "session_id:chat-p1", "homelab", confidence=0.4
+    )
+    request = _request(
+        [
+            {"role": "user", "content": "Can you help with my homelab network?"},
+            {"role": "assistant", "content": "Previous answer from Mobius."},
+            {"role": "user", "content": "thanks"},
+        ],
+        session_id="chat-p1",
+    )
+    asyncio.run(orchestrator.complete_non_stream(request))
+    assert specialist_router.classify_calls == 1
+
+
+def test_stream_recovery_continues_partial_answer_on_fallback_model() -> None:
+    cfg = _config()
+    cfg.models.fallbacks = ["gemini-2.5-flash"]
+    cfg.models.stream_recovery.enabled = True
+
+    async def broken_stream() -> Any:
+        yield {"id": "chatcmpl-1", "choices": [{"delta": {"content": "First half, "}}]}
+        raise ConnectionError("upstream reset")
+
+    async def continuation_stream() -> Any:
+        yield {
+            "id": "chatcmpl-2",
+            "choices": [{"delta": {"role": "assistant", "content": "second half."}}],
+        }
+
+    class FlakyStreamLLMRouter(StubLLMRouter):
+        async def chat_completion(self, **kwargs: Any) -> tuple[str, Any]:
+            self.calls.append(kwargs)
+            if len(self.calls) == 1:
+                return kwargs["primary_model"], broken_stream()
+            return kwargs["primary_model"], continuation_stream()
+
+    llm_router = FlakyStreamLLMRouter()
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=StubSpecialistRouter(domain="general"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+
+    async def collect() -> list[bytes]:
+        request = _request([{"role": "user", "content": "Explain it."}])
+        return [part async for part in orchestrator.stream_sse(request)]
+
+    parts = asyncio.run(collect())
+    assert parts[-1] == b"data: [DONE]\n\n"
+    payloads = [json.loads(part[len(b"data: ") :]) for part in parts[:-1]]
+    assert [p["choices"][0]["delta"] for p in payloads] == [
+        {"content": "First half, "},
+        {"content": "second half."},
+    ]
+    assert {p["id"] for p in payloads} == {"chatcmpl-1"}
+    continuation = llm_router.calls[1]
+    assert continuation["primary_model"] == "gemini-2.5-flash"
+    assert continuation["messages"][-2] == {"role": "assistant", "content": "First half, "}
+    prompt = cfg.models.stream_recovery.continuation_prompt
+    assert continuation["messages"][-1] == {"role": "user", "content": prompt}
+    assert orchestrator.stream_stats()["recoveries"] == 1
+
+
+def test_stream_recovery_skips_models_that_already_failed_for_the_request() -> None:
+    cfg = _config()
+    cfg.models.fallbacks = ["gemini-2.5-flash", "gpt-4.1-mini"]
+    cfg.models.stream_recovery.enabled = True
+
+    async def broken_stream() -> Any:
+        yield {"id": "chatcmpl-1", "choices": [{"delta": {"content": "First half, "}}]}
+        raise ConnectionError("upstream reset")
+
+    async def continuation_stream() -> Any:
+        yield {"id": "chatcmpl-2", "choices": [{"delta": {"content": "second half."}}]}
+
+    class FallbackStreamLLMRouter(StubLLMRouter):
+        async def chat_completion(self, **kwargs: Any) -> tuple[str, Any]:
+            await super().chat_completion(**kwargs)
+            if len(self.calls) == 1:
+                # The routed primary failed to start; the first fallback streamed.
+                kwargs["failed_models"].add(kwargs["primary_model"])
+                return "gemini-2.5-flash", broken_stream()
+            return kwargs["primary_model"], continuation_stream()
+
+    llm_router = FallbackStreamLLMRouter()
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=StubSpecialistRouter(domain="general"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+
+    async def collect() -> list[bytes]:
+        request = _request([{"role": "user", "content": "Explain it."}])
+        return [part async for part in orchestrator.stream_sse(request)]
+
+    asyncio.run(collect())
+    primary = llm_router.calls[0]["primary_model"]
+    continuation = llm_router.calls[1]
+    assert continuation["primary_model"] == "gpt-4.1-mini"
+    assert {primary, "gemini-2.5-flash"} <= continuation["exclude_models"]
+
+
+def test_response_cache_serves_repeated_deterministic_request(tmp_path: Any) -> None:
+    cfg = _config()
+    cfg.response_cache.enabled = True
+    cfg.response_cache.disk_directory = tmp_path
+
+    def build() -> tuple[Orchestrator, StubLLMRouter]:
+        llm_router = StubLLMRouter(answer_text="Cached answer.")
+        orchestrator = Orchestrator(
+            config=cfg,
+            llm_router=llm_router,  # type: ignore[arg-type]
+            specialist_router=StubSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+            prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+        )
+        return orchestrator, llm_router
+
+    def request(temperature: float) -> ChatCompletionRequest:
+        return ChatCompletionRequest.model_validate(
+            {
+                "model": "mobius",
+                "messages": [{"role": "user", "content": "Summarize this chat."}],
+                "temperature": temperature,
+            }
+        )
+
+    orchestrator, llm_router = build()
+    first = asyncio.run(orchestrator.complete_non_stream(request(0)))
+    second = asyncio.run(orchestrator.complete_non_stream(request(0)))
+    bypassed = asyncio.run(orchestrator.complete_non_stream(request(0), bypass_cache=True))
+    asyncio.run(orchestrator.complete_non_stream(request(0.7)))
+    first_text = first["choices"][0]["message"]["content"]
+    assert second["choices"][0]["message"]["content"] == first_text
+    assert bypassed["choices"][0]["message"]["content"] == first_text
+    assert len(llm_router.calls) == 3
+    stats = orchestrator.response_cache_stats()
+    assert stats["memory_hits"] == 1
+    assert stats["bypassed"] == 1
+
+    # A fresh process reads the disk tier.
+    restarted, restarted_router = build()
+    asyncio.run(restarted.complete_non_stream(request(0)))
+    assert restarted_router.calls == []
+    assert restarted.response_cache_stats()["disk_hits"] == 1
+
+
+def test_response_cache_hits_are_not_counted_as_prompt_cache_usage() -> None:
+    cfg = _config()
+    cfg.response_cache.enabled = True
+
+    class UsageLLMRouter(StubLLMRouter):
+        async def chat_completion(self, **kwargs: Any) -> tuple[str, Any]:
+            used_model, response = await super().chat_completion(**kwargs)
+            response["usage"] = {
+                "prompt_tokens": 1000,
+                "completion_tokens": 10,
+                "prompt_tokens_details": {"cached_tokens": 800},
+            }
+            return used_model, response
+
+    llm_router = UsageLLMRouter(answer_text="Cached answer.")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=StubSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    request = ChatCompletionRequest.model_validate(
+        {
+            "model": "mobius",
+            "messages": [{"role": "user", "content": "Summarize this chat."}],
+            "temperature": 0,
+        }
+    )
+
+    asyncio.run(orchestrator.complete_non_stream(request))
+    asyncio.run(orchestrator.complete_non_stream(request))
+    assert len(llm_router.calls) == 1
+    assert orchestrator.response_cache_stats()["memory_hits"] == 1
+    (model_stats,) = orchestrator.prompt_cache_stats()["models"].values()
+    assert model_stats["responses"] == 1
+    assert model_stats["cached_tokens"] == 800
+
+
+def test_semantic_cache_answers_similar_first_turn_question() -> None:
+    pytest.importorskip("numpy")
+    cfg = _config()
+    cfg.semantic_cache.enabled = True
+    cfg.specialists.by_domain["health"].semantic_cache = True
+    vectors = {
+        "How much water should I drink daily?": [1.0, 0.1, 0.0],
+        "How much water should I drink each day?": [0.98, 0.12, 0.0],
+        "How do I sleep better?": [0.0, 0.2, 1.0],
+    }
+
+    class EmbeddingLLMRouter(StubLLMRouter):
+        async def embedding(self, *, primary_model: str, input_text: str) -> Any:
+            return primary_model, vectors[input_text]
+
+    llm_router = EmbeddingLLMRouter(answer_text="About two liters.")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=StubSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+
+    def ask(text: str) -> str:
+        request = _request([{"role": "user", "content": text}])
+        response = asyncio.run(orchestrator.complete_non_stream(request))
+        return str(response["choices"][0]["message"]["content"])
+
+    first = ask("How much water should I drink daily?")
+    second = ask("How much water should I drink each day?")
+    ask("How do I sleep better?")
+    assert second == first
+    assert len(llm_router.calls) == 2
+    stats = orchestrator.semantic_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["stores"] == 2
+
+
+def test_semantic_cache_skips_structured_requests_and_passthrough_routes() -> None:
+    pytest.importorskip("numpy")
+    cfg = _config()
+    cfg.semantic_cache.enabled = True
+    cfg.specialists.by_domain["health"].semantic_cache = True
+    cfg.api.allow_provider_model_passthrough = True
+
+    class EmbeddingLLMRouter(StubLLMRouter):
+        async def embedding(self, *, primary_model: str, input_text: str) -> Any:
+            return primary_model, [1.0, 0.1, 0.0]
+
+    llm_router = EmbeddingLLMRouter(answer_text="About two liters.")
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=StubSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    messages = [{"role": "user", "content": "How much water should I drink daily?"}]
+    asyncio.run(orchestrator.complete_non_stream(_request(messages)))
+    structured = ChatCompletionRequest.model_validate(
+        {
+            "model": "mobius",
+            "messages": messages,
+            "response_format": {"type": "json_object"},
+        }
+    )
+    passthrough_route = ChatCompletionRequest.model_validate(
+        {"model": "gpt-4o-mini", "messages": messages}
+    )
+    asyncio.run(orchestrator.complete_non_stream(structured))
+    asyncio.run(orchestrator.complete_non_stream(passthrough_route))
+    assert len(llm_router.calls) == 3
+    stats = orchestrator.semantic_cache_stats()
+    assert stats["lookups"] == 1
+    assert stats["stores"] == 1
+
+
+def test_system_prompt_keeps_static_prefix_and_sends_session_cache_key() -> None:
+    orchestrator, llm_router, _specialist_router = _build_orchestrator(domain="health")
+    request = _request(
+        [{"role": "user", "content": "Knee pain after runs?"}], session_id="chat-pc"
+    )
+    asyncio.run(orchestrator.complete_non_stream(request))
+    asyncio.run(orchestrator.complete_non_stream(request))
+    first, second = (str(call["messages"][0]["content"]) for call in llm_router.calls)
+    static, _, timestamp = first.rpartition("\n\n")
+    assert static.startswith("orchestrator prompt")
+    assert timestamp.startswith("Current timestamp:")
+    assert second.startswith(static)
+    keys = {call["prompt_cache_key"] for call in llm_router.calls}
+    assert len(keys) == 1
+    key = keys.pop()
+    assert key.startswith("mobius:health:") and "chat-pc" not in key
+
+
+def test_cached_prompt_tokens_are_tracked_from_usage() -> None:
+    class UsageLLMRouter(StubLLMRouter):
+        async def chat_completion(self, **kwargs: Any) -> tuple[str, Any]:
+            model, response = await super().chat_completion(**kwargs)
+            response["usage"] = {
+                "prompt_tokens": 2000,
+                "completion_tokens": 50,
+                "prompt_tokens_details": {"cached_tokens": 1536},
+            }
+            return model, response
+
+    orchestrator = Orchestrator(
+        config=_config(),
+        llm_router=UsageLLMRouter(),  # type: ignore[arg-type]
+        specialist_router=StubSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    asyncio.run(
+        orchestrator.complete_non_stream(_request([{"role": "user", "content": "Hi"}]))
+    )
+    stats = orchestrator.prompt_cache_stats()["models"]["gpt-4o-mini"]
+    assert stats["cached_tokens"] == 1536
+    assert stats["cached_ratio"] == 0.768
+
+
+def test_context_budget_trims_oldest_history_for_domain() -> None:
+    cfg = _config()
+    cfg.context_budget.enabled = True
+    cfg.specialists.by_domain["homelab"].max_context_tokens = 600
+    llm_router = StubLLMRouter()
+    orchestrator = Orchestrator(
+        config=cfg,
+        llm_router=llm_router,  # type: ignore[arg-type]
+        specialist_router=StubSpecialistRouter(domain="homelab"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    history: list[dict[str, Any]] = []
+    for index in range(8):
+        history.append({"role": "user", "content": f"Setup step {index}? " + "disk " * 80})
+        history.append({"role": "assistant", "content": f"Step {index} done. " + "ok " * 80})
+    history.append({"role": "user", "content": "Which step failed?"})
+    asyncio.run(orchestrator.complete_non_stream(_request(history)))
+
+    sent = llm_router.calls[0]["messages"]
+    assert sent[0]["role"] == "system"
+    assert sent[-1] == {"role": "user", "content": "Which step failed?"}
+    assert len(sent) < len(history) + 1
+    assert not any("Setup step 0?" in str(message["content"]) for message in sent)
+    stats = orchestrator.context_budget_stats()
+    assert stats["trimmed_requests"] == 1
+    assert stats["trimmed_tokens"] > 0
+
+
+def test_streamed_route_confidence_is_written_back_after_early_commit() -> None:
+    class EarlyCommitSpecialistRouter(StubSpecialistRouter):
+        async def classify(self, latest_user_text: str, **kwargs: Any) -> SpecialistRoute:
+            route = await super().classify(latest_user_text, **kwargs)
+            settled = asyncio.get_running_loop().create_future()
+            # The classifier tail finishes after the specialist answer.
+            asyncio.get_running_loop().call_later(
+                0.02, settled.set_result, replace(route, confidence=0.93)
+            )
+            return replace(route, confidence=0.0, settled=settled)
+
+    orchestrator = Orchestrator(
+        config=_config(),
+        llm_router=StubLLMRouter(),  # type: ignore[arg-type]
+        specialist_router=EarlyCommitSpecialistRouter(domain="health"),  # type: ignore[arg-type]
+        prompt_manager=StubPromptManager(),  # type: ignore[arg-type]
+    )
+    request = _request([{"role": "user", "content": "Knee pain?"}], session_id="chat-st")
+
+    async def run() -> None:
+        await orchestrator.complete_non_stream(request)
+        assert orchestrator.session_store.recent_routes("session_id:chat-st") == [
+            ("health", 0.0)
+        ]
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert orchestrator.session_store.recent_routes("session_id:chat-st") == [
+        ("health", 0.93)
+    ]
+    cache_key = routing_cache_key(request.messages, None)
+    cached = orchestrator.routing_cache.get(cache_key)
+    assert cached is not None and cached.confidence == 0.93
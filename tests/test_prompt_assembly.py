@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+import pytest
+
+from mobius.config import AppConfig
+from mobius.orchestration.specialist_router import _routing_system_prompt
+from mobius.prompts.assembly import SystemPromptAssembler
+from mobius.prompts.manager import PromptManager
+
+PROMPT_FILES = {
+    "_orchestrator.md": "orchestrator v1",
+    "general.md": "general v1",
+    "health.md": "health v1",
+    "parenting.md": "parenting v1",
+    "relationships.md": "relationships v1",
+    "homelab.md": "homelab v1",
+    "personal_development.md": "personal_development v1",
+}
+
+
+def _config(prompt_dir: Path) -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "server": {"api_keys": []},
+            "providers": {
+                "openai": {"api_key": "test-openai-key"},
+                "gemini": {
+                    "api_key": "test-gemini-key",
+                    "base_url": "https://generativelanguage.googleapis.com/v1beta/openai/",
+                },
+            },
+            "models": {"orchestrator": "gpt-5-nano-2025-08-07", "fallbacks": []},
+            "api": {
+                "public_model_id": "mobius",
+                "allow_provider_model_passthrough": False,
+            },
+            "specialists": {
+                "prompts_directory": str(prompt_dir),
+                "auto_reload": True,
+                "orchestrator_prompt_file": "_orchestrator.md",
+                "by_domain": {
+                    domain: {"model": "gpt-4o-mini", "prompt_file": f"{domain}.md"}
+                    for domain in (
+                        "general",
+                        "health",
+                        "parenting",
+                        "relationships",
+                        "homelab",
+                        "personal_development",
+                    )
+                },
+            },
+        }
+    )
+
+
+def _assembler(tmp_path: Path) -> tuple[SystemPromptAssembler, Path]:
+    prompt_dir = tmp_path / "prompts"
+    prompt_dir.mkdir(parents=True, exist_ok=True)
+    for filename, content in PROMPT_FILES.items():
+        (prompt_dir / filename).write_text(content, encoding="utf-8")
+    return SystemPromptAssembler(PromptManager(_config(prompt_dir))), prompt_dir
+
+
+def test_assembled_body_matches_prompt_layout(tmp_path: Path) -> None:
+    assembler, _ = _assembler(tmp_path)
+
+    assert assembler.body(()) == "general v1"
+    assert assembler.body(("health",)) == (
+        "orchestrator v1\n\nSpecialist instructions:\n"
+        "- Health Specialist (health):\nhealth v1"
+    )
+
+
+def test_assembled_body_is_reused_until_prompt_changes(tmp_path: Path) -> None:
+    assembler, prompt_dir = _assembler(tmp_path)
+
+    first = assembler.body(("health",))
+    assert assembler.body(("health",)) is first
+
+    (prompt_dir / "health.md").write_text("health v2", encoding="utf-8")
+    refreshed = assembler.body(("health",))
+    assert refreshed.endswith("health v2")
+    assert assembler.body(("health",)) is refreshed
+
+
+@pytest.mark.benchmark
+def test_prompt_assembly_overhead_microbenchmark(tmp_path: Path) -> None:
+    assembler, _ = _assembler(tmp_path)
+    iterations = 500
+    cases = {
+        "specialist": lambda: assembler.body(("homelab",)),
+        "routing": lambda: _routing_system_prompt(
+            "Current sticky specialist domain: homelab",
+            "Recent specialist domains (newest last): homelab",
+        ),
+    }
+    for name, build in cases.items():
+        samples: list[float] = []
+        for _ in range(5):
+            started = perf_counter()
+            for _ in range(iterations):
+                build()
+            samples.append((perf_counter() - started) / iterations)
+        per_call_us = median(samples) * 1_000_000
+        print(f"{name} system prompt assembly={per_call_us:.1f}us")
+        # The specialist body still does one prompt-file reload check per request.
+        assert per_call_us < 500
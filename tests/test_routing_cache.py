@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Any
+
+from mobius.api.schemas import OpenAIMessage
+from mobius.orchestration import routing_cache as routing_cache_module
+from mobius.orchestration.routing_cache import RoutingDecisionCache, routing_cache_key
+from mobius.orchestration.specialist_router import SpecialistRoute
+
+
+def _messages(*items: tuple[str, str]) -> list[OpenAIMessage]:
+    return [OpenAIMessage(role=role, content=content) for role, content in items]
+
+
+def _route(domain: str) -> SpecialistRoute:
+    return SpecialistRoute(
+        domain=domain,
+        confidence=0.9,
+        reason="test",
+        orchestrator_model="gpt-5-nano-2025-08-07",
+    )
+
+
+def test_cache_key_normalizes_latest_user_text() -> None:
+    first = routing_cache_key(_messages(("user", "Proxmox   backups?")), None)
+    second = routing_cache_key(_messages(("user", "  proxmox backups?\n")), None)
+    assert first == second
+
+
+def test_cache_key_depends_on_prefix_and_current_domain() -> None:
+    base = _messages(
+        ("user", "Help with my network."),
+        ("assistant", "Sure."),
+        ("user", "What next?"),
+    )
+    other_prefix = _messages(
+        ("user", "Help with my knee."),
+        ("assistant", "Sure."),
+        ("user", "What next?"),
+    )
+    assert routing_cache_key(base, "homelab") != routing_cache_key(other_prefix, "homelab")
+    assert routing_cache_key(base, "homelab") != routing_cache_key(base, "health")
+
+
+def test_cache_evicts_least_recently_used_entry() -> None:
+    cache = RoutingDecisionCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", _route("health"))
+    cache.put("b", _route("homelab"))
+    assert cache.get("a") is not None
+    cache.put("c", _route("parenting"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_cache_expires_entries_after_ttl(monkeypatch: Any) -> None:
+    now = [100.0]
+    monkeypatch.setattr(routing_cache_module, "monotonic", lambda: now[0])
+    cache = RoutingDecisionCache(max_entries=8, ttl_seconds=30)
+    cache.put("a", _route("health"))
+    now[0] = 120.0
+    assert cache.get("a") is not None
+    now[0] = 131.0
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 0
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+import mobius.__main__ as cli
+from mobius.config import AppConfig
+from mobius.routing_eval import (
+    BACKENDS,
+    load_corpus,
+    run_routing_eval,
+    summarize_results,
+)
+
+
+def _config_payload(prompt_dir: Path) -> dict[str, Any]:
+    return {
+        "server": {"api_keys": []},
+        "providers": {
+            "openai": {"api_key": "test-openai-key"},
+            "gemini": {
+                "api_key": "test-gemini-key",
+                "base_url": "https://generativelanguage.googleapis.com/v1beta/openai/",
+            },
+        },
+        "models": {"orchestrator": "gpt-5-nano-2025-08-07", "fallbacks": []},
+        "api": {"public_model_id": "mobius"},
+        "specialists": {
+            "prompts_directory": str(prompt_dir),
+            "orchestrator_prompt_file": "_orchestrator.md",
+            "by_domain": {
+                "general": {"model": "gpt-4o-mini", "prompt_file": "general.md"},
+                "health": {"model": "gpt-4o-mini", "prompt_file": "health.md"},
+                "parenting": {"model": "gpt-4o-mini", "prompt_file": "parenting.md"},
+                "relationships": {
+                    "model": "gpt-4o-mini",
+                    "prompt_file": "relationships.md",
+                },
+                "homelab": {"model": "gemini-2.5-flash", "prompt_file": "homelab.md"},
+                "personal_development": {
+                    "model": "gpt-4o-mini",
+                    "prompt_file": "personal_development.md",
+                },
+            },
+        },
+    }
+
+
+def _write_corpus(path: Path, cases: list[dict[str, Any]], version: int = 1) -> None:
+    lines = [json.dumps({"format": "mobius-routing-corpus", "version": version})]
+    lines.extend(json.dumps(case) for case in cases)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _recorded(domain: str) -> dict[str, Any]:
+    return {"specialist": domain, "confidence": 0.9, "reason": "recorded"}
+
+
+CASES: list[dict[str, Any]] = [
+    {
+        "id": "knee",
+        "messages": [{"role": "user", "content": "My knee hurts after running."}],
+        "expected_domain": "health",
+        "recorded_response": _recorded("health"),
+        "recorded_usage": {"prompt_tokens": 300, "completion_tokens": 20},
+    },
+    {
+        "id": "vlan",
+        "messages": [{"role": "user", "content": "How do I set up VLANs in Proxmox?"}],
+        "expected_domain": "homelab",
+        "recorded_response": _recorded("homelab"),
+        "recorded_usage": {"prompt_tokens": 310, "completion_tokens": 20},
+    },
+    {
+        "id": "toddler",
+        "messages": [{"role": "user", "content": "My toddler will not sleep."}],
+        "expected_domain": "parenting",
+        "recorded_response": _recorded("health"),
+        "recorded_usage": {"prompt_tokens": 290, "completion_tokens": 20},
+    },
+    {
+        "id": "followup",
+        "recent_domains": ["homelab"],
+        "messages": [
+            {"role": "user", "content": "How do I set up VLANs in Proxmox?"},
+            {"role": "assistant", "content": "Create a Linux bridge first."},
+            {"role": "user", "content": "route to health specialist"},
+        ],
+        "expected_domain": "health",
+    },
+]
+
+
+def test_recorded_backend_reports_accuracy_confusion_and_tokens(tmp_path: Path) -> None:
+    corpus = tmp_path / "corpus.jsonl"
+    _write_corpus(corpus, CASES)
+    config = AppConfig.model_validate(_config_payload(tmp_path / "prompts"))
+
+    results = asyncio.run(run_routing_eval(config, load_corpus(corpus), concurrency=4))
+    summary = summarize_results(results)
+
+    assert summary["cases"] == 4
+    assert summary["accuracy"] == 0.75
+    assert summary["confusion"]["parenting"]["health"] == 1
+    assert summary["per_domain"]["health"]["correct"] == 2
+    assert summary["per_domain"]["health"]["prompt_tokens"] == 300
+    assert summary["prompt_tokens"] == 900
+    assert summary["completion_tokens"] == 60
+    assert {"p50_ms", "p95_ms"} <= set(summary["per_domain"]["homelab"])
+    by_id = {result.case_id: result for result in results}
+    assert by_id["followup"].reason == "explicit-switch"
+
+
+def test_eval_does_not_write_training_or_shadow_logs(tmp_path: Path) -> None:
+    corpus = tmp_path / "corpus.jsonl"
+    _write_corpus(corpus, CASES)
+    payload = _config_payload(tmp_path / "prompts")
+    payload["routing"] = {
+        "local_classifier": {
+            "enabled": True,
+            "training_log": str(tmp_path / "routing-decisions.jsonl"),
+        },
+        "shadow": {
+            "enabled": True,
+            "sample_rate": 1.0,
+            "log_file": str(tmp_path / "routing-shadow.jsonl"),
+        },
+    }
+    config = AppConfig.model_validate(payload)
+
+    results = asyncio.run(run_routing_eval(config, load_corpus(corpus)))
+
+    assert len(results) == 4
+    assert not (tmp_path / "routing-decisions.jsonl").exists()
+    assert not (tmp_path / "routing-shadow.jsonl").exists()
+    assert config.routing.shadow.enabled is True
+
+
+def test_mock_backend_routes_without_recorded_responses(tmp_path: Path) -> None:
+    corpus = tmp_path / "corpus.jsonl"
+    _write_corpus(
+        corpus,
+        [
+            {
+                "messages": [{"role": "user", "content": "homelab proxmox server"}],
+                "expected_domain": "homelab",
+            }
+        ],
+    )
+    config = AppConfig.model_validate(_config_payload(tmp_path / "prompts"))
+    results = asyncio.run(
+        run_routing_eval(config, load_corpus(corpus), backend="mock")
+    )
+    assert results[0].predicted_domain == "homelab"
+    assert results[0].prompt_tokens > 0
+
+
+def test_corpus_version_is_checked(tmp_path: Path) -> None:
+    corpus = tmp_path / "corpus.jsonl"
+    _write_corpus(corpus, CASES, version=99)
+    with pytest.raises(ValueError, match="version"):
+        load_corpus(corpus)
+
+
+def test_routing_eval_command_fails_below_min_accuracy(
+    tmp_path: Path, monkeypatch, capsys
+) -> None:
+    cfg_path = tmp_path / "config.yaml"
+    cfg_path.write_text(
+        yaml.safe_dump(_config_payload(tmp_path / "prompts"), sort_keys=False),
+        encoding="utf-8",
+    )
+    corpus = tmp_path / "corpus.jsonl"
+    _write_corpus(corpus, CASES)
+    monkeypatch.setenv("MOBIUS_DISABLE_DOTENV", "1")
+
+    args = cli._build_parser().parse_args(
+        [
+            "routing-eval",
+            str(corpus),
+            "--config",
+            str(cfg_path),
+            "--env-file",
+            str(tmp_path / "missing.env"),
+            "--min-accuracy",
+            "0.9",
+        ]
+    )
+    rc = cli._cmd_routing_eval(args)
+    output = capsys.readouterr().out
+    assert rc == 1
+    assert "Accuracy: 75.00%" in output
+    assert "Confusion matrix" in output
+
+
+def test_routing_eval_parser_backends_match_module() -> None:
+    parser = cli._build_parser()
+    for backend in BACKENDS:
+        args = parser.parse_args(["routing-eval", "corpus.jsonl", "--backend", backend])
+        assert args.backend == backend
+    with pytest.raises(SystemExit):
+        parser.parse_args(["routing-eval", "corpus.jsonl", "--backend", "unknown"])
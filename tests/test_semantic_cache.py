@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from mobius.config import SemanticCacheConfig
+from mobius.orchestration.semantic_cache import SemanticAnswerCache
+
+
+def _cache(**overrides: object) -> SemanticAnswerCache:
+    return SemanticAnswerCache(
+        SemanticCacheConfig.model_validate(
+            {"enabled": True, "similarity_threshold": 0.9, **overrides}
+        )
+    )
+
+
+def test_lookup_returns_answer_above_threshold_within_domain() -> None:
+    cache = _cache()
+    cache.store(
+        "health", "How much water per day?", [1.0, 0.0, 0.1], "gpt-5.2", "About 2 liters."
+    )
+    hit = cache.lookup("health", [0.9, 0.0, 0.12])
+    assert hit is not None
+    assert hit.answer == "About 2 liters."
+    assert hit.model == "gpt-5.2"
+    assert hit.similarity > 0.99
+    assert cache.lookup("health", [0.0, 1.0, 0.0]) is None
+    assert cache.lookup("homelab", [1.0, 0.0, 0.1]) is None
+    stats = cache.stats()
+    assert stats["lookups"] == 3
+    assert stats["hits"] == 1
+    assert stats["entries"] == {"health": 1, "homelab": 0}
+
+
+def test_index_is_bounded_and_entries_expire() -> None:
+    cache = _cache(max_entries_per_domain=2)
+    cache.store("homelab", "q1", [1.0, 0.0, 0.0], "m", "a1")
+    cache.store("homelab", "q2", [0.0, 1.0, 0.0], "m", "a2")
+    cache.store("homelab", "q3", [0.0, 0.0, 1.0], "m", "a3")
+    assert cache.lookup("homelab", [1.0, 0.0, 0.0]) is None
+    hit = cache.lookup("homelab", [0.0, 0.0, 1.0])
+    assert hit is not None and hit.answer == "a3"
+
+    expiring = _cache(ttl_seconds=0)
+    expiring.store("homelab", "q1", [1.0, 0.0, 0.0], "m", "a1")
+    assert expiring.lookup("homelab", [1.0, 0.0, 0.0]) is None
+
+
+def test_memory_mapped_index_survives_restart(tmp_path: Path) -> None:
+    cache = _cache(index_directory=tmp_path)
+    cache.store(
+        "health", "Best stretch?", [0.2, 0.9, 0.1], "gpt-5.2", "Hamstring stretch."
+    )
+    asyncio.run(cache.flush())
+    assert (tmp_path / "health.f32").exists()
+
+    reloaded = _cache(index_directory=tmp_path)
+    hit = reloaded.lookup("health", [0.2, 0.9, 0.1])
+    assert hit is not None
+    assert hit.question == "Best stretch?"
+    assert hit.answer == "Hamstring stretch."
+
+
+def test_stores_are_flushed_in_background_as_appended_records(tmp_path: Path) -> None:
+    cache = _cache(
+        index_directory=tmp_path, max_entries_per_domain=2, flush_interval_seconds=0
+    )
+    log_path = tmp_path / "homelab.jsonl"
+
+    def records() -> list[dict[str, object]]:
+        return [json.loads(line) for line in log_path.read_text().splitlines()[1:]]
+
+    async def run() -> None:
+        cache.store("homelab", "q1", [1.0, 0.0, 0.0], "m", "a1")
+        cache.store("homelab", "q2", [0.0, 1.0, 0.0], "m", "a2")
+        assert not log_path.exists()
+        await asyncio.sleep(0.05)
+        assert [r["question"] for r in records()] == ["q1", "q2"]
+        # Replacing the oldest slot appends a record instead of rewriting the log.
+        cache.store("homelab", "q3", [0.0, 0.0, 1.0], "m", "a3")
+        await cache.flush()
+        assert [r["question"] for r in records()] == ["q1", "q2", "q3"]
+        # Past twice the capacity the log is compacted to one record per slot.
+        cache.store("homelab", "q4", [1.0, 1.0, 0.0], "m", "a4")
+        cache.store("homelab", "q5", [0.0, 1.0, 1.0], "m", "a5")
+        await cache.flush()
+        assert sorted(r["question"] for r in records()) == ["q4", "q5"]
+
+    asyncio.run(run())
+    reloaded = _cache(index_directory=tmp_path, max_entries_per_domain=2)
+    hit = reloaded.lookup("homelab", [0.0, 1.0, 1.0])
+    assert hit is not None and hit.answer == "a5"
+    assert reloaded.lookup("homelab", [0.0, 0.0, 1.0]) is None
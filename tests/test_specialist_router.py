@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from typing import Any
 
+import litellm
+
 from mobius.config import AppConfig
-from mobius.orchestration.specialist_router import SpecialistRoute, SpecialistRouter
+from mobius.orchestration import shadow_routing
+from mobius.orchestration.specialist_router import (
+    SpecialistRoute,
+    SpecialistRouter,
+    settled_route,
+)
 
 
 class StubLLMRouter:
@@ -200,3 +208,500 @@ def test_routing_prompt_includes_session_domain_history_context() -> None:
     assert "current_domain: homelab" in system_prompt
     assert "recent_domains: health, homelab" in system_prompt
     assert "Change domain only if the latest user message clearly requests a different specialist/domain" in system_prompt
+
+
+def test_explicit_switch_command_skips_llm_classifier() -> None:
+    query = "naj odgovori personal_development specialist"
+    llm = StubLLMRouter(outputs=[])
+    router = SpecialistRouter(config=_config(), llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify(query, current_domain="health"))
+    _print_route(query, result)
+    assert result.domain == "personal_development"
+    assert result.confidence == 1.0
+    assert result.reason == "explicit-switch"
+    assert llm.calls == []
+
+
+class LogprobStubLLMRouter(StubLLMRouter):
+    def __init__(self, content: str, logprobs: list[float] | None) -> None:
+        super().__init__(outputs=[content], model_name="gpt-4o-mini")
+        self.logprobs = logprobs
+
+    async def chat_completion(self, **kwargs: Any) -> tuple[str, Any]:
+        used_model, response = await super().chat_completion(**kwargs)
+        if self.logprobs is not None:
+            response["choices"][0]["logprobs"] = {
+                "content": [
+                    {"token": f"t{idx}", "logprob": value}
+                    for idx, value in enumerate(self.logprobs)
+                ]
+            }
+        return used_model, response
+
+
+def _label_config(orchestrator: str = "gpt-4o-mini") -> AppConfig:
+    config = _config()
+    config.models.orchestrator = orchestrator
+    config.routing.protocol = "label"
+    return config
+
+
+def test_label_protocol_uses_logprob_confidence_and_token_cap() -> None:
+    query = "My Proxmox node keeps rebooting."
+    llm = LogprobStubLLMRouter("homelab", logprobs=[-0.05])
+    router = SpecialistRouter(config=_label_config(), llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify(query))
+    _print_route(query, result)
+    assert result.domain == "homelab"
+    assert abs(result.confidence - 0.951) < 0.001
+    assert result.reason == "label-logprob"
+    passthrough = llm.calls[0]["passthrough"]
+    # The constrained JSON answer needs more than the bare-label cap of 8.
+    longest = '{"specialist": "personal_development"}'
+    assert passthrough["max_tokens"] > len(litellm.encoding.encode(longest))
+    assert passthrough["logprobs"] is True
+    enum = passthrough["response_format"]["json_schema"]["schema"]["properties"][
+        "specialist"
+    ]["enum"]
+    assert "personal_development" in enum
+    system_prompt = str(llm.calls[0]["messages"][0]["content"])
+    assert "respond with ONLY the domain name" in system_prompt
+    assert '"reason"' not in system_prompt
+
+
+def test_label_protocol_keeps_bare_label_cap_without_constrained_output() -> None:
+    llm = LogprobStubLLMRouter("homelab", logprobs=[-0.05])
+    config = _label_config()
+    config.routing.label.constrained_output = False
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+    assert asyncio.run(router.classify("My Proxmox node keeps rebooting.")).domain == "homelab"
+    passthrough = llm.calls[0]["passthrough"]
+    assert passthrough["max_tokens"] == 8
+    assert "response_format" not in passthrough
+
+
+def test_label_protocol_parses_constrained_object_without_logprobs() -> None:
+    llm = LogprobStubLLMRouter('{"specialist":"personal_development"}', logprobs=None)
+    router = SpecialistRouter(config=_label_config(), llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify("How do I stop procrastinating?"))
+    assert result.domain == "personal_development"
+    assert result.confidence == 0.5
+    assert result.reason == "label"
+
+
+def test_label_protocol_skips_token_cap_for_reasoning_models() -> None:
+    llm = LogprobStubLLMRouter("health", logprobs=None)
+    config = _label_config("gpt-5-nano-2025-08-07")
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify("Knee pain after running"))
+    assert result.domain == "health"
+    passthrough = llm.calls[0]["passthrough"]
+    assert "max_tokens" not in passthrough
+    assert passthrough["reasoning_effort"] == "minimal"
+
+
+def test_label_protocol_rejects_unknown_label() -> None:
+    llm = LogprobStubLLMRouter("astrology", logprobs=[-0.01])
+    router = SpecialistRouter(config=_label_config(), llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify("What is my horoscope?"))
+    assert result.domain == "general"
+    assert result.reason == "invalid-specialist"
+
+
+def test_classifier_input_is_bounded_for_long_pastes() -> None:
+    paste = "\n".join(f"kernel: [{idx}] eth0 link down" for idx in range(20_000))
+    llm = StubLLMRouter(outputs=['{"specialist":"homelab","confidence":0.9,"reason":"logs"}'])
+    router = SpecialistRouter(config=_config(), llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify(f"Why is my network flapping?\n{paste}"))
+    assert result.domain == "homelab"
+    sent = str(llm.calls[0]["messages"][1]["content"])
+    assert sent.startswith("Why is my network flapping?")
+    assert len(sent) <= 2000
+
+
+class StreamingStubLLMRouter:
+    def __init__(self, pieces: list[str]) -> None:
+        self.pieces = pieces
+        self.consumed = 0
+        self.calls: list[dict[str, Any]] = []
+
+    async def chat_completion(
+        self,
+        *,
+        primary_model: str,
+        messages: list[dict[str, Any]],
+        stream: bool,
+        passthrough: dict[str, Any] | None = None,
+        include_fallbacks: bool = True,
+    ) -> tuple[str, Any]:
+        self.calls.append({"primary_model": primary_model, "stream": stream})
+
+        async def _chunks() -> Any:
+            for piece in self.pieces:
+                self.consumed += 1
+                yield {"choices": [{"delta": {"content": piece}}]}
+
+        return primary_model, _chunks()
+
+
+def test_streaming_classifier_commits_once_specialist_is_parsed() -> None:
+    query = "My LXC container lost network after reboot."
+    llm = StreamingStubLLMRouter(
+        pieces=[
+            '{"special',
+            'ist":"home',
+            'lab",',
+            '"confidence":0.88,',
+            '"reason":"container networking"}',
+        ]
+    )
+    config = _config()
+    config.routing.streaming_classifier = True
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+
+    async def _run() -> tuple[SpecialistRoute, int, SpecialistRoute]:
+        route = await router.classify(query)
+        consumed_at_commit = llm.consumed
+        await asyncio.gather(*router._background_tasks)
+        return route, consumed_at_commit, await settled_route(route)
+
+    result, consumed_at_commit, settled = asyncio.run(_run())
+    _print_route(query, result)
+    assert result.domain == "homelab"
+    assert result.confidence == 0.0
+    assert settled.domain == "homelab"
+    assert settled.confidence == 0.88
+    assert consumed_at_commit == 3
+    assert llm.consumed == 5
+    assert llm.calls[0]["stream"] is True
+
+
+class StallingStreamLLMRouter(StreamingStubLLMRouter):
+    def __init__(self, pieces: list[str]) -> None:
+        super().__init__(pieces)
+        self.closed = False
+
+    async def chat_completion(self, **kwargs: Any) -> tuple[str, Any]:
+        self.calls.append({"primary_model": kwargs["primary_model"], "stream": kwargs["stream"]})
+
+        async def _chunks() -> Any:
+            try:
+                for piece in self.pieces:
+                    yield {"choices": [{"delta": {"content": piece}}]}
+                await asyncio.sleep(60)
+            finally:
+                self.closed = True
+
+        return kwargs["primary_model"], _chunks()
+
+
+def test_streaming_classifier_tail_is_bounded_by_routing_timeout() -> None:
+    llm = StallingStreamLLMRouter(pieces=['{"specialist":"homelab",'])
+    config = _config()
+    config.routing.streaming_classifier = True
+    config.runtime.routing_timeout_ms = 20
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+
+    async def _run() -> tuple[SpecialistRoute, SpecialistRoute]:
+        route = await router.classify("My LXC container lost network after reboot.")
+        await asyncio.wait_for(asyncio.gather(*router._background_tasks), timeout=1.0)
+        return route, await settled_route(route)
+
+    route, settled = asyncio.run(_run())
+    assert route.domain == "homelab"
+    assert route.settled is not None and route.settled.cancelled()
+    assert settled is route
+    assert llm.closed is True
+
+
+def test_streaming_classifier_parses_full_payload_when_stream_ends() -> None:
+    query = "Help me plan my learning goals."
+    llm = StreamingStubLLMRouter(
+        pieces=['```json\n{"confidence":0.7, ', '"specialist": "personal-development"}\n```']
+    )
+    config = _config()
+    config.routing.streaming_classifier = True
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify(query))
+    _print_route(query, result)
+    assert result.domain == "personal_development"
+    assert result.confidence == 0.7
+
+
+class DelayedStubLLMRouter:
+    def __init__(self, delays: dict[str, float], outputs: dict[str, str]) -> None:
+        self.delays = delays
+        self.outputs = outputs
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def chat_completion(
+        self,
+        *,
+        primary_model: str,
+        messages: list[dict[str, Any]],
+        stream: bool,
+        passthrough: dict[str, Any] | None = None,
+        include_fallbacks: bool = True,
+    ) -> tuple[str, Any]:
+        self.started.append(primary_model)
+        try:
+            await asyncio.sleep(self.delays.get(primary_model, 0.0))
+        except asyncio.CancelledError:
+            self.cancelled.append(primary_model)
+            raise
+        content = self.outputs[primary_model]
+        return primary_model, {"choices": [{"message": {"content": content}}]}
+
+
+def _hedging_config() -> AppConfig:
+    config = _config()
+    config.routing.hedging.enabled = True
+    config.routing.hedging.backup_model = "gemini-2.5-flash-lite"
+    config.routing.hedging.initial_delay_ms = 20
+    config.routing.hedging.min_delay_ms = 0
+    return config
+
+
+def test_hedged_classifier_uses_faster_candidate_and_cancels_slow_one() -> None:
+    query = "My knee hurts after running."
+    llm = DelayedStubLLMRouter(
+        delays={"gpt-5-nano-2025-08-07": 5.0, "openai/gpt-5-nano-2025-08-07": 0.0},
+        outputs={
+            "openai/gpt-5-nano-2025-08-07": (
+                '{"specialist":"health","confidence":0.9,"reason":"injury"}'
+            ),
+        },
+    )
+    router = SpecialistRouter(config=_hedging_config(), llm_router=llm)  # type: ignore[arg-type]
+
+    async def _run() -> SpecialistRoute:
+        route = await router.classify(query)
+        await asyncio.sleep(0)
+        return route
+
+    result = asyncio.run(_run())
+    _print_route(query, result)
+    assert result.domain == "health"
+    assert result.orchestrator_model == "openai/gpt-5-nano-2025-08-07"
+    assert llm.started == ["gpt-5-nano-2025-08-07", "openai/gpt-5-nano-2025-08-07"]
+    assert llm.cancelled == ["gpt-5-nano-2025-08-07"]
+    stats = router.stats()["hedging"]
+    assert stats["fired"] == 1
+    assert stats["won"] == 1
+
+
+def test_hedged_classifier_does_not_hedge_fast_primary() -> None:
+    query = "How can I improve my Proxmox backups?"
+    llm = DelayedStubLLMRouter(
+        delays={},
+        outputs={
+            "gpt-5-nano-2025-08-07": (
+                '{"specialist":"homelab","confidence":0.8,"reason":"backups"}'
+            ),
+        },
+    )
+    router = SpecialistRouter(config=_hedging_config(), llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify(query))
+    _print_route(query, result)
+    assert result.domain == "homelab"
+    assert llm.started == ["gpt-5-nano-2025-08-07"]
+    assert router.stats()["hedging"]["fired"] == 0
+
+
+def test_hedged_classifier_moves_to_backup_model_after_failures() -> None:
+    query = "My partner and I keep arguing."
+    llm = DelayedStubLLMRouter(
+        delays={},
+        outputs={
+            "gemini-2.5-flash-lite": (
+                '{"specialist":"relationships","confidence":0.85,"reason":"conflict"}'
+            ),
+        },
+    )
+    router = SpecialistRouter(config=_hedging_config(), llm_router=llm)  # type: ignore[arg-type]
+    result = asyncio.run(router.classify(query))
+    _print_route(query, result)
+    assert result.domain == "relationships"
+    assert llm.started == [
+        "gpt-5-nano-2025-08-07",
+        "openai/gpt-5-nano-2025-08-07",
+        "gemini-2.5-flash-lite",
+    ]
+
+
+def _batching_config() -> AppConfig:
+    config = _config()
+    config.routing.batching.enabled = True
+    config.routing.batching.window_ms = 20
+    config.routing.batching.max_batch_size = 8
+    return config
+
+
+def test_batched_classifier_labels_concurrent_turns_in_one_call() -> None:
+    llm = StubLLMRouter(
+        outputs=[
+            '[{"id":2,"specialist":"homelab","confidence":0.8,"reason":"proxmox"},'
+            '{"id":1,"specialist":"health","confidence":0.9,"reason":"injury"},'
+            '{"id":3,"specialist":"parenting","confidence":0.7,"reason":"child"}]'
+        ]
+    )
+    router = SpecialistRouter(config=_batching_config(), llm_router=llm)  # type: ignore[arg-type]
+
+    async def _run() -> list[SpecialistRoute]:
+        return list(
+            await asyncio.gather(
+                router.classify("My knee hurts after running."),
+                router.classify("Proxmox backups keep failing.", current_domain="homelab"),
+                router.classify("My son ignores instructions."),
+            )
+        )
+
+    results = asyncio.run(_run())
+    assert [route.domain for route in results] == ["health", "homelab", "parenting"]
+    assert len(llm.calls) == 1
+    batch_items = json.loads(llm.calls[0]["messages"][1]["content"])
+    assert [item["id"] for item in batch_items] == [1, 2, 3]
+    assert batch_items[1]["current_domain"] == "homelab"
+    assert "JSON array" in llm.calls[0]["messages"][0]["content"]
+    assert router.stats()["batching"]["batches"] == 1
+    assert router.stats()["batching"]["items"] == 3
+
+
+def test_batched_classifier_classifies_missing_items_individually() -> None:
+    llm = StubLLMRouter(
+        outputs=[
+            '[{"id":1,"specialist":"health","confidence":0.9,"reason":"injury"}]',
+            '{"specialist":"relationships","confidence":0.75,"reason":"partner"}',
+        ]
+    )
+    router = SpecialistRouter(config=_batching_config(), llm_router=llm)  # type: ignore[arg-type]
+
+    async def _run() -> list[SpecialistRoute]:
+        return list(
+            await asyncio.gather(
+                router.classify("My knee hurts after running."),
+                router.classify("My partner and I keep arguing."),
+            )
+        )
+
+    results = asyncio.run(_run())
+    assert [route.domain for route in results] == ["health", "relationships"]
+    assert len(llm.calls) == 2
+    assert llm.calls[1]["messages"][1]["content"] == "My partner and I keep arguing."
+
+
+def test_shadow_routing_records_agreement_without_delaying_live_route(
+    tmp_path,
+) -> None:
+    config = _config()
+    config.routing.shadow.enabled = True
+    config.routing.shadow.model = "gemini-2.5-flash-lite"
+    config.routing.shadow.sample_rate = 1.0
+    config.routing.shadow.log_file = tmp_path / "shadow.jsonl"
+    llm = DelayedStubLLMRouter(
+        delays={"gemini-2.5-flash-lite": 0.05},
+        outputs={
+            "gpt-5-nano-2025-08-07": '{"specialist":"health","confidence":0.9,"reason":"live"}',
+            "gemini-2.5-flash-lite": (
+                '{"specialist":"parenting","confidence":0.8,"reason":"shadow"}'
+            ),
+        },
+    )
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+
+    async def run() -> tuple[SpecialistRoute, bool]:
+        route = await router.classify("My kid has a fever.")
+        shadow_pending = bool(router._background_tasks)
+        await asyncio.gather(*router._background_tasks)
+        return route, shadow_pending
+
+    route, shadow_pending = asyncio.run(run())
+    assert route.domain == "health"
+    assert shadow_pending
+    stats = router.stats()["shadow"]
+    assert stats["samples"] == 1
+    assert stats["agreement_rate"] == 0.0
+    assert stats["shadow_latency_ms"]["p50"] >= 50
+    entry = json.loads((tmp_path / "shadow.jsonl").read_text(encoding="utf-8"))
+    assert entry["live_domain"] == "health"
+    assert entry["shadow_domain"] == "parenting"
+    assert entry["agreed"] is False
+
+
+def test_batched_routes_are_shadow_sampled_per_item() -> None:
+    config = _batching_config()
+    config.routing.shadow.enabled = True
+    config.routing.shadow.model = "gemini-2.5-flash-lite"
+    config.routing.shadow.sample_rate = 1.0
+    llm = DelayedStubLLMRouter(
+        delays={},
+        outputs={
+            "gpt-5-nano-2025-08-07": (
+                '[{"id":1,"specialist":"health","confidence":0.9,"reason":"injury"},'
+                '{"id":2,"specialist":"homelab","confidence":0.8,"reason":"proxmox"}]'
+            ),
+            "gemini-2.5-flash-lite": '{"specialist":"health","confidence":0.8,"reason":"x"}',
+        },
+    )
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+
+    async def run() -> list[SpecialistRoute]:
+        routes = await asyncio.gather(
+            router.classify("My knee hurts after running."),
+            router.classify("Proxmox backups keep failing."),
+        )
+        await asyncio.gather(*router._background_tasks)
+        return list(routes)
+
+    routes = asyncio.run(run())
+    assert [route.domain for route in routes] == ["health", "homelab"]
+    assert llm.started.count("gpt-5-nano-2025-08-07") == 1
+    assert llm.started.count("gemini-2.5-flash-lite") == 2
+    stats = router.stats()["shadow"]
+    assert stats["samples"] == 2
+    assert stats["agreement_rate"] == 0.5
+
+
+def test_shadow_routing_log_is_written_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    config = _config()
+    config.routing.shadow.enabled = True
+    config.routing.shadow.model = "gemini-2.5-flash-lite"
+    config.routing.shadow.sample_rate = 1.0
+    config.routing.shadow.log_file = tmp_path / "shadow.jsonl"
+    llm = DelayedStubLLMRouter(
+        delays={},
+        outputs={
+            "gpt-5-nano-2025-08-07": '{"specialist":"health","confidence":0.9,"reason":"live"}',
+            "gemini-2.5-flash-lite": '{"specialist":"health","confidence":0.8,"reason":"x"}',
+        },
+    )
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+    offloaded: list[str] = []
+    to_thread = asyncio.to_thread
+
+    async def _to_thread(func: Any, *args: Any) -> Any:
+        offloaded.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(shadow_routing.asyncio, "to_thread", _to_thread)
+
+    async def run() -> None:
+        await router.classify("My knee hurts.")
+        await asyncio.gather(*router._background_tasks)
+
+    asyncio.run(run())
+    assert offloaded == ["_append"]
+    assert json.loads((tmp_path / "shadow.jsonl").read_text(encoding="utf-8"))["agreed"]
+
+
+def test_shadow_routing_respects_sample_rate() -> None:
+    config = _config()
+    config.routing.shadow.enabled = True
+    config.routing.shadow.model = "gemini-2.5-flash-lite"
+    config.routing.shadow.sample_rate = 0.0
+    llm = StubLLMRouter(outputs=['{"specialist":"health","confidence":0.9,"reason":"x"}'])
+    router = SpecialistRouter(config=config, llm_router=llm)  # type: ignore[arg-type]
+    asyncio.run(router.classify("My knee hurts."))
+    assert len(llm.calls) == 1
+    assert router.stats()["shadow"]["samples"] == 0
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from statistics import median
+from time import perf_counter
+
+import pytest
+
+from mobius.orchestration.switch_matcher import ExplicitSwitchMatcher
+
+DISPLAY_NAMES = {
+    "general": None,
+    "health": "The Coach",
+    "parenting": "The Parenting Coach",
+    "relationships": "The Counselor",
+    "homelab": "The Tinkerer",
+    "personal_development": "The Mentor",
+}
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("route to health specialist", "health"),
+        ("Please switch me over to the homelab specialist.", "homelab"),
+        ("Let the personal development specialist answer this one.", "personal_development"),
+        ("naj odgovori personal_development specialist", "personal_development"),
+        ("Preklopi na zdravje, prosim.", "health"),
+        ("Mentor, what should I focus on this week?", "personal_development"),
+        ("@The Tinkerer: my LXC will not start", "homelab"),
+        ("ask the parenting coach", "parenting"),
+    ],
+)
+def test_explicit_switch_commands_match(text: str, expected: str) -> None:
+    matcher = ExplicitSwitchMatcher(DISPLAY_NAMES)
+    assert matcher.match(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I have health issues after running.",
+        "I need to talk to my partner about chores.",
+        "Can you help with tennis elbow rehab?",
+        "My coach said I should rest.",
+        "ask general questions",
+        "Should I switch to general anesthesia for the surgery?",
+        "switch to general anesthesia",
+        "Ask the mentor at work whether the plan makes sense.",
+        "Can you route to health insurance providers in my area?",
+    ],
+)
+def test_regular_messages_do_not_match(text: str) -> None:
+    matcher = ExplicitSwitchMatcher(DISPLAY_NAMES)
+    assert matcher.match(text) is None
+
+
+def test_display_name_shared_by_domains_is_ignored() -> None:
+    matcher = ExplicitSwitchMatcher({"health": "The Coach", "parenting": "The Coach"})
+    assert matcher.match("Coach, what now?") is None
+    assert matcher.match("route to the coach") is None
+    assert matcher.match("route to parenting") == "parenting"
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("Switch to general.", "general"),
+        ("please ask the mentor", "personal_development"),
+        ("Can you switch to homelab?", "homelab"),
+        ("I think we should switch to the health expert now", "health"),
+        ("vprašaj zdravje", "health"),
+    ],
+)
+def test_command_needs_specialist_noun_or_whole_message(text: str, expected: str) -> None:
+    matcher = ExplicitSwitchMatcher(DISPLAY_NAMES)
+    assert matcher.match(text) == expected
+
+
+@pytest.mark.benchmark
+def test_non_matching_message_overhead_is_under_50_microseconds() -> None:
+    matcher = ExplicitSwitchMatcher(DISPLAY_NAMES)
+    messages = [
+        "Thanks!",
+        "Can you help me figure out why my Proxmox backups keep failing every night?",
+        "I have a question about my toddler's sleep routine and what to change next. " * 5,
+        "x" * 20_000,
+    ]
+    iterations = 500
+    for text in messages:
+        samples: list[float] = []
+        for _ in range(5):
+            started = perf_counter()
+            for _ in range(iterations):
+                matcher.match(text)
+            samples.append((perf_counter() - started) / iterations)
+        per_call_us = median(samples) * 1_000_000
+        print(f"chars={len(text)} explicit-switch overhead={per_call_us:.1f}us")
+        assert per_call_us < 50